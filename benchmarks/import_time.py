@@ -0,0 +1,109 @@
+"""
+Import-time benchmark.
+
+Measures, in fresh interpreters, the time to import the package modules
+and which heavy dependencies each of them loads. Run it from the project
+root:
+
+    python benchmarks/import_time.py --repeat 10 --json
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "src.base.commons",
+    "src.base.file",
+    "src.base.logger",
+    "src.config",
+    "src.model",
+    "src.model.engine",
+    "src.model.artifact",
+    "src.model.data",
+    "src.model.features",
+    "src.model.preprocessing",
+]
+
+HEAVY_MODULES = ["pandas", "sklearn", "scipy", "joblib", "git", "requests", "yaml"]
+
+SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> dict:
+    """Imports a module in ``repeat`` fresh interpreters.
+
+    Parameters
+    ----------
+    module : str
+        The module name.
+    repeat : int, default=5
+        The number of interpreters.
+
+    Returns
+    -------
+    dict
+        The median and minimum import times, in seconds, and the heavy
+        dependencies loaded by the import.
+    """
+
+    script = SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+
+    results = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=ROOT,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.splitlines()[-1]
+        )
+        for _ in range(repeat)
+    ]
+
+    seconds = [result["seconds"] for result in results]
+
+    return {
+        "module": module,
+        "median_seconds": statistics.median(seconds),
+        "min_seconds": min(seconds),
+        "loaded": results[0]["loaded"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = measure(module, repeat=args.repeat)
+
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{result['module']:<28} {result['median_seconds'] * 1000:8.1f} ms"
+                f"  {', '.join(result['loaded']) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Benchmark suite of the preprocessing subsystem.
+
+Times each case over a grid of row and feature counts, on synthetic data
+generated from a ``features.yaml`` spec, and writes one JSON line per
+case and grid point with the latency percentiles, the throughput and the
+peak traced memory. Run it from the project root:
+
+    python -m benchmarks.suite --rows 1e3 1e5 --features 10 100 \\
+        --output benchmarks.jsonl
+
+Grid points with more than ``--max-cells`` values are skipped, so the
+full sweep (up to 1e7 rows and 10k features) only runs when asked for.
+"""
+
+import sys
+import json
+import time
+import typing
+import argparse
+import platform
+import datetime
+import tempfile
+import numpy as np
+
+import src.model
+from src.base.memory import trace_memory
+from src.model.data import make_dataset
+from src.model.engine import to_buffer
+from src.model.features import build_features
+from src.model.preprocessing import (
+    PreProcessor,
+    FeatureImputer,
+    FeatureClipper,
+    FeatureTransformer,
+    FeatureScaler,
+    FeatureWeigher,
+    FeatureDiscretizer,
+)
+from benchmarks.synthetic import (
+    DEFAULT_SPEC,
+    generate_features_config,
+    generate_dataset,
+    write_drugs_dataset,
+)
+
+ROWS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+FEATURES = [10, 100, 1_000, 10_000]
+
+MAX_CELLS = 50_000_000
+
+MAX_RECORDS = 1_000
+
+PERCENTILES = [50, 90, 99]
+
+FEATURE_TRANSFORMERS = {
+    "FeatureImputer": lambda: FeatureImputer(strategy="mean"),
+    "FeatureClipper": lambda: FeatureClipper(limits=[1.0, 50.0]),
+    "FeatureTransformer": lambda: FeatureTransformer(transformation="log1p"),
+    "FeatureScaler": lambda: FeatureScaler(strategy="standard"),
+    "FeatureWeigher": lambda: FeatureWeigher(weight=2.0),
+    "FeatureDiscretizer": lambda: FeatureDiscretizer(n_bins=5, strategy="quantile"),
+}
+
+
+class Context:
+    """
+    Context.
+
+    Shared inputs of the benchmark cases, generated once per grid point.
+
+    Parameters
+    ----------
+    spec : str
+        Path to the ``features.yaml`` spec of the synthetic data.
+    directory : str
+        Directory for the generated files.
+    """
+
+    def __init__(self, spec: str, directory: str):
+        self.spec = spec
+        self.directory = directory
+        self.__cache = {}
+
+    def features_config(self, n_features: int) -> typing.List[dict]:
+        """The features configuration with ``n_features`` features."""
+        return generate_features_config(self.spec, n_features)
+
+    def dataset(self, n_rows: int, n_features: int, missing: bool = True):
+        """The synthetic dataframe, with or without missing values."""
+
+        key = (n_rows, n_features, missing)
+
+        if key not in self.__cache:
+            self.__cache = {
+                cached: dataset
+                for cached, dataset in self.__cache.items()
+                if cached[:2] == key[:2]
+            }
+            self.__cache[key] = generate_dataset(
+                self.features_config(n_features),
+                n_rows,
+                missing_rate=0.05 if missing else 0.0,
+            )
+
+        return self.__cache[key]
+
+
+class Case:
+    """
+    Case.
+
+    A benchmark case. Its setup prepares the inputs, out of the timing,
+    and returns the function to time and the number of rows it processes.
+
+    Parameters
+    ----------
+    name : str
+        The case name.
+    setup : callable
+        Function of ``(context, n_rows, n_features)`` returning\
+        ``(function, n_rows)``.
+    sweep_features : bool, default=True
+        Whether the case depends on the number of features. Otherwise,\
+        it only runs for the first feature count of the grid.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: typing.Callable,
+        sweep_features: bool = True,
+    ):
+        self.name = name
+        self.setup = setup
+        self.sweep_features = sweep_features
+
+
+def feature_cases() -> typing.List[Case]:
+    """The fit and transform cases of each Feature* transformer, over the
+    float buffer the PreProcessor feeds them."""
+
+    cases = []
+
+    for name, factory in FEATURE_TRANSFORMERS.items():
+        missing = name == "FeatureImputer"
+
+        def setup_fit(context, n_rows, n_features, factory=factory, missing=missing):
+            X = to_buffer(context.dataset(n_rows, n_features, missing))
+            return (lambda: factory().fit(X)), n_rows
+
+        def setup_transform(
+            context, n_rows, n_features, factory=factory, missing=missing
+        ):
+            X = to_buffer(context.dataset(n_rows, n_features, missing))
+            transformer = factory().fit(X)
+            return (lambda: transformer.transform(X)), n_rows
+
+        cases.append(Case(f"{name}.fit", setup_fit))
+        cases.append(Case(f"{name}.transform", setup_transform))
+
+    return cases
+
+
+def setup_preprocessor_fit(context, n_rows, n_features):
+    X = context.dataset(n_rows, n_features)
+    features_config = context.features_config(n_features)
+    return (lambda: PreProcessor(features_config).fit(X)), n_rows
+
+
+def setup_preprocessor_transform(context, n_rows, n_features):
+    X = context.dataset(n_rows, n_features)
+    preprocessor = PreProcessor(context.features_config(n_features)).fit(X)
+    return (lambda: preprocessor.transform(X)), n_rows
+
+
+def setup_preprocessor_transform_records(context, n_rows, n_features):
+    X = context.dataset(n_rows, n_features)
+    preprocessor = PreProcessor(context.features_config(n_features)).fit(X)
+    records = X.head(MAX_RECORDS).to_dict("records")
+    return (lambda: preprocessor.transform_records(records)), len(records)
+
+
+def setup_make_dataset(context, n_rows, n_features):
+    config = write_drugs_dataset(context.directory, n_rows)
+    return (lambda: make_dataset(config)), n_rows
+
+
+def setup_build_features(context, n_rows, n_features):
+    X, y = make_dataset(write_drugs_dataset(context.directory, n_rows))
+    return (lambda: build_features(X.copy(), y)), n_rows
+
+
+CASES = feature_cases() + [
+    Case("PreProcessor.fit", setup_preprocessor_fit),
+    Case("PreProcessor.transform", setup_preprocessor_transform),
+    Case("PreProcessor.transform_records", setup_preprocessor_transform_records),
+    Case("make_dataset", setup_make_dataset, sweep_features=False),
+    Case("build_features", setup_build_features, sweep_features=False),
+]
+
+
+def measure(function: typing.Callable, n_rows: int, repeat: int = 5) -> dict:
+    """Times a function and measures its peak traced memory.
+
+    The function runs once to warm up, ``repeat`` times to be timed and
+    once more under tracemalloc, which slows allocations down.
+
+    Parameters
+    ----------
+    function : callable
+        The function to measure.
+    n_rows : int
+        The number of rows processed by each call.
+    repeat : int, default=5
+        The number of timed calls.
+
+    Returns
+    -------
+    dict
+        The latency statistics, in seconds, the throughput, in rows per\
+        second at the median latency, and the peak traced memory, in bytes.
+    """
+
+    function()
+
+    latencies = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - start)
+
+    memory = {}
+    with trace_memory(memory):
+        function()
+
+    latencies = np.array(latencies)
+    median = np.percentile(latencies, 50)
+
+    return {
+        "latency_seconds": {
+            "min": float(latencies.min()),
+            **{f"p{p}": float(np.percentile(latencies, p)) for p in PERCENTILES},
+            "max": float(latencies.max()),
+            "mean": float(latencies.mean()),
+        },
+        "rows_per_second": n_rows / median if median > 0 else None,
+        "peak_bytes": memory["peak_bytes"],
+    }
+
+
+def environment() -> dict:
+    """Describes the machine and the versions of the benchmarked code."""
+
+    import pandas
+    import sklearn
+
+    return {
+        "version": src.model.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def run(
+    cases: typing.List[Case],
+    rows: typing.List[int] = ROWS,
+    features: typing.List[int] = FEATURES,
+    spec: str = DEFAULT_SPEC,
+    repeat: int = 5,
+    max_cells: int = MAX_CELLS,
+) -> typing.Iterator[dict]:
+    """Runs the cases over the grid of row and feature counts.
+
+    Parameters
+    ----------
+    cases : list of Case
+        The cases to run.
+    rows : list of int, default=ROWS
+        The row counts.
+    features : list of int, default=FEATURES
+        The feature counts.
+    spec : str, default=DEFAULT_SPEC
+        Path to the ``features.yaml`` spec of the synthetic data.
+    repeat : int, default=5
+        The number of timed calls of each case.
+    max_cells : int, default=MAX_CELLS
+        Grid points with more rows times features are skipped.
+
+    Yields
+    ------
+    dict
+        The results of a case at a grid point.
+    """
+
+    description = environment()
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        context = Context(spec, directory)
+
+        for n_features in features:
+            for n_rows in rows:
+
+                if n_rows * n_features > max_cells:
+                    continue
+
+                for case in cases:
+
+                    if not case.sweep_features and n_features != features[0]:
+                        continue
+
+                    function, n_items = case.setup(context, n_rows, n_features)
+
+                    yield {
+                        "case": case.name,
+                        "rows": n_rows,
+                        "features": n_features if case.sweep_features else None,
+                        "repeat": repeat,
+                        **measure(function, n_items, repeat=repeat),
+                        "timestamp": datetime.datetime.now(
+                            datetime.timezone.utc
+                        ).isoformat(),
+                        "environment": description,
+                    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--spec", default=DEFAULT_SPEC)
+    parser.add_argument("--rows", nargs="+", type=float, default=ROWS)
+    parser.add_argument("--features", nargs="+", type=float, default=FEATURES)
+    parser.add_argument(
+        "--cases", nargs="+", help="run the cases whose names start with these"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-cells", type=float, default=MAX_CELLS)
+    parser.add_argument("--output", help="JSON lines file, by default stdout")
+    args = parser.parse_args()
+
+    cases = [
+        case
+        for case in CASES
+        if not args.cases or any(case.name.startswith(c) for c in args.cases)
+    ]
+
+    output = open(args.output, "a") if args.output else sys.stdout
+
+    try:
+        for result in run(
+            cases,
+            rows=[int(n) for n in args.rows],
+            features=[int(n) for n in args.features],
+            spec=args.spec,
+            repeat=args.repeat,
+            max_cells=int(args.max_cells),
+        ):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
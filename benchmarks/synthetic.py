@@ -0,0 +1,177 @@
+"""
+Synthetic data for the benchmarks.
+
+The features are generated from a ``features.yaml`` spec: the spec is
+repeated until the requested number of features is reached, and the
+values of each feature follow its type and limits, with a share of
+missing values for the imputers.
+"""
+
+import os
+import copy
+import typing
+import numpy as np
+import pandas as pd
+
+from src.config import get_config
+
+DEFAULT_SPEC = "config/features.yaml"
+
+DRUGS = ["drugA", "drugB", "drugC", "drugX", "DrugY"]
+
+
+def generate_features_config(
+    spec: str or typing.List[dict] = DEFAULT_SPEC, n_features: int = None
+) -> typing.List[dict]:
+    """Builds a features configuration with ``n_features`` features by
+    repeating the features of a spec.
+
+    Parameters
+    ----------
+    spec : str or list of dict, default=DEFAULT_SPEC
+        Path to a ``features.yaml`` file or its content.
+    n_features : int, optional
+        The number of features, by default the number of spec features.
+
+    Returns
+    -------
+    list of dict
+        The features configuration. Repeated features get the suffix\
+        ``_<repetition>`` in their names.
+    """
+
+    if isinstance(spec, str):
+        spec = get_config(spec)
+
+    spec = [config for config in spec if config.get("active", True)]
+
+    if n_features is None:
+        n_features = len(spec)
+
+    features_config = []
+
+    for j in range(n_features):
+        config = copy.deepcopy(dict(spec[j % len(spec)]))
+
+        if j >= len(spec):
+            config["name"] = f"{config['name']}_{j // len(spec)}"
+
+        features_config.append(config)
+
+    return features_config
+
+
+def generate_dataset(
+    features_config: typing.List[dict],
+    n_rows: int,
+    missing_rate: float = 0.05,
+    random_state: int = 0,
+) -> pd.DataFrame:
+    """Generates random data for a features configuration.
+
+    Integer features are uniform over their limits, by default [0, 10],
+    and float features follow a gamma distribution shifted and trimmed to
+    their limits, by default (0, 100]. Float values are strictly above the
+    lower limit, so logarithms are defined when it is zero.
+
+    Parameters
+    ----------
+    features_config : list of dict
+        The features configuration.
+    n_rows : int
+        The number of rows.
+    missing_rate : float, default=0.05
+        The share of missing values of each feature.
+    random_state : int, default=0
+        Seed of the random generator.
+
+    Returns
+    -------
+    pd.DataFrame
+        Float data with one column per feature.
+    """
+
+    rng = np.random.default_rng(random_state)
+
+    data = np.empty((n_rows, len(features_config)), order="F")
+
+    for j, config in enumerate(features_config):
+        lower, upper = config.get("limits") or [None, None]
+
+        if "int" in str(config.get("type", "float")):
+            lower = 0 if lower is None else lower
+            upper = 10 if upper is None else upper
+            data[:, j] = rng.integers(lower, upper, size=n_rows, endpoint=True)
+
+        else:
+            lower = 0.0 if lower is None else lower
+            upper = lower + 100.0 if upper is None else upper
+            values = lower + rng.gamma(2.0, (upper - lower) / 8, size=n_rows)
+            data[:, j] = np.clip(values, np.nextafter(lower, np.inf), upper)
+
+    if missing_rate > 0:
+        data[rng.random(data.shape) < missing_rate] = np.nan
+
+    return pd.DataFrame(data, columns=[config["name"] for config in features_config])
+
+
+def generate_drugs_dataset(n_rows: int, random_state: int = 0) -> pd.DataFrame:
+    """Generates raw data with the columns of the example dataset, as
+    expected by :func:`src.model.data.make_dataset` and
+    :func:`src.model.features.build_features`.
+
+    Parameters
+    ----------
+    n_rows : int
+        The number of rows.
+    random_state : int, default=0
+        Seed of the random generator.
+
+    Returns
+    -------
+    pd.DataFrame
+        The raw data.
+    """
+
+    rng = np.random.default_rng(random_state)
+
+    return pd.DataFrame(
+        {
+            "Age": rng.integers(15, 75, size=n_rows),
+            "Sex": rng.choice(["F", "M"], size=n_rows),
+            "BP": rng.choice(["LOW", "NORMAL", "HIGH"], size=n_rows),
+            "Cholesterol": rng.choice(["NORMAL", "HIGH"], size=n_rows),
+            "Na_to_K": np.round(rng.uniform(6.0, 38.0, size=n_rows), 3),
+            "Drug": rng.choice(DRUGS, size=n_rows),
+        }
+    )
+
+
+def write_drugs_dataset(
+    directory: str, n_rows: int, random_state: int = 0
+) -> typing.Dict[str, str]:
+    """Writes a synthetic raw CSV file and returns a data config for it.
+
+    Parameters
+    ----------
+    directory : str
+        The output directory.
+    n_rows : int
+        The number of rows.
+    random_state : int, default=0
+        Seed of the random generator.
+
+    Returns
+    -------
+    dict
+        A config with the ``data_local_path`` of the file.
+    """
+
+    filepath = os.path.join(directory, f"drugs-{n_rows}.csv")
+
+    if not os.path.isfile(filepath):
+        generate_drugs_dataset(n_rows, random_state=random_state).to_csv(
+            filepath, index=False
+        )
+
+    return {"data_local_path": filepath}
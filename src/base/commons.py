@@ -1,8 +1,12 @@
+from __future__ import annotations
+
 import re
-import git
+import typing
+import numpy as np
 import pandas as pd
 
-from sklearn.base import TransformerMixin
+if typing.TYPE_CHECKING:
+    from sklearn.base import TransformerMixin
 
 
 def get_last_git_tag() -> str:
@@ -15,6 +19,8 @@ def get_last_git_tag() -> str:
         Latest git tag
     """
 
+    import git
+
     repo = git.Repo()
 
     latest_tag = None
@@ -57,9 +63,60 @@ def to_snake_case(string: str) -> str:
     return string
 
 
+def cast_dtypes(dataframe: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Converts the columns of a dataframe to compact dtypes, in place.
+
+    Columns converted to a numeric dtype must be numeric already, others,
+    as labels mapped to numbers later by the feature building, are kept.
+    Columns with the 'integer' dtype are downcast to the smallest integer
+    dtype that holds their values, or to float32 when they have missing
+    or fractional values.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame
+        Input dataframe.
+    dtypes : dict
+        The dtype of each column, as returned by\
+        ``src.config.get_feature_dtypes``. Missing columns are ignored.
+
+    Returns
+    -------
+    pd.DataFrame
+        The input dataframe.
+    """
+
+    for name, dtype in dtypes.items():
+
+        if name not in dataframe.columns:
+            continue
+
+        series = dataframe[name]
+
+        if dtype == "category":
+            dataframe[name] = series.astype("category")
+
+        elif not pd.api.types.is_numeric_dtype(series):
+            continue
+
+        elif dtype == "integer":
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+            if np.array_equal(values, np.round(values)):
+                dataframe[name] = pd.to_numeric(series, downcast="integer")
+            else:
+                dataframe[name] = series.astype(np.float32)
+
+        else:
+            dataframe[name] = series.astype(dtype)
+
+    return dataframe
+
+
 def dataframe_transformer(
-    dataframe: pd.DataFrame, transformer: TransformerMixin
-) -> pd.DataFrame:
+    dataframe: pd.DataFrame or np.ndarray, transformer: TransformerMixin
+) -> pd.DataFrame or np.ndarray:
     """
     Applies a sklearn transformation to a dataframe e converts the
     results in dataframes to, with the same column names. The transformations
@@ -68,32 +125,55 @@ def dataframe_transformer(
 
     Parameters
     ----------
-    dataframe : pd.DataFrame
-        Input dataframe
+    dataframe : pd.DataFrame or np.ndarray
+        Input dataframe. When it is a numpy array, the transformed\
+        array is returned without any conversion.
     transformer : TransformerMixin
         Scikit-Learn-like transformation to be applied
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame or np.ndarray
         The transformed dataframe
     """
 
-    transformed_array = transformer.transform(dataframe)
+    return wrap_like(dataframe, transformer.transform(dataframe))
 
-    if transformed_array.shape[1] == len(dataframe.columns):
-        result = pd.DataFrame(
-            transformed_array,
-            index=dataframe.index,
-            columns=dataframe.columns,
-        )
+
+def wrap_like(
+    dataframe: pd.DataFrame or np.ndarray, transformed_array: np.ndarray
+) -> pd.DataFrame or np.ndarray:
+    """
+    Converts the result of a transformation to the type of its input: a
+    dataframe with the same index and column names, or the array itself.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame or np.ndarray
+        Input of the transformation
+    transformed_array : np.ndarray
+        Output of the transformation
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        The transformed data
+    """
+
+    if transformed_array.shape[1] == dataframe.shape[1]:
+        if isinstance(dataframe, np.ndarray):
+            result = transformed_array
+        else:
+            result = pd.DataFrame(
+                transformed_array,
+                index=dataframe.index,
+                columns=dataframe.columns,
+            )
 
     else:
-        raise ValueError(
-            """The transformation do not preserve the number \
+        raise ValueError("""The transformation do not preserve the number \
         of columns. So, the transformed data cannot be converted to a dataframe \
         with same column names.
-        """
-        )
+        """)
 
     return result
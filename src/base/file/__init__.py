@@ -1,4 +1,17 @@
-import requests
+import io
+import os
+import logging
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from src.base.file.download import download_file, download_files
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+MAX_INVALID = 0.01
+
+CHECK_ROWS = 10_000
 
 
 def read_file_string(filepath, splitlines=False):
@@ -16,12 +29,646 @@ def get_filename_from_url(url):
     return url.split("/")[-1]
 
 
-def download_file(url, destination=None):
+def get_file_format(filepath):
+    """Infers the tabular file format from the file extension.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to a tabular file.
+
+    Returns
+    -------
+    str
+        Either 'csv', 'parquet' or 'arrow', for Arrow IPC and Feather files.
+    """
+
+    extension = os.path.splitext(str(filepath))[1].lower()
+
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+
+    elif extension in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+
+    elif extension in (".csv", ".txt", ".gz", ".bz2", ".zip", ".xz"):
+        return "csv"
+
+    else:
+        raise ValueError(f"The file format of {filepath} is not supported.")
+
+
+def read_file_chunks(filepath, chunksize=100_000, columns=None, **kwargs):
+    """Reads a CSV, Parquet or Arrow file as a sequence of dataframes.
+
+    Only one chunk is held in memory at a time, so files larger than
+    the available memory can be processed.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to a CSV, Parquet or Arrow file.
+    chunksize : int, optional
+        Number of rows of each chunk, by default 100_000
+    columns : list of str, optional
+        Columns to be read, by default all the columns.
+    **kwargs
+        Extra arguments passed to ``pd.read_csv``.
+
+    Yields
+    ------
+    pd.DataFrame
+        The chunks of the file.
+    """
+
+    file_format = get_file_format(filepath)
+
+    if file_format == "parquet":
+
+        from pyarrow import parquet
+
+        parquet_file = parquet.ParquetFile(filepath)
+
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+
+    elif file_format == "arrow":
+
+        dataset = _open_arrow(filepath)
+
+        for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+            yield batch.to_pandas()
+
+    else:
+        yield from pd.read_csv(filepath, chunksize=chunksize, usecols=columns, **kwargs)
+
+
+def read_table(
+    filepath, columns=None, filters=None, memory_map=True, dtypes=None, **kwargs
+):
+    """Reads a CSV, Parquet or Arrow file into a dataframe.
+
+    Columnar files only read the requested columns, and Parquet files skip
+    the row groups whose statistics do not match the filters.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to a CSV, Parquet or Arrow file.
+    columns : list of str, optional
+        Columns to be read, by default all the columns.
+    filters : list of tuple or list of list of tuple, optional
+        Row filters of columnar files, in the disjunctive normal form of\
+        ``pyarrow.parquet.read_table``, as ``[("year", ">=", 2020)]``.
+    memory_map : bool, optional
+        Whether columnar files are memory-mapped instead of read, by\
+        default True
+    dtypes : dict, optional
+        The dtypes of CSV columns, parsed as in :func:`read_csv`.
+    **kwargs
+        Extra arguments passed to :func:`read_csv`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The data.
+    """
+
+    file_format = get_file_format(filepath)
+
+    if file_format == "csv":
+
+        if filters is not None:
+            raise ValueError("Filters are only supported by columnar files.")
+
+        return read_csv(filepath, columns=columns, dtypes=dtypes, **kwargs)
+
+    if file_format == "parquet":
+
+        from pyarrow import parquet
+
+        table = parquet.read_table(
+            filepath, columns=columns, filters=filters, memory_map=memory_map
+        )
+
+    else:
+        table = _read_arrow(filepath, columns, filters, memory_map)
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def get_csv_engine():
+    """Returns the fastest CSV parser engine of ``pd.read_csv`` that is
+    installed: the multithreaded 'pyarrow' engine or the 'c' engine."""
+
+    try:
+        import pyarrow
+
+    except ImportError:
+        return "c"
+
+    return "pyarrow"
+
+
+def read_csv(
+    filepath,
+    columns=None,
+    dtypes=None,
+    engine=None,
+    n_jobs=None,
+    max_invalid=MAX_INVALID,
+    **kwargs,
+):
+    """Reads a CSV file with declared column dtypes.
+
+    Declared dtypes are parsed directly, so pandas does not infer them.
+    The declared numeric dtypes are first checked against the first
+    ``CHECK_ROWS`` rows. The numeric columns whose values can not be parsed
+    there, as label columns mapped later to numbers, are read with inferred
+    dtypes and converted, with the invalid values as missing values, if
+    they are at most a ``max_invalid`` share of its values. Otherwise, the
+    column keeps its inferred dtype. The file is only read twice when
+    a value after the checked rows can not be parsed.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the CSV file.
+    columns : list of str, optional
+        Columns to be read, by default all the columns.
+    dtypes : dict, optional
+        The dtype of each column, by name. Missing columns are ignored.
+    engine : {'c', 'pyarrow', 'python'}, optional
+        The ``pd.read_csv`` engine, by default the fastest installed one.
+    n_jobs : int, optional
+        Number of threads that parse byte ranges of uncompressed files\
+        larger than ``PARALLEL_MIN_BYTES`` with the 'c' engine, by\
+        default 1. The ranges are split at line ends, so quoted values\
+        must not hold line breaks. The 'pyarrow' engine is multithreaded.
+    max_invalid : float, optional
+        Maximum share of invalid values of a numeric column, by default\
+        MAX_INVALID
+    **kwargs
+        Extra arguments passed to ``pd.read_csv``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The data.
+    """
+
+    if engine is None:
+        engine = get_csv_engine()
+
+    if dtypes:
+        selected = None if columns is None else set(columns)
+        dtypes = {
+            name: dtype
+            for name, dtype in dtypes.items()
+            if selected is None or name in selected
+        }
+
+    if not dtypes:
+        return _read_csv(filepath, columns, None, engine, n_jobs, **kwargs)
+
+    numeric = {
+        name: dtype
+        for name, dtype in dtypes.items()
+        if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype))
+    }
+
+    unparsed = _check_numeric_dtypes(filepath, numeric, **kwargs)
+
+    try:
+        data = _read_csv(
+            filepath,
+            columns,
+            {name: dtype for name, dtype in dtypes.items() if name not in unparsed}
+            or None,
+            engine,
+            n_jobs,
+            **kwargs,
+        )
+
+    except ValueError as err:
+        logger.info(f"Declared dtypes of {filepath} can not be parsed: {err}")
+
+        unparsed = set(numeric)
+
+        data = _read_csv(
+            filepath,
+            columns,
+            {name: dtype for name, dtype in dtypes.items() if name not in numeric}
+            or None,
+            engine,
+            n_jobs,
+            **kwargs,
+        )
+
+    for name, dtype in numeric.items():
+
+        if name not in unparsed or name not in data.columns:
+            continue
+
+        series = data[name]
+
+        if not pd.api.types.is_numeric_dtype(series):
+            values = pd.to_numeric(series, errors="coerce")
+            invalid = int((values.isna() & series.notna()).sum())
+
+            if invalid > max_invalid * series.notna().sum():
+                continue
+
+            if invalid > 0:
+                logger.warning(
+                    f"{invalid} invalid values of {name} in {filepath} "
+                    "were read as missing values."
+                )
+
+            series = values
+
+        try:
+            data[name] = series.astype(dtype)
+        except (ValueError, TypeError):
+            data[name] = series
+
+    return data
+
+
+def _check_numeric_dtypes(filepath, dtypes, **kwargs):
+    """Returns the columns of the declared numeric dtypes that can not be\
+    parsed with them in the first rows of a CSV file."""
+
+    if not dtypes:
+        return set()
+
+    kwargs["nrows"] = min(kwargs.get("nrows") or CHECK_ROWS, CHECK_ROWS)
+
+    sample = pd.read_csv(
+        filepath, usecols=lambda name: name in dtypes, engine="c", **kwargs
+    )
+
+    unparsed = set()
+
+    for name in sample.columns:
+        series = sample[name]
+
+        if not pd.api.types.is_numeric_dtype(series) or (
+            pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtypes[name]))
+            and series.isna().any()
+        ):
+            unparsed.add(name)
+
+    return unparsed
+
+
+def _read_csv(filepath, columns, dtypes, engine, n_jobs, **kwargs):
+    """Reads a CSV file, in parallel byte ranges when it is worth it."""
+
+    n_jobs = 1 if n_jobs is None else n_jobs
+    if n_jobs < 0:
+        n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+
+    size = os.path.getsize(filepath)
+
+    if (
+        engine != "c"
+        or n_jobs == 1
+        or size < PARALLEL_MIN_BYTES
+        or os.path.splitext(filepath)[1].lower() not in (".csv", ".txt")
+        or set(kwargs) - {"sep", "delimiter", "na_values", "keep_default_na"}
+    ):
+        return pd.read_csv(
+            filepath, usecols=columns, dtype=dtypes, engine=engine, **kwargs
+        )
+
+    categories = [name for name, dtype in (dtypes or {}).items() if dtype == "category"]
+
+    if categories:
+        dtypes = {
+            name: dtype for name, dtype in dtypes.items() if name not in categories
+        }
+
+    with open(filepath, "rb") as file:
+        header = file.readline()
+        bounds = [file.tell()]
+
+        for k in range(1, n_jobs):
+            file.seek(max(k * size // n_jobs, bounds[-1]))
+            file.readline()
+            bounds.append(max(file.tell(), bounds[-1]))
+
+        bounds.append(size)
+
+    def read_range(start, stop):
+        with open(filepath, "rb") as file:
+            file.seek(start)
+            data = header + file.read(stop - start)
+
+        return pd.read_csv(
+            io.BytesIO(data), usecols=columns, dtype=dtypes, engine=engine, **kwargs
+        )
+
+    ranges = [
+        (start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+    ] or [(bounds[0], size)]
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        parts = list(executor.map(lambda bound: read_range(*bound), ranges))
+
+    data = pd.concat(parts, ignore_index=True)
+
+    for name in categories:
+        if name in data.columns:
+            data[name] = data[name].astype("category")
+
+    return data
+
+
+def read_columns(filepath):
+    """Reads the column names of a CSV, Parquet or Arrow file, without
+    reading its data.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to a CSV, Parquet or Arrow file.
+
+    Returns
+    -------
+    list of str
+        The column names.
+    """
+
+    file_format = get_file_format(filepath)
+
+    if file_format == "parquet":
+
+        from pyarrow import parquet
+
+        return list(parquet.read_schema(filepath).names)
+
+    if file_format == "arrow":
+        return list(_open_arrow(filepath).schema.names)
+
+    return list(pd.read_csv(filepath, nrows=0).columns)
+
+
+def get_columnar_copy(
+    filepath, destination=None, row_group_size=1_000_000, dtypes=None
+):
+    """Returns a Parquet copy of a CSV file, converting it on first use.
+
+    The CSV file is streamed in blocks into the row groups of the copy, so
+    it is never fully held in memory. The types of the columns without
+    declared dtypes are inferred from the first block, with integers read
+    as float64, as later blocks may hold decimals. The copy is rebuilt
+    when the CSV file is newer. It is written to a temporary file and
+    renamed, so readers never see a partial copy.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the CSV file.
+    destination : str, optional
+        Path to the Parquet copy, by default the CSV path with the\
+        ``.parquet`` extension.
+    row_group_size : int, optional
+        Number of rows of each row group, by default 1_000_000
+    dtypes : dict, optional
+        The dtype of each column, by name. Numeric dtypes that can not\
+        parse the first rows, as for label columns, are inferred instead.
+
+    Returns
+    -------
+    str
+        Path to the Parquet copy.
+    """
 
     if destination is None:
-        destination = get_filename_from_url(url)
+        destination = os.path.splitext(filepath)[0] + ".parquet"
+
+    if os.path.isfile(destination) and os.path.getmtime(
+        destination
+    ) >= os.path.getmtime(filepath):
+        return destination
+
+    from pyarrow import csv, parquet
+
+    columns = set(read_columns(filepath))
+    dtypes = {name: dtype for name, dtype in (dtypes or {}).items() if name in columns}
+
+    numeric = {
+        name: dtype
+        for name, dtype in dtypes.items()
+        if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype))
+    }
+
+    unparsed = _check_numeric_dtypes(filepath, numeric)
+
+    column_types = _get_arrow_types(
+        {name: dtype for name, dtype in dtypes.items() if name not in unparsed}
+    )
+
+    reader = csv.open_csv(
+        filepath, convert_options=csv.ConvertOptions(column_types=column_types)
+    )
+
+    widened = _widen_arrow_types(reader.schema, column_types)
+
+    if widened:
+        reader.close()
+
+        reader = csv.open_csv(
+            filepath,
+            convert_options=csv.ConvertOptions(
+                column_types={**column_types, **widened}
+            ),
+        )
+
+    temporary = f"{destination}.{os.getpid()}.tmp"
+
+    try:
+        with parquet.ParquetWriter(temporary, reader.schema) as writer:
+            batches = []
+            n_rows = 0
+
+            for batch in reader:
+                batches.append(batch)
+                n_rows += batch.num_rows
+
+                if n_rows >= row_group_size:
+                    _write_row_groups(writer, batches, row_group_size)
+                    batches = []
+                    n_rows = 0
+
+            if batches:
+                _write_row_groups(writer, batches, row_group_size)
+
+        os.replace(temporary, destination)
+
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    return destination
+
+
+def _write_row_groups(writer, batches, row_group_size):
+    """Writes record batches into row groups of a Parquet writer."""
+
+    import pyarrow
+
+    writer.write_table(
+        pyarrow.Table.from_batches(batches), row_group_size=row_group_size
+    )
+
+
+def _widen_arrow_types(schema, column_types):
+    """Returns float64 for the columns without declared types inferred as\
+    integers, and strings for the ones inferred as null, from the first\
+    block of a CSV file, so the values of the later blocks still fit."""
+
+    import pyarrow
+
+    widened = {}
+
+    for field in schema:
+        if field.name in column_types:
+            continue
+
+        if pyarrow.types.is_integer(field.type):
+            widened[field.name] = pyarrow.float64()
+
+        elif pyarrow.types.is_null(field.type):
+            widened[field.name] = pyarrow.string()
+
+    return widened
+
+
+def _get_arrow_types(dtypes):
+    """Converts numeric and category dtypes into Arrow column types."""
+
+    import pyarrow
+
+    types = {}
+
+    for name, dtype in dtypes.items():
+        dtype = pd.api.types.pandas_dtype(dtype)
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            types[name] = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+
+        elif pd.api.types.is_numeric_dtype(dtype):
+            types[name] = pyarrow.from_numpy_dtype(dtype)
+
+    return types
+
+
+def _open_arrow(filepath, memory_map=True):
+    """Opens an Arrow IPC file as a dataset, memory-mapped or not, whose\
+    columns and rows are selected before they are read."""
+
+    from pyarrow import dataset, fs
+
+    return dataset.dataset(
+        os.path.abspath(filepath),
+        format="arrow",
+        filesystem=fs.LocalFileSystem(use_mmap=memory_map),
+    )
+
+
+def _read_arrow(filepath, columns=None, filters=None, memory_map=True):
+    """Reads the selected columns and rows of an Arrow IPC file into\
+    a table, memory-mapped or not."""
+
+    expression = None
+
+    if filters is not None:
+        from pyarrow import parquet
+
+        expression = parquet.filters_to_expression(filters)
+
+    return _open_arrow(filepath, memory_map).to_table(
+        columns=columns, filter=expression
+    )
+
+
+class ChunkWriter:
+    """
+    ChunkWriter.
+
+    Writes a sequence of dataframes with the same columns incrementally
+    to a single CSV, Parquet or Arrow file. Use it as a context manager.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the output file. The format is inferred from the extension.
+    index : bool, optional
+        Whether the dataframe index is written, by default False
+    empty : pd.DataFrame, optional
+        The dataframe written when no chunk is, so the file still holds\
+        the output columns. By default, no file is written then.
+    """
+
+    def __init__(self, filepath, index=False, empty=None):
+        self.filepath = filepath
+        self.index = index
+        self.empty = empty
+        self.file_format = get_file_format(filepath)
+        self.n_rows = 0
+        self.__writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is not None:
+            self.empty = None
+        self.close()
+
+    def write(self, dataframe):
+        """Appends a dataframe to the output file.
+
+        Parameters
+        ----------
+        dataframe : pd.DataFrame
+            A chunk of the output data.
+        """
+
+        if self.file_format in ("parquet", "arrow"):
+
+            import pyarrow
+            from pyarrow import ipc, parquet
+
+            table = pyarrow.Table.from_pandas(dataframe, preserve_index=self.index)
+
+            if self.__writer is None and self.file_format == "parquet":
+                self.__writer = parquet.ParquetWriter(self.filepath, table.schema)
+
+            elif self.__writer is None:
+                self.__writer = ipc.new_file(self.filepath, table.schema)
+
+            self.__writer.write_table(table)
+
+        else:
+            dataframe.to_csv(
+                self.filepath,
+                mode="w" if self.n_rows == 0 else "a",
+                header=self.n_rows == 0,
+                index=self.index,
+            )
+
+        self.n_rows += len(dataframe)
+
+    def close(self):
+        """Finishes the output file."""
 
-    r = requests.get(url, allow_redirects=True)
+        if self.n_rows == 0 and self.__writer is None and self.empty is not None:
+            empty, self.empty = self.empty, None
+            self.write(empty.iloc[:0])
 
-    with open(destination, "wb") as file:
-        file.write(r.content)
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
@@ -0,0 +1,278 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+POOL_SIZE = 16
+
+TIMEOUT = 60
+
+PARTIAL_SUFFIX = ".part"
+
+METADATA_SUFFIX = ".download.json"
+
+_session = None
+
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the HTTP session shared by the downloads, so their
+    connections are pooled and reused.
+
+    Returns
+    -------
+    requests.Session
+        The session, created on first use.
+    """
+
+    global _session
+
+    with _session_lock:
+
+        if _session is None:
+
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+    return _session
+
+
+def download_file(
+    url,
+    destination=None,
+    checksum=None,
+    resume=True,
+    chunk_size=CHUNK_SIZE,
+    session=None,
+):
+    """Downloads a file, streaming it to disk, unless the local copy is
+    up to date.
+
+    The body is written chunk by chunk to a partial file that is renamed
+    to the destination once complete, so the destination is never left
+    half written. The ETag, Last-Modified date and SHA-256 digest of each
+    download are kept next to it, so later calls send a conditional request
+    and keep the file when the server answers that it is unchanged, or skip
+    the request when the expected checksum matches. Interrupted downloads
+    resume from the partial file when the server supports ranges.
+
+    Parameters
+    ----------
+    url : str
+        The file URL.
+    destination : str, optional
+        The local path, by default the file name of the URL.
+    checksum : str, optional
+        The expected SHA-256 digest, in hexadecimal, optionally prefixed\
+        by ``sha256:``.
+    resume : bool, optional
+        Whether an interrupted download is resumed, by default True
+    chunk_size : int, optional
+        Number of bytes of each written chunk, by default CHUNK_SIZE
+    session : requests.Session, optional
+        The HTTP session, by default the shared one.
+
+    Returns
+    -------
+    str
+        The local path.
+
+    Raises
+    ------
+    ValueError
+        If the downloaded file does not match the checksum.
+    requests.HTTPError
+        If the server answers with an error.
+    """
+
+    if destination is None:
+        destination = url.split("/")[-1]
+
+    if session is None:
+        session = get_session()
+
+    if checksum is not None:
+        checksum = checksum.lower().split(":")[-1]
+
+    metadata = _read_metadata(destination)
+
+    if metadata.get("url") != url:
+        metadata = {}
+
+    if (
+        checksum is not None
+        and metadata.get("sha256") == checksum
+        and os.path.isfile(destination)
+    ):
+        return destination
+
+    headers = {}
+
+    if metadata and os.path.isfile(destination):
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+    partial = destination + PARTIAL_SUFFIX
+    partial_metadata = _read_metadata(partial)
+
+    offset = 0
+
+    if (
+        resume
+        and os.path.isfile(partial)
+        and partial_metadata.get("url") == url
+        and (partial_metadata.get("etag") or partial_metadata.get("last_modified"))
+    ):
+        offset = os.path.getsize(partial)
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = partial_metadata.get("etag") or partial_metadata.get(
+            "last_modified"
+        )
+
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+
+        if response.status_code == 304:
+            logger.debug("%s is up to date with %s.", destination, url)
+            return destination
+
+        if response.status_code == 416 and offset > 0:
+            logger.info("The partial download of %s can not be resumed.", url)
+            _remove(partial)
+            _remove(partial + METADATA_SUFFIX)
+
+            return download_file(
+                url,
+                destination,
+                checksum=checksum,
+                resume=False,
+                chunk_size=chunk_size,
+                session=session,
+            )
+
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+
+        if response.status_code == 206:
+            with open(partial, "rb") as file:
+                for chunk in iter(lambda: file.read(chunk_size), b""):
+                    digest.update(chunk)
+            mode = "ab"
+
+        else:
+            offset = 0
+            mode = "wb"
+
+        metadata = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+        directory = os.path.dirname(os.path.abspath(destination))
+        os.makedirs(directory, exist_ok=True)
+
+        if offset == 0:
+            _write_metadata(partial, metadata)
+
+        with open(partial, mode) as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                file.write(chunk)
+                digest.update(chunk)
+
+    metadata["sha256"] = digest.hexdigest()
+
+    if checksum is not None and metadata["sha256"] != checksum:
+        _remove(partial)
+        _remove(partial + METADATA_SUFFIX)
+        raise ValueError(
+            f"The checksum of {url} is {metadata['sha256']}, not {checksum}."
+        )
+
+    os.replace(partial, destination)
+    _remove(partial + METADATA_SUFFIX)
+    _write_metadata(destination, metadata)
+
+    return destination
+
+
+def download_files(downloads, n_jobs=4, **kwargs):
+    """Downloads several files concurrently over the shared session.
+
+    Parameters
+    ----------
+    downloads : list of str or dict
+        The URLs, or dicts with the ``url`` and, optionally, the\
+        ``destination`` and ``checksum`` of each file.
+    n_jobs : int, optional
+        Number of concurrent downloads, by default 4. Negative values count\
+        back from the number of processors, so -1 means one per processor.
+    **kwargs
+        Extra arguments passed to :func:`download_file`.
+
+    Returns
+    -------
+    list of str
+        The local paths, in the order of the downloads.
+    """
+
+    downloads = [
+        {"url": download} if isinstance(download, str) else download
+        for download in downloads
+    ]
+
+    if not downloads:
+        return []
+
+    def download(options):
+        return download_file(**options, **kwargs)
+
+    if n_jobs < 0:
+        n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+
+    with ThreadPoolExecutor(max_workers=min(n_jobs, len(downloads))) as executor:
+        return list(executor.map(download, downloads))
+
+
+def _read_metadata(filepath):
+    """Reads the download metadata kept next to a file."""
+
+    try:
+        with open(filepath + METADATA_SUFFIX, "r") as file:
+            return json.load(file)
+
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_metadata(filepath, metadata):
+    """Writes the download metadata next to a file, atomically."""
+
+    temporary = f"{filepath}{METADATA_SUFFIX}.{os.getpid()}.tmp"
+
+    with open(temporary, "w") as file:
+        json.dump(metadata, file)
+
+    os.replace(temporary, filepath + METADATA_SUFFIX)
+
+
+def _remove(filepath):
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
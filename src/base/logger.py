@@ -1,7 +1,218 @@
+import queue
+import atexit
+import random
 import logging
+import threading
+import logging.handlers
 
-if __name__ != "__main__":
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="\n(%(asctime)s)\n[%(levelname)s] %(message)s",
-    )
+FORMAT = "\n(%(asctime)s)\n[%(levelname)s] %(message)s"
+
+_listener = None
+
+_handlers = []
+
+_levels = []
+
+_filters = []
+
+
+def configure_logging(
+    level: int or str = logging.INFO,
+    format: str = FORMAT,
+    levels: dict = None,
+    non_blocking: bool = False,
+    filename: str = None,
+    handlers: list = None,
+    rate_limits: dict = None,
+    sample_rates: dict = None,
+) -> None:
+    """
+    Configures the root logger. Importing this module no longer does it,
+    so libraries and workers importing the package keep their own logging
+    setup; applications call this function once at startup. Calling it
+    again replaces the handlers, logger levels and filters it installed
+    before.
+
+    Parameters
+    ----------
+    level : int or str, default=logging.INFO
+        The root logger level.
+    format : str, default=FORMAT
+        The log record format.
+    levels : dict, optional
+        The levels of some loggers, by name, as\
+        ``{"src.model.preprocessing": "INFO", "urllib3": "WARNING"}``.
+    non_blocking : bool, default=False
+        Whether the records are put in a queue and written by a background\
+        thread, so the logging calls never wait for the output. The queue\
+        is flushed at exit and by :func:`stop_logging`.
+    filename : str, optional
+        A file the records are appended to, instead of the standard error.
+    handlers : list of logging.Handler, optional
+        The handlers that write the records, instead of the default one.\
+        Handlers without a formatter get ``format``.
+    rate_limits : dict, optional
+        The minimum number of seconds between two records of the same call\
+        site, by logger name. The records in between are dropped, and\
+        counted in the next one. Filters only apply to the records of\
+        their own logger, not of its children.
+    sample_rates : dict, optional
+        The fraction of the records kept, by logger name, as\
+        ``{"src.model.preprocessing.batches": 0.01}``.
+    """
+
+    stop_logging()
+
+    root = logging.getLogger()
+
+    for handler in _handlers:
+        root.removeHandler(handler)
+
+    _handlers.clear()
+
+    for name in _levels:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+    _levels.clear()
+
+    for logger, old_filter in _filters:
+        logger.removeFilter(old_filter)
+
+    _filters.clear()
+
+    if handlers is None:
+        if filename is None:
+            handlers = [logging.StreamHandler()]
+        else:
+            handlers = [logging.FileHandler(filename)]
+
+    formatter = logging.Formatter(format)
+
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+
+    if non_blocking:
+        global _listener
+
+        records = queue.SimpleQueue()
+
+        _listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+        handlers = [logging.handlers.QueueHandler(records)]
+
+    for handler in handlers:
+        root.addHandler(handler)
+        _handlers.append(handler)
+
+    root.setLevel(level)
+
+    for name, logger_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+        _levels.append(name)
+
+    for name, interval in (rate_limits or {}).items():
+        _replace_filter(logging.getLogger(name), RateLimitFilter(interval))
+
+    for name, rate in (sample_rates or {}).items():
+        _replace_filter(logging.getLogger(name), SamplingFilter(rate))
+
+
+def stop_logging() -> None:
+    """Writes the queued records and stops the background writer of\
+    a non-blocking configuration, if any. The later records are written\
+    by its handlers in the logging thread."""
+
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+        root = logging.getLogger()
+
+        for handler in _handlers:
+            root.removeHandler(handler)
+
+        _handlers[:] = _listener.handlers
+
+        for handler in _handlers:
+            root.addHandler(handler)
+
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    RateLimitFilter.
+
+    Keeps at most one record per call site every ``interval`` seconds, as
+    for the messages logged for every batch. The next record kept tells
+    how many were dropped.
+
+    Parameters
+    ----------
+    interval : float
+        The minimum number of seconds between two records of a call site.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__()
+        self.interval = interval
+        self.__sites = {}
+        self.__lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+
+        site = (record.pathname, record.lineno)
+
+        with self.__lock:
+            last, dropped = self.__sites.get(site, (None, 0))
+
+            if last is not None and record.created - last < self.interval:
+                self.__sites[site] = (last, dropped + 1)
+                return False
+
+            self.__sites[site] = (record.created, 0)
+
+        if dropped:
+            record.msg = f"{record.getMessage()} ({dropped} similar records dropped)"
+            record.args = None
+
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    SamplingFilter.
+
+    Keeps a random fraction of the records.
+
+    Parameters
+    ----------
+    rate : float
+        The probability of keeping each record, between 0 and 1.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def _replace_filter(logger: logging.Logger, new: logging.Filter) -> None:
+    """Adds a filter to a logger, removing its filters of the same class."""
+
+    for old in list(logger.filters):
+        if type(old) is type(new):
+            logger.removeFilter(old)
+
+    logger.addFilter(new)
+    _filters.append((logger, new))
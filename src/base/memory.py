@@ -0,0 +1,89 @@
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+@contextmanager
+def trace_memory(report: dict, nbytes: int = None):
+    """Measures the memory allocated inside the context with tracemalloc.
+
+    numpy reports its data buffers to tracemalloc, so array copies are
+    included. On exit, the report is updated with the peak and the retained
+    traced memory, in bytes, relative to the start of the context. When the
+    size of the processed data is known, the peak is also expressed as a
+    number of copies of it. Contexts can be nested: the peak of an enclosing
+    context includes the peaks of the contexts inside it.
+
+    The traced peak is shared by the whole process, so the peaks of
+    contexts open at the same time on several threads include each other's
+    allocations. Measure the threaded work as a whole, or serially.
+
+    Parameters
+    ----------
+    report : dict
+        Dictionary to be updated with the measurements.
+    nbytes : int, optional
+        Size of the processed data, in bytes, by default None
+
+    Yields
+    ------
+    dict
+        The report dictionary.
+    """
+
+    started = not tracemalloc.is_tracing()
+
+    if started:
+        tracemalloc.start()
+
+    _reset_peak()
+
+    start, _ = tracemalloc.get_traced_memory()
+
+    frame = {"peak": start}
+
+    frames = _get_frames()
+    frames.append(frame)
+
+    try:
+        yield report
+
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+
+        for i, open_frame in enumerate(frames):
+            if open_frame is frame:
+                del frames[i]
+                break
+
+        peak = max(peak, frame["peak"])
+
+        if started:
+            tracemalloc.stop()
+
+        report.update(peak_bytes=peak - start, retained_bytes=current - start)
+
+        if nbytes:
+            report.update(peak_copies=(peak - start) / nbytes)
+
+
+def _reset_peak():
+    """Resets the traced peak, handing it first to the open contexts."""
+
+    _, peak = tracemalloc.get_traced_memory()
+
+    for frame in _get_frames():
+        frame["peak"] = max(frame["peak"], peak)
+
+    tracemalloc.reset_peak()
+
+
+def _get_frames():
+    """Returns the open contexts of the calling thread."""
+
+    if not hasattr(_local, "frames"):
+        _local.frames = []
+
+    return _local.frames
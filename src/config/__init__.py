@@ -1,13 +1,231 @@
+import os
+import copy
 import yaml
 from io import StringIO
+from collections.abc import Mapping, Sequence
+
+COMPACT_DTYPES = {
+    "int": "integer",
+    "integer": "integer",
+    "float": "float32",
+    "category": "category",
+    "categorical": "category",
+}
+
+
+_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_configs = {}
+
+SKEW_THRESHOLD = 1.0
+
+MAX_ONEHOT_CATEGORIES = 50
+
+N_BINS = 10
+
+DEFAULT_VALUES = {
+    "active": True,
+    "type": "float",
+    "limits": (None, None),
+    "transformation": "identity",
+    "imputation_strategy": "mean",
+    "imputation_param": None,
+    "scaler": None,
+    "weight": 1,
+    "encode": None,
+}
+
+
+class FeatureSpec(Mapping):
+    """
+    FeatureSpec.
+
+    The read-only configuration of a feature. It is a mapping of the
+    configured keys, in order, with ``active`` always set, and exposes the
+    values of the known keys, or their defaults, as attributes.
+
+    Parameters
+    ----------
+    config : dict
+        The feature configuration, as an item of ``config/features.yaml``.
+    """
+
+    __slots__ = ("_config",) + tuple(["name", "dtype"] + list(DEFAULT_VALUES))
+
+    def __init__(self, config: dict):
+        config = copy.deepcopy(dict(config))
+        config.setdefault("active", True)
+
+        set_attribute = object.__setattr__
+
+        set_attribute(self, "_config", config)
+        set_attribute(self, "name", config["name"])
+
+        for key, default in DEFAULT_VALUES.items():
+            set_attribute(self, key, config.get(key, default))
+
+        set_attribute(self, "dtype", COMPACT_DTYPES.get(str(self.type), str(self.type)))
+
+    def __repr__(self):
+        return f"FeatureSpec({self._config!r})"
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FeatureSpec is immutable.")
+
+    def __reduce__(self):
+        return type(self), (self._config,)
+
+    def __getitem__(self, key):
+        return self._config[key]
+
+    def __iter__(self):
+        return iter(self._config)
+
+    def __len__(self) -> int:
+        return len(self._config)
+
+
+class FeatureRegistry(Sequence):
+    """
+    FeatureRegistry.
+
+    The compiled, read-only features configuration, as returned by
+    :func:`get_config`. It is a sequence of :class:`FeatureSpec` in the
+    configured order, so it can be used wherever a features configuration
+    is expected, and is also indexed by feature name. The active features
+    are resolved once, when it is built.
+
+    Parameters
+    ----------
+    features_config : list of dict
+        The features configuration, as in ``config/features.yaml``.
+    """
+
+    __slots__ = ("_specs", "_index", "_active")
+
+    def __init__(self, features_config: list):
+        specs = tuple(
+            config if isinstance(config, FeatureSpec) else FeatureSpec(config)
+            for config in features_config
+        )
+
+        set_attribute = object.__setattr__
+
+        set_attribute(self, "_specs", specs)
+        set_attribute(self, "_index", {spec.name: spec for spec in specs})
+        set_attribute(self, "_active", tuple(spec for spec in specs if spec.active))
+
+    def __repr__(self):
+        return (
+            f"FeatureRegistry(n_features={len(self._specs)}, "
+            f"n_active={len(self._active)})"
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FeatureRegistry is immutable.")
+
+    def __reduce__(self):
+        return type(self), (self._specs,)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._index[key]
+        return self._specs[key]
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, key) -> bool:
+        if isinstance(key, str):
+            return key in self._index
+        return key in self._specs
+
+    def get(self, name: str, default=None) -> FeatureSpec:
+        """Returns the spec of a feature, or ``default`` when it is not\
+        configured."""
+        return self._index.get(name, default)
+
+    def select(self, only_actives: bool = True) -> tuple:
+        """Returns the specs of the active features, or of all of them."""
+        return self._active if only_actives else self._specs
+
+    def to_list(self) -> list:
+        """Returns the configuration as a new list of dicts."""
+        return [copy.deepcopy(dict(spec)) for spec in self._specs]
 
 
 def get_config(filename):
+    """Reads a YAML config file, parsed with the C loader of PyYAML when it
+    is available. A features configuration, a list of features with their
+    names, is compiled into a :class:`FeatureRegistry`. The result is cached
+    until the file changes, so each call on the same file returns the same
+    registry, or a copy of other configs."""
+
+    path = os.path.abspath(filename)
+    status = os.stat(path)
+    version = (status.st_mtime_ns, status.st_size)
+
+    cached = _configs.get(path)
+
+    if cached is None or cached[0] != version:
+        with open(path, "r") as file:
+            settings = yaml.load(file, Loader=_LOADER)
+
+        if _is_features_config(settings):
+            settings = FeatureRegistry(settings)
+
+        cached = _configs[path] = (version, settings)
+
+    settings = cached[1]
+
+    if isinstance(settings, FeatureRegistry):
+        return settings
+
+    return copy.deepcopy(settings)
+
+
+def _is_features_config(settings) -> bool:
+    return (
+        isinstance(settings, list)
+        and len(settings) > 0
+        and all(isinstance(config, dict) and "name" in config for config in settings)
+    )
+
+
+def _select(features_config, only_actives=True):
+    """Returns the specs of a registry, or the configs of a plain list, of\
+    the active features or of all of them. Plain lists are read in place,\
+    without compiling a registry."""
+
+    if isinstance(features_config, FeatureRegistry):
+        return features_config.select(only_actives)
+
+    return [
+        config
+        for config in features_config
+        if not only_actives or config.get("active", True)
+    ]
+
 
-    with open(filename, "r") as file:
-        settings = yaml.safe_load(file)
+def _get_values(features_config, key, only_actives=True):
+    """Maps the names of the selected features to the value of a key of\
+    their configs, or its default."""
 
-    return settings
+    if isinstance(features_config, FeatureRegistry):
+        return {
+            spec.name: getattr(spec, key)
+            for spec in features_config.select(only_actives)
+        }
+
+    default = DEFAULT_VALUES[key]
+
+    return {
+        config["name"]: config.get(key, default)
+        for config in _select(features_config, only_actives)
+    }
 
 
 def set_default_values(dictionary, key, default):
@@ -19,114 +237,61 @@ def set_default_values(dictionary, key, default):
 
 def get_feature_status(features_config):
 
-    features_config = list(
-        filter(lambda x: x["active"] if "active" in x else True, features_config)
-    )
-
-    return {
-        params["name"]: set_default_values(params, "active", True)
-        for params in features_config
-    }
+    return _get_values(features_config, "active")
 
 
 def get_feature_names(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return [elem["name"] for elem in features_config]
+    return [config["name"] for config in _select(features_config, only_actives)]
 
 
 def get_feature_limits(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
     return {
-        params["name"]: set_default_values(params, "limits", [None, None])
-        for params in features_config
+        name: list(limits)
+        for name, limits in _get_values(features_config, "limits", only_actives).items()
     }
 
 
 def get_feature_transformations(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return {
-        params["name"]: set_default_values(params, "transformation", "identity")
-        for params in features_config
-    }
+    return _get_values(features_config, "transformation", only_actives)
 
 
 def get_feature_types(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return {
-        params["name"]: set_default_values(params, "type", "float")
-        for params in features_config
-    }
+    return _get_values(features_config, "type", only_actives)
 
 
 def get_feature_imputation_strategy(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return {
-        params["name"]: set_default_values(params, "imputation_strategy", "mean")
-        for params in features_config
-    }
+    return _get_values(features_config, "imputation_strategy", only_actives)
 
 
 def get_feature_imputation_params(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return {
-        params["name"]: set_default_values(params, "imputation_param", None)
-        for params in features_config
-    }
+    return _get_values(features_config, "imputation_param", only_actives)
 
 
 def get_feature_scalers(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
-
-    return {
-        params["name"]: set_default_values(params, "scaler", None)
-        for params in features_config
-    }
+    return _get_values(features_config, "scaler", only_actives)
 
 
 def get_feature_weights(features_config, only_actives=True):
 
-    if only_actives:
-        features_config = list(
-            filter(lambda x: x["active"] if "active" in x else True, features_config)
-        )
+    return _get_values(features_config, "weight", only_actives)
+
+
+def get_feature_dtypes(features_config, only_actives=True):
+    """Maps the feature types to compact dtypes: 'int' becomes the smallest
+    integer dtype that holds the values ('integer'), 'float' becomes
+    float32 and 'category' a pandas categorical. Other types, as 'float64'
+    or 'int16', are taken as dtype names."""
 
     return {
-        params["name"]: set_default_values(params, "weight", 1)
-        for params in features_config
+        name: COMPACT_DTYPES.get(str(dtype), str(dtype))
+        for name, dtype in _get_values(features_config, "type", only_actives).items()
     }
 
 
@@ -139,26 +304,123 @@ def get_column_type(series):
     return dtype
 
 
+def propose_feature_config(name, statistics):
+    """Proposes the configuration of a feature from the statistics of its
+    column, as computed by ``src.model.summary.summarize_dataset``.
+
+    Categorical columns are encoded, one-hot up to ``MAX_ONEHOT_CATEGORIES``
+    categories and by frequency otherwise. Numeric columns are imputed with
+    the mean, or the median when skewed, clipped to their range, or to their
+    1% and 99% quantiles when skewed, and scaled. Skewed non-negative columns
+    are transformed with ``log1p``, or ``sqrt`` when moderately skewed, and
+    heavy-tailed columns with negative values are discretized by quantiles
+    instead. Binary columns are only imputed and clipped.
+
+    Parameters
+    ----------
+    name : str
+        The feature name.
+    statistics : dict or pd.Series
+        The statistics of the column.
+
+    Returns
+    -------
+    dict
+        The feature configuration.
+    """
+
+    config = {"name": name, "active": True, "type": statistics["type"]}
+
+    if statistics["type"] == "category":
+        if statistics["cardinality"] <= MAX_ONEHOT_CATEGORIES:
+            config["encode"] = "onehot"
+        else:
+            config["encode"] = "frequency"
+        return config
+
+    if not statistics["count"]:
+        config["active"] = False
+        return config
+
+    skew = statistics["skew"]
+    skewed = abs(skew) > SKEW_THRESHOLD
+    binary = statistics["cardinality"] <= 2
+
+    config["imputation_strategy"] = "median" if skewed else "mean"
+
+    if skewed and not binary:
+        limits = [statistics["q01"], statistics["q99"]]
+    else:
+        limits = [statistics["min"], statistics["max"]]
+
+    config["limits"] = [_round(limit) for limit in limits]
+
+    if binary:
+        return config
+
+    if skew > SKEW_THRESHOLD and limits[0] >= 0:
+        config["transformation"] = "log1p"
+
+    elif skew > SKEW_THRESHOLD / 2 and limits[0] >= 0:
+        config["transformation"] = "sqrt"
+
+    elif abs(skew) > 2 * SKEW_THRESHOLD and statistics["cardinality"] > N_BINS:
+        config["discretizer"] = f"quantile:{N_BINS}"
+
+    if skewed and "transformation" not in config:
+        config["scaler"] = "robust"
+    else:
+        config["scaler"] = "standard"
+
+    return config
+
+
 def column_properties(series):
 
-    results = dict(
-        name=series.name,
-        active=True,
-        type=get_column_type(series),
-        limits="[left(]" + str([series.min(), series.max()]) + "[right]",
-        transformation="identity",
-        imputation_strategy="mean",
-        imputation_param=None,
-        scaler="min_max",
-        weight=1,
-    )
+    from src.model.summary import summarize_dataset
+
+    statistics = summarize_dataset(series.to_frame()).iloc[0]
+
+    return propose_feature_config(series.name, statistics)
+
+
+def init_config_file(source, filename, chunksize=100_000, columns=None, n_jobs=None):
+    """Writes a features configuration proposed from the statistics of a
+    dataset, computed in a single pass over its chunks.
+
+    Parameters
+    ----------
+    source : str or pd.DataFrame
+        Path to a CSV, Parquet or Arrow file, or a dataframe.
+    filename : str
+        Path to the written YAML file.
+    chunksize : int, optional
+        Number of rows of each chunk, by default 100_000
+    columns : list of str, optional
+        Columns to be configured, by default all the columns.
+    n_jobs : int, optional
+        Number of threads that compute the statistics, by default 1.
 
-    return results
+    Returns
+    -------
+    pd.DataFrame
+        The statistics of each column.
+    """
 
+    from src.model.summary import summarize_dataset
 
-def init_config_file(dataframe, filename):
+    summary = summarize_dataset(
+        source, chunksize=chunksize, columns=columns, n_jobs=n_jobs
+    )
+
+    data = [
+        propose_feature_config(name, statistics)
+        for name, statistics in summary.iterrows()
+    ]
 
-    data = [column_properties(dataframe[col]) for col in dataframe.columns]
+    for config in data:
+        if "limits" in config:
+            config["limits"] = "[left(]" + str(config["limits"]) + "[right]"
 
     string_stream = StringIO()
 
@@ -176,3 +438,14 @@ def init_config_file(dataframe, filename):
 
     with open(filename, "w") as outfile:
         outfile.write(main_string)
+
+    return summary
+
+
+def _round(value):
+    """Rounds a statistic to 6 significant digits, as a Python number."""
+
+    if value is None or value != value:
+        return None
+
+    return float(f"{value:.6g}")
@@ -1,3 +1,76 @@
-from src.base.commons import get_last_git_tag
+import os
+import logging
+import functools
 
-__version__ = get_last_git_tag()
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+VERSION_FILE = os.path.join(os.path.dirname(__file__), "VERSION")
+
+UNKNOWN_VERSION = "0+unknown"
+
+
+@functools.lru_cache(maxsize=None)
+def get_version() -> str:
+    """
+    Gets the package version, computed once on first use.
+
+    The version is read from the ``VERSION`` file written at build time by
+    :func:`write_version_file`. Without that file, as in a development
+    checkout, the latest git tag is used. When neither is available, as
+    in an image without the ``.git`` directory, ``UNKNOWN_VERSION``
+    is returned.
+
+    Returns
+    -------
+    str
+        The package version.
+    """
+
+    if os.path.isfile(VERSION_FILE):
+        with open(VERSION_FILE, "r") as file:
+            return file.read().strip()
+
+    from src.base.commons import get_last_git_tag
+
+    try:
+        return get_last_git_tag()
+
+    except Exception as error:
+        logger.warning(f"Unable to get the version from git: {error}")
+        return UNKNOWN_VERSION
+
+
+def write_version_file(version: str = None) -> str:
+    """
+    Writes the ``VERSION`` file read by :func:`get_version`. It should be
+    called when building images or packages, where ``.git`` is not shipped.
+
+    Parameters
+    ----------
+    version : str, optional
+        The version to write, by default the latest git tag.
+
+    Returns
+    -------
+    str
+        The written version.
+    """
+
+    if version is None:
+        from src.base.commons import get_last_git_tag
+
+        version = get_last_git_tag()
+
+    with open(VERSION_FILE, "w") as file:
+        file.write(f"{version}\n")
+
+    get_version.cache_clear()
+
+    return version
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        return get_version()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
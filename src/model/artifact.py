@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import os
+import json
+import struct
+import zipfile
+import datetime
+import numpy as np
+import typing
+from src.model.engine import (
+    Program,
+    ProgramStep,
+    Operation,
+    FillOperation,
+    ClipOperation,
+    UfuncOperation,
+    ExpressionOperation,
+    MultiplyOperation,
+    MultiplyAddOperation,
+    SubtractDivideOperation,
+    DiscretizeOperation,
+    to_buffer,
+)
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+
+FORMAT = "ml-template-preprocessor"
+FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+PARAMETERS_FILE = "parameters.npz"
+
+OPERATIONS = {
+    operation.__name__: operation
+    for operation in (
+        FillOperation,
+        ClipOperation,
+        UfuncOperation,
+        ExpressionOperation,
+        MultiplyOperation,
+        MultiplyAddOperation,
+        SubtractDivideOperation,
+        DiscretizeOperation,
+    )
+}
+
+
+class Artifact:
+    """
+    Artifact.
+
+    A fitted preprocessor loaded from disk. It runs the compiled program
+    with numpy only, so serving it needs neither scikit-learn nor the
+    features configuration. Use :func:`load_artifact` to create it.
+
+    Parameters
+    ----------
+    program : Program
+        The compiled transformation.
+    metadata : dict
+        The content of the artifact metadata file.
+    """
+
+    def __repr__(self):
+        return f"Artifact(version={self.version!r}, n_features={len(self.features)})"
+
+    def __init__(self, program: Program, metadata: dict):
+
+        self.program = program
+        self.metadata = metadata
+        self.features = list(metadata["features"])
+        self.output_features = list(metadata.get("output_features", self.features))
+        self.version = metadata["version"]
+        self.__record_function = None
+
+    def run(self, X: np.ndarray, n_jobs: int = None) -> np.ndarray:
+        """Transforms an array whose columns follow ``self.features``.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Data of shape (n_samples, n_features).
+        n_jobs : int, optional
+            Number of threads over blocks of rows, by default 1.
+
+        Returns
+        -------
+        np.ndarray
+            The transformed data.
+        """
+        return self.program.run(to_buffer(X), n_jobs=n_jobs)
+
+    def transform(self, X: pd.DataFrame, n_jobs: int = None) -> pd.DataFrame:
+        """Transforms the features of a dataframe.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Data with, at least, the columns in ``self.features``.
+        n_jobs : int, optional
+            Number of threads over blocks of rows, by default 1.
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed features.
+        """
+        return self.program.transform(
+            X,
+            columns=self.features,
+            n_jobs=n_jobs,
+            output_columns=self.output_features,
+        )
+
+    def transform_record(self, record: dict) -> dict:
+        """Transforms a single record, for online inference.
+
+        Parameters
+        ----------
+        record : dict
+            The feature values by name. Missing features and None\
+            values are taken as missing values.
+
+        Returns
+        -------
+        dict
+            The transformed values.
+        """
+
+        if self.__record_function is None:
+            self.__record_function = self.program.compile_record(
+                self.features, output_columns=self.output_features
+            )
+
+        return self.__record_function(record)
+
+    def transform_records(self, records: typing.Iterable[dict]) -> typing.List[dict]:
+        """Transforms a sequence of records, for online inference.
+
+        Parameters
+        ----------
+        records : iterable of dict
+            The feature values of each record by name.
+
+        Returns
+        -------
+        list of dict
+            The transformed values of each record.
+        """
+
+        return [self.transform_record(record) for record in records]
+
+
+def save_artifact(
+    program: Program,
+    path: str,
+    features: typing.List[str],
+    version: str = None,
+    output_features: typing.List[str] = None,
+) -> None:
+    """Saves a compiled program as a directory with a JSON metadata file
+    and an uncompressed ``.npz`` file with the fitted parameters.
+
+    Parameters
+    ----------
+    program : Program
+        The compiled transformation.
+    path : str
+        The artifact directory, created if needed.
+    features : list of str
+        The input columns, in the order of the program buffer.
+    version : str, optional
+        The version of the package that fitted the program.
+    output_features : list of str, optional
+        The output columns, by default ``features``.
+    """
+
+    arrays = {}
+    steps = []
+
+    for i, step in enumerate(program.steps):
+
+        gather = None
+        if step.gather is not None:
+            gather = f"step_{i}_gather"
+            arrays[gather] = np.asarray(step.gather, dtype=np.int64)
+
+        products = None
+        if step.products is not None:
+            products = f"step_{i}_products"
+            arrays[products] = np.asarray(step.products, dtype=np.int64)
+
+        operations = [
+            describe_operation(operation, f"step_{i}_operation_{j}_", arrays)
+            for j, operation in enumerate(step.operations)
+        ]
+
+        steps.append({"gather": gather, "products": products, "operations": operations})
+
+    metadata = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "features": list(features),
+        "output_features": list(
+            features if output_features is None else output_features
+        ),
+        "steps": steps,
+    }
+
+    os.makedirs(path, exist_ok=True)
+
+    np.savez(os.path.join(path, PARAMETERS_FILE), **arrays)
+
+    with open(os.path.join(path, METADATA_FILE), "w") as file:
+        json.dump(metadata, file, indent=2)
+
+
+def load_artifact(path: str, mmap: bool = True) -> Artifact:
+    """Loads an artifact saved by :func:`save_artifact`.
+
+    Parameters
+    ----------
+    path : str
+        The artifact directory.
+    mmap : bool, default=True
+        Whether to memory-map the parameters instead of reading them,
+        so that processes serving the same artifact share its pages.
+
+    Returns
+    -------
+    Artifact
+        The loaded artifact.
+
+    Raises
+    ------
+    ValueError
+        If the directory does not hold a supported artifact.
+    """
+
+    with open(os.path.join(path, METADATA_FILE), "r") as file:
+        metadata = json.load(file)
+
+    if metadata.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a preprocessor artifact.")
+
+    if metadata["format_version"] > FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact format version {metadata['format_version']} is newer "
+            f"than the supported version {FORMAT_VERSION}."
+        )
+
+    arrays = read_npz(os.path.join(path, PARAMETERS_FILE), mmap=mmap)
+
+    steps = []
+    for step in metadata["steps"]:
+
+        operations = [
+            build_operation(operation, arrays) for operation in step["operations"]
+        ]
+
+        gather = None if step["gather"] is None else arrays[step["gather"]]
+
+        products = step.get("products")
+        products = None if products is None else arrays[products]
+
+        steps.append(ProgramStep(operations, gather=gather, products=products))
+
+    return Artifact(Program(steps), metadata)
+
+
+def read_npz(filepath: str, mmap: bool = True) -> typing.Dict[str, np.ndarray]:
+    """Reads the arrays of an uncompressed ``.npz`` file.
+
+    ``np.load`` ignores ``mmap_mode`` for ``.npz`` files, so each member
+    is located in the zip file and memory-mapped directly.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to the ``.npz`` file.
+    mmap : bool, default=True
+        Whether to memory-map the arrays in read-only mode.
+
+    Returns
+    -------
+    dict of np.ndarray
+        The arrays by name.
+    """
+
+    if not mmap:
+        with np.load(filepath) as data:
+            return {name: data[name] for name in data.files}
+
+    arrays = {}
+
+    with zipfile.ZipFile(filepath) as archive, open(filepath, "rb") as file:
+        for member in archive.infolist():
+
+            if member.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{member.filename} is compressed in {filepath}.")
+
+            file.seek(member.header_offset)
+            header = file.read(30)
+            name_length, extra_length = struct.unpack("<HH", header[26:30])
+            file.seek(member.header_offset + 30 + name_length + extra_length)
+
+            major, minor = np.lib.format.read_magic(file)
+            if (major, minor) == (1, 0):
+                header = np.lib.format.read_array_header_1_0(file)
+            else:
+                header = np.lib.format.read_array_header_2_0(file)
+            shape, fortran_order, dtype = header
+
+            name = member.filename[: -len(".npy")]
+
+            if 0 in shape:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    filepath,
+                    dtype=dtype,
+                    mode="r",
+                    offset=file.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+
+    return arrays
+
+
+def describe_operation(
+    operation: Operation, prefix: str, arrays: typing.Dict[str, np.ndarray]
+) -> dict:
+    """Describes an operation for :func:`build_operation`.
+
+    Parameters
+    ----------
+    operation : Operation
+        The operation.
+    prefix : str
+        Prefix of the names of the operation arrays.
+    arrays : dict of np.ndarray
+        The arrays to be saved, where the operation arrays are added.
+
+    Returns
+    -------
+    dict
+        The JSON serializable metadata of the operation.
+    """
+
+    arrays[prefix + "columns"] = np.asarray(operation.columns, dtype=np.int64)
+
+    parameters = {}
+    for name, values in operation.get_parameters().items():
+        arrays[prefix + name] = values
+        parameters[name] = prefix + name
+
+    return {
+        "type": type(operation).__name__,
+        "columns": prefix + "columns",
+        "parameters": parameters,
+        "attributes": operation.get_attributes(),
+    }
+
+
+def build_operation(operation: dict, arrays: typing.Dict[str, np.ndarray]) -> Operation:
+    """Builds an operation from the metadata returned by
+    :func:`describe_operation` and the saved arrays.
+
+    Parameters
+    ----------
+    operation : dict
+        The operation metadata.
+    arrays : dict of np.ndarray
+        The saved arrays.
+
+    Returns
+    -------
+    Operation
+        The operation.
+    """
+
+    if operation["type"] not in OPERATIONS:
+        raise ValueError(f"Unknown operation {operation['type']}.")
+
+    return OPERATIONS[operation["type"]].from_parameters(
+        columns=arrays[operation["columns"]],
+        parameters={name: arrays[key] for name, key in operation["parameters"].items()},
+        attributes=operation["attributes"],
+    )
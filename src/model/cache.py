@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import os
+import json
+import typing
+import hashlib
+import tempfile
+import numpy as np
+from src.model.engine import Operation
+from src.model.artifact import describe_operation, build_operation
+
+MAX_BYTES = 1 << 30
+
+ENTRY_SUFFIX = ".npz"
+
+
+def hash_feature(
+    values: np.ndarray, chain: typing.Sequence[tuple], version: str = None
+) -> str:
+    """Hashes the training values of a feature with its step configuration
+    and the package version, so a key only matches the same fit.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The float values of the feature.
+    chain : sequence of tuple
+        The (key, value) pairs of the feature steps, in order.
+    version : str, optional
+        The version of the package that fits the steps.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest.
+    """
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps([version, list(chain)], default=str).encode("utf-8"))
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).data)
+
+    return digest.hexdigest()
+
+
+class StepCache:
+    """
+    StepCache.
+
+    A content-addressed on-disk cache of the fitted steps of single
+    features. Each entry holds the engine operations of the steps of a
+    feature, saved as an uncompressed ``.npz`` file named after its key.
+    Entries are touched when read, so :meth:`evict` drops the least
+    recently used ones first.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory, created if needed.
+    max_bytes : int, default=MAX_BYTES
+        Maximum total size of the entries, 1 GiB by default.
+    max_entries : int, optional
+        Maximum number of entries, by default unlimited.
+    """
+
+    def __repr__(self):
+        return f"StepCache(directory={self.directory!r})"
+
+    def __init__(
+        self, directory: str, max_bytes: int = MAX_BYTES, max_entries: int = None
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> typing.List[typing.List[Operation]] or None:
+        """Reads the steps of an entry.
+
+        Parameters
+        ----------
+        key : str
+            The entry key, as returned by :func:`hash_feature`.
+
+        Returns
+        -------
+        list of list of Operation or None
+            The operations of each step, over column 0, or None when the\
+            key is not cached or its entry can not be read.
+        """
+
+        filepath = self.__get_filepath(key)
+
+        try:
+            with np.load(filepath) as data:
+                arrays = {name: data[name] for name in data.files}
+
+            os.utime(filepath)
+
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        metadata = json.loads(str(arrays.pop("metadata")))
+
+        self.hits += 1
+
+        return [
+            [build_operation(operation, arrays) for operation in step]
+            for step in metadata["steps"]
+        ]
+
+    def put(self, key: str, steps: typing.List[typing.List[Operation]]) -> None:
+        """Writes the steps of an entry. The file is written aside and
+        renamed, so readers never see partial entries. Call :meth:`evict`
+        after writing to enforce the limits.
+
+        Parameters
+        ----------
+        key : str
+            The entry key, as returned by :func:`hash_feature`.
+        steps : list of list of Operation
+            The operations of each step, over column 0.
+        """
+
+        arrays = {}
+
+        metadata = {
+            "steps": [
+                [
+                    describe_operation(operation, f"step_{i}_operation_{j}_", arrays)
+                    for j, operation in enumerate(operations)
+                ]
+                for i, operations in enumerate(steps)
+            ]
+        }
+
+        arrays["metadata"] = np.array(json.dumps(metadata))
+
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                np.savez(file, **arrays)
+
+            os.replace(temporary, self.__get_filepath(key))
+
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def evict(self) -> int:
+        """Removes the least recently used entries until the cache fits
+        its limits.
+
+        Returns
+        -------
+        int
+            The number of removed entries.
+        """
+
+        entries = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(ENTRY_SUFFIX)
+        )
+
+        size = sum(entry[1] for entry in entries)
+
+        n_removed = 0
+
+        for _, entry_size, path in entries:
+
+            n_entries = len(entries) - n_removed
+
+            if size <= self.max_bytes and (
+                self.max_entries is None or n_entries <= self.max_entries
+            ):
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            size -= entry_size
+            n_removed += 1
+
+        return n_removed
+
+    def clear(self) -> None:
+        """Removes every entry."""
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_SUFFIX):
+                os.remove(entry.path)
+
+    def __get_filepath(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
@@ -2,17 +2,152 @@ from os import error
 import pandas as pd
 import numpy as np
 
-from src.base.commons import to_snake_case
-from src.base.file import read_file_string, download_file
-from src.model import __version__
+from src.base.commons import to_snake_case, cast_dtypes
+from src.config import get_feature_dtypes, get_feature_names
+from src.model.engine import effective_n_jobs
+from src.base.file import (
+    read_file_string,
+    download_files,
+    read_table,
+    read_columns,
+    get_file_format,
+    get_columnar_copy,
+)
 
+TARGET = "Drug"
 
-def make_dataset(config, download_bases=False):
 
-    data = pd.read_csv(config["data_local_path"])
+def make_dataset(
+    config,
+    download_bases=False,
+    features_config=None,
+    columns=None,
+    filters=None,
+    memory_map=True,
+    columnar_cache=False,
+    n_jobs=None,
+):
+    """Reads the dataset of a data config into features and target.
 
-    X = data.drop(columns="Drug", errors="ignore")
+    Parameters
+    ----------
+    config : dict
+        The data config, with the ``data_local_path`` of a CSV, Parquet\
+        or Arrow file, and optionally the ``target`` column, by default\
+        ``TARGET``, and the ``data_columnar_path`` of the columnar copy\
+        of a CSV file. To download the dataset, it also holds its\
+        ``data_url`` and optionally its ``data_checksum``, and the other\
+        ``bases`` to download, as dicts with their ``url``,\
+        ``local_path`` and optionally their ``checksum``.
+    download_bases : bool, optional
+        Whether the bases are downloaded first, concurrently. Files that\
+        are up to date with the server or match their checksum are not\
+        downloaded again. By default False
+    features_config : list of dict, optional
+        The features configuration. When given, only the columns of the\
+        active features and the target are read, with the compact dtypes\
+        of their types. CSV columns are parsed with those dtypes, integers\
+        as floats, instead of inferring them.
+    columns : list of str, optional
+        Columns to be read along with the target and the active features,\
+        as the raw columns used by ``build_features``. When given, the\
+        other columns are not read.
+    filters : list of tuple or list of list of tuple, optional
+        Row filters of columnar sources, as ``[("Age", ">=", 18)]``.\
+        Parquet row groups whose statistics do not match are skipped.
+    memory_map : bool, optional
+        Whether columnar sources are memory-mapped, by default True
+    columnar_cache : bool, optional
+        Whether a CSV source is converted once into a Parquet copy, read\
+        instead of the CSV while it is up to date, by default False
+    n_jobs : int, optional
+        Number of threads that parse large CSV files, by default 1, and\
+        of concurrent downloads, by default 4. ``-1`` means using all\
+        processors.
 
-    y = data["Drug"]
+    Returns
+    -------
+    tuple of pd.DataFrame and pd.Series
+        The features and the target.
+    """
 
-    return X, y
\ No newline at end of file
+    filepath = config["data_local_path"]
+
+    if download_bases:
+        download_files(
+            _get_bases(config), n_jobs=4 if n_jobs is None else effective_n_jobs(n_jobs)
+        )
+
+    target = config.get("target", TARGET)
+
+    dtypes = None
+    csv_dtypes = None
+    read_options = {}
+
+    if features_config is not None:
+        dtypes = get_feature_dtypes(features_config)
+        csv_dtypes = {
+            name: "float64" if dtype == "integer" else dtype
+            for name, dtype in dtypes.items()
+        }
+
+    if columnar_cache and get_file_format(filepath) == "csv":
+        filepath = get_columnar_copy(
+            filepath, config.get("data_columnar_path"), dtypes=csv_dtypes
+        )
+
+    usecols = None
+
+    if features_config is not None or columns is not None:
+        wanted = {target, *(columns or [])}
+
+        if features_config is not None:
+            wanted.update(get_feature_names(features_config))
+
+        usecols = [column for column in read_columns(filepath) if column in wanted]
+
+    if get_file_format(filepath) == "csv":
+        read_options["n_jobs"] = effective_n_jobs(n_jobs)
+        read_options["dtypes"] = csv_dtypes
+
+    data = read_table(
+        filepath,
+        columns=usecols,
+        filters=filters,
+        memory_map=memory_map,
+        **read_options,
+    )
+
+    if dtypes is not None:
+        data = cast_dtypes(data, dtypes)
+
+    X = data.drop(columns=target, errors="ignore")
+
+    y = data[target]
+
+    return X, y
+
+
+def _get_bases(config):
+    """Lists the downloads of the bases of a data config."""
+
+    bases = [
+        {
+            "url": base["url"],
+            "destination": base["local_path"],
+            "checksum": base.get("checksum"),
+        }
+        for base in config.get("bases") or []
+    ]
+
+    if config.get("data_url"):
+        bases.insert(
+            0,
+            {
+                "url": config["data_url"],
+                "destination": config["data_local_path"],
+                "checksum": config.get("data_checksum"),
+            },
+        )
+
+    return bases
@@ -0,0 +1,1149 @@
+from __future__ import annotations
+
+import os
+import copy
+import bisect
+import contextlib
+import numpy as np
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from src.model.expression import Expression
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+    from src.model.profiling import Profiler
+
+MIN_BLOCK_ROWS = 10_000
+
+CAST_BLOCK_ROWS = 65_536
+
+
+def effective_n_jobs(n_jobs: int = None) -> int:
+    """Returns the number of jobs, following the joblib conventions:
+    None means 1 and negative values count back from the number of
+    processors, so -1 means all of them."""
+
+    if n_jobs is None:
+        return 1
+
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+
+    return n_jobs
+
+
+def to_buffer(
+    dataframe: pd.DataFrame or np.ndarray,
+    columns: typing.List[str] = None,
+    converters: typing.Dict[str, typing.Callable] = None,
+) -> np.ndarray:
+    """Copies a dataframe into a contiguous column-major float buffer.
+
+    Each column is converted straight into its slot of the buffer, so the
+    data is copied exactly once, whatever the dtypes of the input columns.
+    Nullable pandas missing values are converted to ``np.nan``.
+
+    Parameters
+    ----------
+    dataframe : pd.DataFrame or np.ndarray
+        Input data of shape (n_samples, n_features).
+    columns : list of str, optional
+        Names of the columns to be copied, by default all the columns.\
+        For numpy arrays, the positions of the columns.
+    converters : dict of callable, optional
+        Functions that convert a column, by name, into float values,\
+        as the encoding of categorical columns.
+
+    Returns
+    -------
+    np.ndarray
+        A float64 Fortran-ordered array of shape (n_samples, len(columns)).
+    """
+
+    if isinstance(dataframe, np.ndarray):
+        if columns is not None:
+            dataframe = dataframe[:, columns]
+        return np.array(dataframe, dtype=np.float64, order="F")
+
+    if columns is None:
+        columns = list(dataframe.columns)
+
+    buffer = np.empty((len(dataframe), len(columns)), dtype=np.float64, order="F")
+
+    converters = converters or {}
+
+    for j, column in enumerate(columns):
+        if column in converters:
+            buffer[:, j] = converters[column](dataframe[column])
+        else:
+            buffer[:, j] = dataframe[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    return buffer
+
+
+def _as_parameter(values: typing.Iterable) -> np.ndarray or list:
+    """Keeps numpy arrays, as memory-mapped ones, and copies other
+    iterables into a list."""
+    return values if isinstance(values, np.ndarray) else list(values)
+
+
+def _concatenate(left: typing.Iterable, right: typing.Iterable) -> list:
+    """Concatenates the per-column parameters of two operations."""
+    return list(left) + list(right)
+
+
+def _variables(variables: typing.List[str], columns: typing.Iterable[int]) -> list:
+    """Returns the variable names of the given buffer columns."""
+    return [variables[int(column)] for column in columns]
+
+
+class Operation:
+    """
+    Operation.
+
+    Base class of the vectorized, in-place operations executed by a
+    :class:`Program`. An operation holds the fitted parameters of one kind
+    of step for a set of buffer columns. Operations of the same kind in a
+    step are merged, so each kind runs once per step over all its columns.
+
+    Parameters
+    ----------
+    columns : array-like of int, optional
+        Positions of the buffer columns the operation is applied to,
+        by default the positions ``0, ..., n - 1``.
+    """
+
+    parameters = ()
+
+    def __init__(self, columns: typing.Iterable[int] = None):
+        self.columns = None if columns is None else list(columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @classmethod
+    def from_parameters(
+        cls,
+        columns: typing.Iterable[int],
+        parameters: typing.Dict[str, np.ndarray],
+        attributes: dict = None,
+    ) -> Operation:
+        """Builds an operation from exported parameters.
+
+        Parameters
+        ----------
+        columns : array-like of int
+            Positions of the buffer columns.
+        parameters : dict of np.ndarray
+            The arrays returned by :meth:`get_parameters`.
+        attributes : dict, optional
+            The values returned by :meth:`get_attributes`.
+
+        Returns
+        -------
+        Operation
+            The operation.
+        """
+        return cls(columns=columns, **parameters, **(attributes or {}))
+
+    def get_parameters(self) -> typing.Dict[str, np.ndarray]:
+        """Returns the fitted per-column parameters as numpy arrays,
+        keyed by the constructor argument names."""
+        return {
+            name: np.asarray(getattr(self, name), dtype=np.float64)
+            for name in self.parameters
+        }
+
+    def get_attributes(self) -> dict:
+        """Returns the JSON serializable constructor arguments that are
+        not per-column parameters."""
+        return {}
+
+    def key(self) -> typing.Hashable:
+        """Returns a key shared by all the operations that can be merged."""
+        return type(self)
+
+    def relocate(self, columns: typing.Iterable[int]) -> Operation:
+        """Sets the buffer positions of the operation columns.
+
+        Parameters
+        ----------
+        columns : array-like of int
+            Positions of the buffer columns.
+
+        Returns
+        -------
+        Operation
+            This operation.
+        """
+        self.columns = list(columns)
+        return self
+
+    def select(self, columns: typing.Iterable[int]) -> Operation:
+        """Returns a copy of the operation over some of its columns.
+
+        Parameters
+        ----------
+        columns : array-like of int
+            Positions of the selected buffer columns, among the operation\
+            columns.
+
+        Returns
+        -------
+        Operation
+            The new operation, with the parameters of the selected columns.
+        """
+        index = {column: i for i, column in enumerate(self.columns)}
+        rows = [index[column] for column in columns]
+
+        selected = copy.copy(self)
+        selected.columns = list(columns)
+
+        for name in self.parameters:
+            values = getattr(self, name)
+            setattr(selected, name, [values[i] for i in rows])
+
+        return selected
+
+    def merge(self, other: Operation) -> Operation:
+        """Appends the columns and parameters of another operation.
+
+        Parameters
+        ----------
+        other : Operation
+            An operation with the same key.
+
+        Returns
+        -------
+        Operation
+            This operation.
+        """
+        self.columns = self.columns + other.columns
+
+        for name in self.parameters:
+            setattr(self, name, _concatenate(getattr(self, name), getattr(other, name)))
+
+        return self
+
+    def prepare(self) -> Operation:
+        """Freezes the parameters before the first execution.
+
+        Returns
+        -------
+        Operation
+            This operation.
+        """
+        columns = np.asarray(self.columns, dtype=np.intp)
+
+        self._selector = columns
+
+        if len(columns) > 0 and np.array_equal(
+            columns, np.arange(columns[0], columns[0] + len(columns))
+        ):
+            self._selector = slice(int(columns[0]), int(columns[0]) + len(columns))
+
+        for name in self.parameters:
+            setattr(self, f"_{name}", np.asarray(getattr(self, name), dtype=np.float64))
+
+        return self
+
+    def apply(self, buffer: np.ndarray) -> None:
+        """Applies the operation in place over the buffer columns.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Float buffer of shape (n_samples, n_columns).
+        """
+        if isinstance(self._selector, slice):
+            self.compute(buffer[:, self._selector])
+
+        else:
+            block = buffer[:, self._selector]
+            self.compute(block)
+            buffer[:, self._selector] = block
+
+    def compute(self, block: np.ndarray) -> None:
+        """Applies the operation in place over a block with its columns.
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Float block of shape (n_samples, len(self)).
+        """
+        raise NotImplementedError
+
+    def scalar_code(
+        self, variables: typing.List[str], constant: typing.Callable
+    ) -> typing.List[str]:
+        """Returns the Python statements that apply the operation to the
+        scalar variables of its columns, with the same float arithmetic
+        as :meth:`compute`.
+
+        Parameters
+        ----------
+        variables : list of str
+            The variable name of each buffer column.
+        constant : callable
+            Registers a value in the namespace of the generated code\
+            and returns its name.
+
+        Returns
+        -------
+        list of str
+            The statements.
+        """
+        raise NotImplementedError
+
+
+class FillOperation(Operation):
+    """Replaces missing values by a fitted value per column."""
+
+    parameters = ("values",)
+
+    def __init__(self, values: typing.Iterable[float], columns=None):
+        self.values = _as_parameter(values)
+        super().__init__(range(len(self.values)) if columns is None else columns)
+
+    def compute(self, block: np.ndarray) -> None:
+        np.copyto(
+            block, np.broadcast_to(self._values, block.shape), where=np.isnan(block)
+        )
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        return [
+            f"{x} = {constant(float(value))} if {x} != {x} else {x}"
+            for x, value in zip(_variables(variables, self.columns), self._values)
+        ]
+
+
+class ClipOperation(Operation):
+    """Trims values at the lower and upper limits of each column."""
+
+    parameters = ("lower", "upper")
+
+    def __init__(
+        self,
+        lower: typing.Iterable[float],
+        upper: typing.Iterable[float],
+        columns=None,
+    ):
+        if not isinstance(lower, np.ndarray):
+            lower = [-np.inf if x is None else x for x in lower]
+        if not isinstance(upper, np.ndarray):
+            upper = [np.inf if x is None else x for x in upper]
+        self.lower = lower
+        self.upper = upper
+        super().__init__(range(len(self.lower)) if columns is None else columns)
+
+    def compute(self, block: np.ndarray) -> None:
+        np.clip(block, self._lower, self._upper, out=block)
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        code = []
+
+        for x, lower, upper in zip(
+            _variables(variables, self.columns), self._lower, self._upper
+        ):
+            if lower > -np.inf:
+                lower = constant(float(lower))
+                code.append(f"{x} = {lower} if {x} < {lower} else {x}")
+            if upper < np.inf:
+                upper = constant(float(upper))
+                code.append(f"{x} = {upper} if {x} > {upper} else {x}")
+
+        return code
+
+
+class UfuncOperation(Operation):
+    """Applies a numpy ufunc, as ``np.log`` or ``np.sqrt``, to the columns."""
+
+    def __init__(self, function: np.ufunc or str, columns=None, n_columns: int = 1):
+        if isinstance(function, str):
+            function = getattr(np, function)
+        if not isinstance(function, np.ufunc):
+            raise TypeError(f"{function} is not a numpy ufunc.")
+        self.function = function
+        super().__init__(range(n_columns) if columns is None else columns)
+
+    def get_attributes(self) -> dict:
+        return {"function": self.function.__name__}
+
+    def key(self) -> typing.Hashable:
+        return (type(self), self.function)
+
+    def compute(self, block: np.ndarray) -> None:
+        self.function(block, out=block)
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        function = constant(self.function)
+        return [
+            f"{x} = float({function}({x}))" for x in _variables(variables, self.columns)
+        ]
+
+
+class ExpressionOperation(Operation):
+    """Evaluates an arithmetic expression of ``x``, as ``log1p(x) * 2 - 1``,
+    over the columns, as described in :class:`Expression`."""
+
+    def __init__(self, expression: Expression or str, columns=None, n_columns: int = 1):
+        if isinstance(expression, str):
+            expression = Expression(expression)
+        self.expression = expression
+        super().__init__(range(n_columns) if columns is None else columns)
+
+    def get_attributes(self) -> dict:
+        return {"expression": self.expression.source}
+
+    def key(self) -> typing.Hashable:
+        return (type(self), self.expression)
+
+    def compute(self, block: np.ndarray) -> None:
+        self.expression.evaluate(block, out=block)
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        return [
+            statement
+            for x in _variables(variables, self.columns)
+            for statement in self.expression.scalar_code(x, constant)
+        ]
+
+
+class MultiplyOperation(Operation):
+    """Multiplies each column by a factor."""
+
+    parameters = ("factors",)
+
+    def __init__(self, factors: typing.Iterable[float], columns=None):
+        self.factors = _as_parameter(factors)
+        super().__init__(range(len(self.factors)) if columns is None else columns)
+
+    def compute(self, block: np.ndarray) -> None:
+        block *= self._factors
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        return [
+            f"{x} = {x} * {constant(float(factor))}"
+            for x, factor in zip(_variables(variables, self.columns), self._factors)
+        ]
+
+
+class MultiplyAddOperation(Operation):
+    """Computes ``x * scale + offset`` for each column, as MinMaxScaler does."""
+
+    parameters = ("scale", "offset")
+
+    def __init__(
+        self,
+        scale: typing.Iterable[float],
+        offset: typing.Iterable[float],
+        columns=None,
+    ):
+        self.scale = _as_parameter(scale)
+        self.offset = _as_parameter(offset)
+        super().__init__(range(len(self.scale)) if columns is None else columns)
+
+    def compute(self, block: np.ndarray) -> None:
+        block *= self._scale
+        block += self._offset
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        return [
+            f"{x} = {x} * {constant(float(scale))} + {constant(float(offset))}"
+            for x, scale, offset in zip(
+                _variables(variables, self.columns), self._scale, self._offset
+            )
+        ]
+
+
+class SubtractDivideOperation(Operation):
+    """Computes ``(x - center) / scale`` for each column, as
+    StandardScaler and RobustScaler do."""
+
+    parameters = ("center", "scale")
+
+    def __init__(
+        self,
+        center: typing.Iterable[float],
+        scale: typing.Iterable[float],
+        columns=None,
+    ):
+        self.center = _as_parameter(center)
+        self.scale = _as_parameter(scale)
+        super().__init__(range(len(self.center)) if columns is None else columns)
+
+    def compute(self, block: np.ndarray) -> None:
+        block -= self._center
+        block /= self._scale
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        return [
+            f"{x} = ({x} - {constant(float(center))}) / {constant(float(scale))}"
+            for x, center, scale in zip(
+                _variables(variables, self.columns), self._center, self._scale
+            )
+        ]
+
+
+class DiscretizeOperation(Operation):
+    """Replaces each value by the representative value of its bin.
+
+    The bin of each value is found with ``np.searchsorted`` over the inner
+    bin edges, exactly as ``KBinsDiscretizer`` does, and the bin ordinal is
+    then replaced by the value fitted for that bin.
+    """
+
+    def __init__(
+        self,
+        edges: typing.Iterable[np.ndarray],
+        values: typing.Iterable[np.ndarray],
+        columns=None,
+    ):
+        self.edges = [np.asarray(x, dtype=np.float64) for x in edges]
+        self.values = [np.asarray(x, dtype=np.float64) for x in values]
+        super().__init__(range(len(self.edges)) if columns is None else columns)
+
+    @classmethod
+    def from_parameters(
+        cls, columns, parameters, attributes=None
+    ) -> DiscretizeOperation:
+        offsets = parameters["offsets"]
+        edges = np.split(parameters["edges"], offsets[1:-1])
+        values = np.split(
+            parameters["values"], (offsets - np.arange(len(offsets)))[1:-1]
+        )
+        return cls(edges=edges, values=values, columns=columns)
+
+    def get_parameters(self) -> typing.Dict[str, np.ndarray]:
+        return {
+            "edges": np.concatenate(self.edges),
+            "values": np.concatenate(self.values),
+            "offsets": np.cumsum([0] + [len(x) for x in self.edges]),
+        }
+
+    def select(self, columns: typing.Iterable[int]) -> DiscretizeOperation:
+        index = {column: i for i, column in enumerate(self.columns)}
+        rows = [index[column] for column in columns]
+        selected = super().select(columns)
+        selected.edges = [self.edges[i] for i in rows]
+        selected.values = [self.values[i] for i in rows]
+        return selected
+
+    def merge(self, other: DiscretizeOperation) -> DiscretizeOperation:
+        self.edges = self.edges + other.edges
+        self.values = self.values + other.values
+        return super().merge(other)
+
+    def compute(self, block: np.ndarray) -> None:
+        for j in range(block.shape[1]):
+            ordinals = np.searchsorted(self.edges[j][1:-1], block[:, j], side="right")
+            np.take(self.values[j], ordinals, out=block[:, j])
+
+    def scalar_code(self, variables, constant) -> typing.List[str]:
+        search = constant(bisect.bisect_right)
+        return [
+            f"{x} = {constant(values.tolist())}"
+            f"[{search}({constant(edges[1:-1].tolist())}, {x})]"
+            for x, edges, values in zip(
+                _variables(variables, self.columns), self.edges, self.values
+            )
+        ]
+
+
+class ProgramStep:
+    """
+    ProgramStep.
+
+    A step of a :class:`Program`: an optional selection of the buffer
+    columns followed by the operations of the step and by the optional
+    products appended to the buffer, so a step may change its width.
+
+    Parameters
+    ----------
+    operations : list of Operation
+        The operations of the step. Operations with the same key
+        are merged into a single one.
+    gather : array-like of int, optional
+        Positions of the input buffer columns that form the step
+        buffer, by default all the columns in their current order.
+    products : array-like of int, optional
+        Pairs of buffer positions, of shape (n_products, 2). The product\
+        of each pair is appended to the buffer in order, so a pair may\
+        refer to the products appended before it, as the degree 2 terms\
+        that make the degree 3 ones.
+    """
+
+    def __init__(
+        self,
+        operations: typing.List[Operation],
+        gather: typing.Iterable[int] = None,
+        products: typing.Iterable[typing.Tuple[int, int]] = None,
+    ):
+        merged = {}
+
+        for operation in operations:
+            key = operation.key()
+
+            if key in merged:
+                merged[key].merge(operation)
+            else:
+                merged[key] = operation
+
+        self.operations = [operation.prepare() for operation in merged.values()]
+
+        self.gather = None if gather is None else np.asarray(gather, dtype=np.intp)
+
+        self.products = None
+        if products is not None:
+            self.products = np.asarray(products, dtype=np.intp).reshape(-1, 2)
+
+    def get_n_columns_out(self, n_columns: int) -> int:
+        """Returns the width of the step output for an input width."""
+
+        if self.gather is not None:
+            n_columns = len(self.gather)
+
+        if self.products is not None:
+            n_columns += len(self.products)
+
+        return n_columns
+
+    def run(
+        self, buffer: np.ndarray, profiler: Profiler = None, transform_order: int = None
+    ) -> np.ndarray:
+        """Executes the step over the buffer.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Float buffer of shape (n_samples, n_columns).
+        profiler : Profiler, optional
+            A profiler that measures each operation and the products.
+        transform_order : int, optional
+            The position of the step in its program, for the profiler.
+
+        Returns
+        -------
+        np.ndarray
+            The transformed buffer.
+        """
+
+        if self.gather is not None:
+            buffer = np.asfortranarray(buffer[:, self.gather])
+
+        if profiler is None:
+            for operation in self.operations:
+                operation.apply(buffer)
+
+        else:
+            for operation in self.operations:
+                with profiler.measure(
+                    transform_order,
+                    type(operation).__name__,
+                    operation.columns,
+                    len(buffer),
+                ):
+                    operation.apply(buffer)
+
+        if self.products is not None:
+            n_columns = buffer.shape[1]
+
+            with _measure(
+                profiler,
+                transform_order,
+                "products",
+                range(n_columns, n_columns + len(self.products)),
+                len(buffer),
+            ):
+                expanded = np.empty(
+                    (len(buffer), n_columns + len(self.products)), order="F"
+                )
+                expanded[:, :n_columns] = buffer
+
+                for k, (a, b) in enumerate(self.products.tolist()):
+                    np.multiply(
+                        expanded[:, a], expanded[:, b], out=expanded[:, n_columns + k]
+                    )
+
+            buffer = expanded
+
+        return buffer
+
+
+def _measure(
+    profiler: Profiler,
+    transform_order: int,
+    operation: str,
+    columns: typing.Iterable[int],
+    n_rows,
+):
+    """Returns the profiler measurement of some work, or an empty context\
+    without a profiler."""
+
+    if profiler is None:
+        return contextlib.nullcontext()
+
+    return profiler.measure(transform_order, operation, columns, n_rows)
+
+
+def interaction_products(
+    terms: typing.Sequence[typing.Tuple[int, ...]], n_columns: int
+) -> typing.List[typing.Tuple[int, int]]:
+    """Translates interaction terms into the products of a :class:`ProgramStep`.
+
+    Each term is computed as the product of the term without its last
+    factor and that factor, so every term takes a single multiplication.
+
+    Parameters
+    ----------
+    terms : sequence of tuple of int
+        The buffer positions of the factors of each term, with repeated\
+        positions for powers. The term without its last factor must be a\
+        column or a previous term.
+    n_columns : int
+        The width of the buffer.
+
+    Returns
+    -------
+    list of tuple of int
+        The pairs of buffer positions of each product.
+
+    Raises
+    ------
+    ValueError
+        If the prefix of a term is neither a column nor a previous term.
+    """
+
+    positions = {}
+    products = []
+
+    for k, term in enumerate(terms):
+        term = tuple(term)
+        prefix = term[:-1]
+
+        if len(prefix) == 1:
+            left = prefix[0]
+        elif prefix in positions:
+            left = positions[prefix]
+        else:
+            raise ValueError(f"The term {term} has no previous term {prefix}.")
+
+        products.append((left, term[-1]))
+        positions[term] = n_columns + k
+
+    return products
+
+
+class Program:
+    """
+    Program.
+
+    A vectorized numpy program compiled from a fitted PreProcessor. It runs
+    every step over a single contiguous float buffer, with no intermediate
+    dataframes.
+
+    Parameters
+    ----------
+    steps : list of ProgramStep
+        The ordered steps of the program.
+    """
+
+    def __init__(self, steps: typing.List[ProgramStep]):
+        self.steps = steps
+
+    @classmethod
+    def from_chains(
+        cls, chains: typing.Sequence[typing.Sequence[typing.List[Operation]]]
+    ) -> Program:
+        """Builds a program from the operations of each column, as returned
+        by :meth:`split`. Columns with fewer steps are left unchanged by the
+        last ones, and the operations of a step are merged by kind.
+
+        Parameters
+        ----------
+        chains : sequence of sequence of list of Operation
+            The operations of each step of each column, over column 0.
+
+        Returns
+        -------
+        Program
+            The program over all the columns.
+        """
+
+        n_steps = max((len(chain) for chain in chains), default=0)
+
+        return cls(
+            [
+                ProgramStep(
+                    [
+                        operation.select(operation.columns).relocate([j])
+                        for j, chain in enumerate(chains)
+                        if i < len(chain)
+                        for operation in chain[i]
+                    ]
+                )
+                for i in range(n_steps)
+            ]
+        )
+
+    def split(self, n_columns: int) -> typing.List[typing.List[typing.List[Operation]]]:
+        """Splits the program into the operations of each column, so the
+        fitted steps of a column can be stored and joined with others by
+        :meth:`from_chains`.
+
+        Parameters
+        ----------
+        n_columns : int
+            The width of the buffer.
+
+        Returns
+        -------
+        list of list of list of Operation
+            The operations of each step of each column, over column 0.
+
+        Raises
+        ------
+        ValueError
+            If a step gathers columns or appends products.
+        """
+
+        chains = [[] for _ in range(n_columns)]
+
+        for step in self.steps:
+
+            if step.gather is not None or step.products is not None:
+                raise ValueError("Only steps that keep the columns can be split.")
+
+            for chain in chains:
+                chain.append([])
+
+            for operation in step.operations:
+                for column in operation.columns:
+                    chains[column][-1].append(operation.select([column]).relocate([0]))
+
+        return chains
+
+    def get_n_columns_out(self, n_columns: int) -> int:
+        """Returns the width of the program output for an input width."""
+
+        for step in self.steps:
+            n_columns = step.get_n_columns_out(n_columns)
+
+        return n_columns
+
+    def run(
+        self, buffer: np.ndarray, n_jobs: int = None, profiler: Profiler = None
+    ) -> np.ndarray:
+        """Executes the program over the buffer.
+
+        The buffer is modified in place and must not be shared
+        with the caller's data.
+
+        Every operation is elementwise, so with more than one job the rows
+        are split in blocks that run on a thread pool. numpy releases the
+        GIL inside the operations, and the result is identical to the
+        serial execution.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Float buffer of shape (n_samples, n_features).
+        n_jobs : int, optional
+            Number of threads, by default None, meaning 1.\
+            ``-1`` means using all processors.
+        profiler : Profiler, optional
+            A profiler that measures the operations of every step,\
+            in every block. A profiler that traces the memory runs the\
+            blocks one after the other, as the traced peak is shared by\
+            all the threads.
+
+        Returns
+        -------
+        np.ndarray
+            The transformed buffer.
+        """
+
+        n_blocks = min(effective_n_jobs(n_jobs), len(buffer) // MIN_BLOCK_ROWS)
+
+        if profiler is not None and profiler.memory:
+            n_blocks = 1
+
+        if n_blocks <= 1:
+            return self.__run_block(buffer, profiler)
+
+        bounds = np.linspace(0, len(buffer), n_blocks + 1).astype(int)
+
+        blocks = [buffer[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        with ThreadPoolExecutor(max_workers=n_blocks) as executor:
+            results = list(
+                executor.map(self.__run_block, blocks, [profiler] * n_blocks)
+            )
+
+        if all(result is block for result, block in zip(results, blocks)):
+            return buffer
+
+        output = np.empty((len(buffer), results[0].shape[1]), order="F")
+
+        for start, result in zip(bounds, results):
+            output[start : start + len(result)] = result
+
+        return output
+
+    def __run_block(self, buffer: np.ndarray, profiler: Profiler = None) -> np.ndarray:
+        """Executes the program steps over a buffer, in the calling thread.
+
+        Parameters
+        ----------
+        buffer : np.ndarray
+            Float buffer of shape (n_samples, n_features).
+        profiler : Profiler, optional
+            A profiler that measures the operations of every step.
+
+        Returns
+        -------
+        np.ndarray
+            The transformed buffer.
+        """
+
+        if profiler is None:
+            for step in self.steps:
+                buffer = step.run(buffer)
+
+        else:
+            for transform_order, step in enumerate(self.steps):
+                buffer = step.run(buffer, profiler, transform_order)
+
+        return buffer
+
+    def transform(
+        self,
+        X: pd.DataFrame,
+        columns: typing.List[str] = None,
+        n_jobs: int = None,
+        dtype: np.dtype or str = np.float64,
+        converters: typing.Dict[str, typing.Callable] = None,
+        output_columns: typing.List[str] = None,
+        block_rows: int = None,
+        profiler: Profiler = None,
+    ) -> pd.DataFrame:
+        """Applies the program to the input dataframe.
+
+        The program always computes in float64. With another output dtype,
+        the rows are processed in blocks of ``CAST_BLOCK_ROWS`` that are
+        converted into the output, so the full float64 buffer is never
+        allocated.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        columns : list of str, optional
+            Names of the program input columns, by default all the columns.
+        n_jobs : int, optional
+            Number of threads, by default None, meaning 1.
+        dtype : np.dtype or str, default=np.float64
+            The dtype of the output, as ``np.float32``.
+        converters : dict of callable, optional
+            Functions that convert input columns into float values, as\
+            in :func:`to_buffer`.
+        output_columns : list of str, optional
+            Names of the program output columns, by default ``columns``.
+        block_rows : int, optional
+            Number of rows of each block, by default all the rows for\
+            float64 outputs and ``CAST_BLOCK_ROWS`` otherwise. It bounds\
+            the float64 buffers when steps widen the data.
+        profiler : Profiler, optional
+            A profiler that measures the operations of every step.
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed dataframe, with the same index.
+        """
+
+        import pandas as pd
+
+        if columns is None:
+            columns = list(X.columns)
+
+        if output_columns is None:
+            output_columns = columns
+
+        if block_rows is None and np.dtype(dtype) != np.float64:
+            block_rows = CAST_BLOCK_ROWS
+
+        if block_rows is None:
+            buffer = self.run(
+                to_buffer(X, columns, converters), n_jobs=n_jobs, profiler=profiler
+            )
+
+        else:
+            buffer = np.empty((len(X), len(output_columns)), dtype=dtype, order="F")
+
+            for start, block in self.iter_blocks(
+                X,
+                columns,
+                block_rows,
+                n_jobs=n_jobs,
+                converters=converters,
+                profiler=profiler,
+            ):
+                buffer[start : start + len(block)] = block
+
+        return pd.DataFrame(buffer, index=X.index, columns=output_columns, copy=False)
+
+    def iter_blocks(
+        self,
+        X: pd.DataFrame,
+        columns: typing.List[str],
+        block_rows: int,
+        n_jobs: int = None,
+        converters: typing.Dict[str, typing.Callable] = None,
+        profiler: Profiler = None,
+    ) -> typing.Iterator[typing.Tuple[int, np.ndarray]]:
+        """Applies the program to the input dataframe in blocks of rows.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        columns : list of str
+            Names of the program input columns.
+        block_rows : int
+            Number of rows of each block.
+        n_jobs : int, optional
+            Number of threads, by default None, meaning 1.
+        converters : dict of callable, optional
+            Functions that convert input columns into float values, as\
+            in :func:`to_buffer`.
+        profiler : Profiler, optional
+            A profiler that measures the operations of every step.
+
+        Yields
+        ------
+        tuple of int and np.ndarray
+            The position of the first row of each block and its float64\
+            transformed buffer.
+        """
+
+        for start in range(0, len(X), block_rows):
+            block = X.iloc[start : start + block_rows]
+            yield start, self.run(
+                to_buffer(block, columns, converters), n_jobs=n_jobs, profiler=profiler
+            )
+
+    def compile_record(
+        self, columns: typing.List[str], output_columns: typing.List[str] = None
+    ) -> typing.Callable[[dict], dict]:
+        """Compiles the program into a Python function that transforms a
+        single record, for online inference.
+
+        The function is straight-line code with one float variable per
+        column and the fitted parameters as constants, so a record is
+        transformed without numpy arrays or dataframes. Python floats follow
+        the same IEEE arithmetic as the numpy operations, so the results
+        match :meth:`run` exactly.
+
+        Parameters
+        ----------
+        columns : list of str
+            Names of the program input columns.
+        output_columns : list of str, optional
+            Names of the program output columns, by default ``columns``.
+
+        Returns
+        -------
+        callable
+            A function that takes a dict with, at least, the keys in\
+            ``columns`` and returns a dict of the transformed values.\
+            Missing keys and None values are taken as NaN.
+        """
+
+        namespace = {"nan": np.nan}
+
+        def constant(value: typing.Any) -> str:
+            name = f"_c{len(namespace)}"
+            namespace[name] = value
+            return name
+
+        variables = [f"x{j}" for j in range(len(columns))]
+        code = ["get = record.get"]
+
+        for x, column in zip(variables, columns):
+            code.append(f"{x} = get({column!r})")
+            code.append(f"{x} = nan if {x} is None else float({x})")
+
+        n_variables = len(variables)
+
+        for step in self.steps:
+
+            if step.gather is not None:
+                gathered = []
+
+                for position in step.gather:
+                    x = variables[position]
+
+                    if x in gathered:
+                        code.append(f"x{n_variables} = {x}")
+                        x = f"x{n_variables}"
+                        n_variables += 1
+
+                    gathered.append(x)
+
+                variables = gathered
+
+            for operation in step.operations:
+                code.extend(operation.scalar_code(variables, constant))
+
+            if step.products is not None:
+                variables = list(variables)
+
+                for a, b in step.products.tolist():
+                    code.append(f"x{n_variables} = {variables[a]} * {variables[b]}")
+                    variables.append(f"x{n_variables}")
+                    n_variables += 1
+
+        if output_columns is None:
+            output_columns = columns
+
+        output = ", ".join(
+            f"{column!r}: {x}" for column, x in zip(output_columns, variables)
+        )
+        code.append(f"return {{{output}}}")
+
+        source = "def transform_record(record):\n    " + "\n    ".join(code)
+
+        exec(compile(source, "<transform_record>", "exec"), namespace)
+
+        return namespace["transform_record"]
+
+
+def apply_operation(
+    X: pd.DataFrame or np.ndarray, operation: Operation
+) -> pd.DataFrame or np.ndarray:
+    """Applies a single operation to the input dataframe.
+
+    Parameters
+    ----------
+    X : pd.DataFrame or np.ndarray
+        Input data of shape (n_samples, n_features).
+    operation : Operation
+        The operation over all the columns of X, or None to leave\
+        the data unchanged.
+
+    Returns
+    -------
+    pd.DataFrame or np.ndarray
+        The transformed data, of the same type as X.
+    """
+
+    if operation is None:
+        return X
+
+    program = Program([ProgramStep([operation])])
+
+    if isinstance(X, np.ndarray):
+        return program.run(to_buffer(X))
+
+    return program.transform(X)
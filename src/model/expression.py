@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import ast
+import typing
+import numpy as np
+
+VARIABLE = "x"
+
+INPUT = "x"
+
+OUTPUT = "out"
+
+FUNCTIONS = {
+    name: getattr(np, name)
+    for name in (
+        "abs",
+        "exp",
+        "expm1",
+        "log",
+        "log10",
+        "log2",
+        "log1p",
+        "sqrt",
+        "cbrt",
+        "square",
+        "reciprocal",
+        "sign",
+        "floor",
+        "ceil",
+        "sin",
+        "cos",
+        "tanh",
+        "arcsinh",
+        "minimum",
+        "maximum",
+    )
+}
+
+OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Pow: np.power,
+}
+
+POWERS = {2.0: np.square, 0.5: np.sqrt}
+
+
+class Instruction(typing.NamedTuple):
+    """A ufunc call of an expression, whose arguments are the input, float
+    constants or registers, and whose result is written in a register or
+    in the output."""
+
+    function: np.ufunc
+    arguments: tuple
+    out: int or str
+
+
+class Expression:
+    """
+    Expression.
+
+    An arithmetic expression of a variable ``x``, as ``log1p(x) * 2 - 1`` or
+    ``clip(x, 0, 5) ** 0.5``, parsed once into a list of numpy ufunc calls.
+    The calls run over whole arrays and write their results in the output
+    or in scratch buffers of its shape, with ``out=``, so an evaluation
+    allocates at most one buffer per intermediate result that is alive at
+    the same time, and none when ``x`` is used once.
+
+    The expressions hold numbers, ``x``, the operators ``+``, ``-``, ``*``,
+    ``/`` and ``**``, the functions of ``FUNCTIONS``, as ``log``, ``sqrt``
+    or ``maximum``, and ``clip(a, lower, upper)``. Constant subexpressions
+    are computed at parse time.
+
+    Parameters
+    ----------
+    source : str
+        The expression.
+
+    Raises
+    ------
+    ValueError
+        If the expression is not valid or does not depend on ``x``.
+    """
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+    def __init__(self, source: str):
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as err:
+            raise ValueError(
+                f"The expression {source!r} is not valid: {err.msg}."
+            ) from err
+
+        self.source = ast.unparse(tree)
+        self.instructions = []
+
+        self.__n_uses = 0
+        self.__n_registers = 0
+        self.__free = []
+
+        result = self.__compile(tree.body)
+
+        if result != INPUT and not isinstance(result, int):
+            raise ValueError(f"The expression {source!r} does not depend on x.")
+
+        if self.__n_uses == 1:
+            self.n_registers = 0
+            self.instructions = [
+                Instruction(
+                    instruction.function,
+                    tuple(
+                        OUTPUT if isinstance(argument, int) else argument
+                        for argument in instruction.arguments
+                    ),
+                    OUTPUT,
+                )
+                for instruction in self.instructions
+            ]
+
+        else:
+            self.n_registers = self.__n_registers
+            if self.instructions:
+                self.instructions[-1] = self.instructions[-1]._replace(out=OUTPUT)
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """Evaluates the expression into a new float array."""
+        values = np.asarray(values)
+        return self.evaluate(values, np.empty(values.shape, dtype=np.float64))
+
+    def __eq__(self, other):
+        return isinstance(other, Expression) and self.source == other.source
+
+    def __hash__(self):
+        return hash((Expression, self.source))
+
+    def __getstate__(self):
+        return {"source": self.source}
+
+    def __setstate__(self, state):
+        self.__init__(state["source"])
+
+    def evaluate(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Evaluates the expression over an array.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of ``x``.
+        out : np.ndarray
+            The float array of the same shape the result is written to,\
+            which may be ``values`` itself.
+
+        Returns
+        -------
+        np.ndarray
+            The output.
+        """
+
+        if not self.instructions:
+            if out is not values:
+                np.copyto(out, values)
+            return out
+
+        registers = [np.empty_like(out) for _ in range(self.n_registers)]
+
+        def resolve(argument):
+            if argument == INPUT:
+                return values
+            if argument == OUTPUT:
+                return out
+            if isinstance(argument, int):
+                return registers[argument]
+            return argument
+
+        for function, arguments, target in self.instructions:
+            function(
+                *[resolve(argument) for argument in arguments], out=resolve(target)
+            )
+
+        return out
+
+    def scalar_code(self, x: str, constant: typing.Callable) -> typing.List[str]:
+        """Returns the Python statements that evaluate the expression for
+        a scalar variable and assign the result to it, with the same float
+        arithmetic as :meth:`evaluate`.
+
+        Parameters
+        ----------
+        x : str
+            The variable name.
+        constant : callable
+            Registers a value in the namespace of the generated code\
+            and returns its name.
+
+        Returns
+        -------
+        list of str
+            The statements.
+        """
+
+        def resolve(argument):
+            if argument in (INPUT, OUTPUT):
+                return x
+            if isinstance(argument, int):
+                return f"{x}_{argument}"
+            return constant(argument)
+
+        return [
+            f"{resolve(target)} = float({constant(function)}("
+            + ", ".join(resolve(argument) for argument in arguments)
+            + "))"
+            for function, arguments, target in self.instructions
+        ]
+
+    def __compile(self, node: ast.AST) -> float or int or str:
+        """Appends the instructions of a node, and returns the constant,
+        input or register holding its value."""
+
+        if isinstance(node, ast.Name) and node.id == VARIABLE:
+            self.__n_uses += 1
+            return INPUT
+
+        if (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, (int, float))
+            and not isinstance(node.value, bool)
+        ):
+            return float(node.value)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self.__compile(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            return self.__emit(np.negative, operand)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+            left = self.__compile(node.left)
+            right = self.__compile(node.right)
+
+            if (
+                type(node.op) is ast.Pow
+                and isinstance(right, float)
+                and right in POWERS
+            ):
+                return self.__emit(POWERS[right], left)
+
+            return self.__emit(OPERATORS[type(node.op)], left, right)
+
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and not node.keywords
+        ):
+            name = node.func.id
+
+            if name == "clip" and len(node.args) == 3:
+                value, lower, upper = [self.__compile(arg) for arg in node.args]
+                return self.__emit(
+                    np.minimum, self.__emit(np.maximum, value, lower), upper
+                )
+
+            if name in FUNCTIONS and len(node.args) == FUNCTIONS[name].nin:
+                arguments = [self.__compile(arg) for arg in node.args]
+                return self.__emit(FUNCTIONS[name], *arguments)
+
+        raise ValueError(
+            f"The expression {ast.unparse(node)!r} is not supported. Expressions"
+            f" hold numbers, {VARIABLE}, +, -, *, /, **, clip and the functions"
+            f" {', '.join(FUNCTIONS)}."
+        )
+
+    def __emit(self, function: np.ufunc, *arguments) -> float or int:
+        """Appends a ufunc call, or computes it when its arguments are
+        constants, and returns its register or value."""
+
+        if all(isinstance(argument, float) for argument in arguments):
+            with np.errstate(all="ignore"):
+                return float(function(*arguments))
+
+        registers = [argument for argument in arguments if isinstance(argument, int)]
+
+        if registers:
+            out = registers[0]
+            self.__free.extend(registers[1:])
+
+        elif self.__free:
+            out = self.__free.pop()
+
+        else:
+            out = self.__n_registers
+            self.__n_registers += 1
+
+        self.instructions.append(Instruction(function, tuple(arguments), out))
+
+        return out
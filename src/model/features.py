@@ -1,6 +1,5 @@
 import numpy as np
 import pandas as pd
-from sklearn.base import BaseEstimator, TransformerMixin
 
 
 def build_features(X: pd.DataFrame, y: pd.Series) -> tuple:
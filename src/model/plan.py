@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import json
+import typing
+import hashlib
+import itertools
+import collections
+
+NON_STEP_KEYS = (
+    "name",
+    "active",
+    "type",
+    "encode",
+    "polynomial_degree",
+    "interactions",
+)
+
+CACHE_SIZE = 128
+
+
+class Action(typing.NamedTuple):
+    """A preprocessing step of a feature."""
+
+    feature: str
+    position: int
+    key: str
+    value: typing.Any
+
+
+class ActionGroup(typing.NamedTuple):
+    """The features that share a preprocessing step configuration."""
+
+    key: str
+    value: typing.Any
+    features: typing.Tuple[str, ...]
+    positions: typing.Tuple[int, ...]
+
+
+class ActionPlan:
+    """
+    ActionPlan.
+
+    The ordered preprocessing steps of a features configuration. The i-th
+    step holds the i-th configured action of every active feature, in the
+    feature order, and features with fewer actions get an identity
+    transformation. Use :func:`compile_plan` to create it. One-hot encoded
+    features are expanded out of the float buffer, so they are not planned.
+
+    The actions of a step that share the same key and value are also
+    gathered in ``groups``, so that each group runs as a single transformer
+    over all its columns.
+
+    The ``chains`` hold the (key, value) pairs of the steps of each feature,
+    which identify its fit. The interaction terms are computed after the
+    steps. The features with
+    a ``polynomial_degree`` get every product of up to that many of them,
+    powers included, and the ``interactions`` of a feature list the
+    features it is multiplied with. Inactive features are left out.
+
+    Parameters
+    ----------
+    features : sequence of str
+        The names of the active features, in the buffer order.
+    steps : sequence of sequence of Action
+        The actions of each step.
+    interactions : sequence of tuple of int, optional
+        The buffer positions of the factors of each interaction term,\
+        by degree, with every term preceded by its term without the last\
+        factor when it has more than two factors.
+    """
+
+    def __repr__(self):
+        return (
+            f"ActionPlan(n_features={len(self.features)}, "
+            f"n_steps={len(self.steps)}, n_interactions={len(self.interactions)})"
+        )
+
+    def __init__(
+        self,
+        features: typing.Sequence[str],
+        steps: typing.Sequence[typing.Sequence[Action]],
+        interactions: typing.Sequence[typing.Tuple[int, ...]] = (),
+    ):
+        self.features = tuple(features)
+        self.steps = tuple(tuple(step) for step in steps)
+        self.groups = tuple(self.__group(step) for step in self.steps)
+        self.chains = self.__chain(len(self.features), self.steps)
+        self.interactions = tuple(tuple(term) for term in interactions)
+        self.interaction_names = tuple(
+            self.__name_interaction(term) for term in self.interactions
+        )
+
+    @classmethod
+    def from_config(cls, features_config: typing.List[dict]) -> ActionPlan:
+        """Builds the plan of a features configuration, in linear time on
+        the number of features times the number of steps.
+
+        Parameters
+        ----------
+        features_config : list of dict
+            The features configuration, as in ``config/features.yaml``.
+
+        Returns
+        -------
+        ActionPlan
+            The plan.
+        """
+
+        features = [
+            config
+            for config in features_config
+            if config.get("active", True) and config.get("encode") != "onehot"
+        ]
+
+        keys = [
+            [key for key in config if key not in NON_STEP_KEYS] for config in features
+        ]
+
+        n_steps = max((len(feature_keys) for feature_keys in keys), default=0)
+
+        steps = [
+            [
+                (
+                    Action(
+                        config["name"],
+                        position,
+                        feature_keys[order],
+                        config[feature_keys[order]],
+                    )
+                    if order < len(feature_keys)
+                    else Action(config["name"], position, "transformation", "identity")
+                )
+                for position, (config, feature_keys) in enumerate(zip(features, keys))
+            ]
+            for order in range(n_steps)
+        ]
+
+        return cls(
+            [config["name"] for config in features],
+            steps,
+            cls.__plan_interactions(features),
+        )
+
+    @staticmethod
+    def __plan_interactions(
+        features: typing.List[dict],
+    ) -> typing.List[typing.Tuple[int, ...]]:
+        """Lists the interaction terms of the planned features, by degree
+        and then by the positions of their factors."""
+
+        positions = {
+            config["name"]: position for position, config in enumerate(features)
+        }
+
+        degrees = {
+            position: int(config["polynomial_degree"])
+            for position, config in enumerate(features)
+            if config.get("polynomial_degree") is not None
+        }
+
+        terms = set()
+
+        for degree in range(2, max(degrees.values(), default=1) + 1):
+            eligible = [position for position in degrees if degrees[position] >= degree]
+            terms.update(itertools.combinations_with_replacement(eligible, degree))
+
+        for position, config in enumerate(features):
+            for name in config.get("interactions") or []:
+                if name in positions:
+                    terms.add(tuple(sorted((position, positions[name]))))
+
+        return sorted(terms, key=lambda term: (len(term), term))
+
+    def __name_interaction(self, term: typing.Tuple[int, ...]) -> str:
+        """Names a term after its factors, as ``a^2*b``."""
+
+        return "*".join(
+            name if power == 1 else f"{name}^{power}"
+            for name, power in collections.Counter(
+                self.features[position] for position in term
+            ).items()
+        )
+
+    @staticmethod
+    def __chain(
+        n_features: int, steps: typing.Sequence[typing.Sequence[Action]]
+    ) -> typing.Tuple[typing.Tuple[tuple, ...], ...]:
+        """Lists the (key, value) pairs of the steps of each feature, with
+        the identity transformations that pad the plan left out."""
+
+        chains = [[] for _ in range(n_features)]
+
+        for step in steps:
+            for action in step:
+                chains[action.position].append((action.key, action.value))
+
+        for chain in chains:
+            while chain and chain[-1] == ("transformation", "identity"):
+                chain.pop()
+
+        return tuple(tuple(chain) for chain in chains)
+
+    @staticmethod
+    def __group(step: typing.Sequence[Action]) -> typing.Tuple[ActionGroup, ...]:
+        """Groups the actions of a step by key and value, in the order of
+        their first feature."""
+
+        groups = {}
+
+        for action in step:
+            group = (action.key, repr(action.value))
+
+            if group not in groups:
+                groups[group] = (action.value, [], [])
+
+            groups[group][1].append(action.feature)
+            groups[group][2].append(action.position)
+
+        return tuple(
+            ActionGroup(key, value, tuple(features), tuple(positions))
+            for (key, _), (value, features, positions) in groups.items()
+        )
+
+
+def hash_config(features_config: typing.List[dict]) -> str:
+    """Hashes a features configuration. The order of the features and of
+    their keys is part of the hash, since it defines the step order.
+
+    Parameters
+    ----------
+    features_config : list of dict
+        The features configuration.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest of the configuration.
+    """
+
+    return hashlib.sha256(
+        json.dumps([dict(config) for config in features_config], default=str).encode(
+            "utf-8"
+        )
+    ).hexdigest()
+
+
+_plans = collections.OrderedDict()
+
+
+def compile_plan(features_config: typing.List[dict]) -> ActionPlan:
+    """Returns the plan of a features configuration, from a cache keyed
+    by the configuration hash, so equal configurations are compiled once.
+    The cache keeps the ``CACHE_SIZE`` most recently used plans.
+
+    Parameters
+    ----------
+    features_config : list of dict
+        The features configuration, as in ``config/features.yaml``.
+
+    Returns
+    -------
+    ActionPlan
+        The plan, shared by every caller with an equal configuration.
+    """
+
+    key = hash_config(features_config)
+
+    if key in _plans:
+        _plans.move_to_end(key)
+        return _plans[key]
+
+    plan = ActionPlan.from_config(features_config)
+
+    _plans[key] = plan
+
+    while len(_plans) > CACHE_SIZE:
+        _plans.popitem(last=False)
+
+    return plan
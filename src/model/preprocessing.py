@@ -4,21 +4,48 @@ import numpy as np
 import pandas as pd
 import logging
 import typing
+import contextlib
+import src.model
 from src.config import *
-from src.base.commons import dataframe_transformer
-from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import (
-    MinMaxScaler,
-    StandardScaler,
-    RobustScaler,
-    KBinsDiscretizer,
+from src.base.commons import dataframe_transformer, wrap_like, cast_dtypes
+from src.base.memory import trace_memory
+from src.base.file import read_file_chunks, ChunkWriter
+from src.model.engine import (
+    Operation,
+    FillOperation,
+    ClipOperation,
+    UfuncOperation,
+    ExpressionOperation,
+    MultiplyOperation,
+    MultiplyAddOperation,
+    SubtractDivideOperation,
+    DiscretizeOperation,
+    ProgramStep,
+    Program,
+    CAST_BLOCK_ROWS,
+    apply_operation,
+    interaction_products,
+    to_buffer,
 )
-from sklearn import compose
-from sklearn.pipeline import Pipeline
+from src.model.artifact import save_artifact
+from src.model.cache import StepCache, hash_feature
+from src.model.plan import ActionPlan, compile_plan
+from src.model.expression import Expression
+from src.model.profiling import Profiler
+from src.model.statistics import (
+    SAMPLE_SIZE,
+    RunningStatistics,
+    handle_zeros_in_scale,
+)
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from joblib import Parallel, delayed, parallel_backend
 
 # from IPython.display import display
 
+logger = logging.getLogger(__name__)
+
+batch_logger = logging.getLogger(f"{__name__}.batches")
+
 
 class Identity(BaseEstimator, TransformerMixin):
     """Identity transformer"""
@@ -29,6 +56,9 @@ class Identity(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         return self
 
+    def partial_fit(self, X, y=None):
+        return self
+
     def transform(self, X, y=None):
         return X
 
@@ -36,6 +66,9 @@ class Identity(BaseEstimator, TransformerMixin):
         self.fit(X)
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        return None
+
 
 class ColumnTransformer:
     """
@@ -112,9 +145,14 @@ class ColumnTransformer:
     """
 
     def __init__(self, *args, **kwargs):
+        from sklearn import compose
+
         self.column_transformer = compose.ColumnTransformer(*args, **kwargs)
+        self.transformers_ = None
+        self.partially_fitted = False
+        self.separately_fitted = False
 
-    def fit(self, X, y=None):
+    def fit(self, X, y=None, profiler: Profiler = None, transform_order: int = None):
         """Fit all transformers using X.
         Parameters
         ----------
@@ -123,20 +161,248 @@ class ColumnTransformer:
             transformers.
         y : array-like of shape (n_samples,...), default=None
             Targets for supervised learning.
+        profiler : Profiler, optional
+            A profiler that measures the fit of each transformer. The\
+            transformers are then fitted one after the other.
+        transform_order : int, optional
+            The position of the step, for the profiler.
         Returns
         -------
         self : ColumnTransformer
             This estimator.
         """
+        if profiler is not None:
+            self.__fit_each(X, y, profiler, transform_order, transform=False)
+            return self
+
         self.column_transformer.fit(X, y)
+        self.transformers_ = self.column_transformer.transformers_
+        self.partially_fitted = False
+        self.separately_fitted = False
         return self
 
-    def transform(self, X: pd.DataFrame, y: pd.Series = None):
-        return dataframe_transformer(X, self.column_transformer)
+    def fit_transform(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series = None,
+        profiler: Profiler = None,
+        transform_order: int = None,
+    ) -> pd.DataFrame:
+        """Fit all transformers using X and return the transformed data,\
+        running each transformer over the data only once.
 
-    def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
-        self.fit(X)
-        return self.transform(X)
+        Parameters
+        ----------
+        X : {array-like, dataframe} of shape (n_samples, n_features)
+            Input data, of which specified subsets are used to fit the
+            transformers.
+        y : array-like of shape (n_samples,...), default=None
+            Targets for supervised learning.
+        profiler : Profiler, optional
+            A profiler that measures the fit of each transformer. The\
+            transformers are then fitted one after the other.
+        transform_order : int, optional
+            The position of the step, for the profiler.
+        Returns
+        -------
+        pd.DataFrame or np.ndarray
+            The transformed data, of the same type as X.
+        """
+        if profiler is not None:
+            result = self.__fit_each(X, y, profiler, transform_order, transform=True)
+            return wrap_like(X, self.__restore_order(result))
+
+        result = self.column_transformer.fit_transform(X, y)
+        self.transformers_ = self.column_transformer.transformers_
+        self.partially_fitted = False
+        self.separately_fitted = False
+        return wrap_like(X, self.__restore_order(result))
+
+    def partial_fit(self, X, y=None):
+        """Incrementally fit all transformers using a chunk of X.
+
+        The first call after construction or after ``fit`` starts\
+        from fresh copies of the transformers.
+
+        Parameters
+        ----------
+        X : dataframe of shape (n_samples, n_features)
+            Input data chunk, of which specified subsets are used to\
+            fit the transformers.
+        y : array-like of shape (n_samples,...), default=None
+            Targets for supervised learning.
+        Returns
+        -------
+        self : ColumnTransformer
+            This estimator.
+        """
+
+        if not self.partially_fitted:
+            self.separately_fitted = False
+            self.transformers_ = [
+                (name, clone(transformer), columns)
+                for name, transformer, columns in self.column_transformer.transformers
+            ]
+            self.partially_fitted = True
+
+        fitted = Parallel(n_jobs=self.column_transformer.n_jobs)(
+            delayed(_partial_fit_one)(transformer, _select_columns(X, columns), y)
+            for _, transformer, columns in self.transformers_
+        )
+
+        self.transformers_ = [
+            (name, transformer, columns)
+            for (name, _, columns), transformer in zip(self.transformers_, fitted)
+        ]
+
+        return self
+
+    def transform(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series = None,
+        profiler: Profiler = None,
+        transform_order: int = None,
+    ):
+
+        if profiler is not None:
+            results = []
+
+            for _, transformer, columns in self.transformers_:
+                with profiler.measure(
+                    transform_order,
+                    type(transformer).__name__,
+                    _column_positions(columns),
+                    len(X),
+                ):
+                    results.append(
+                        np.asarray(transformer.transform(_select_columns(X, columns)))
+                    )
+
+            result = np.hstack(results)
+
+        elif not (self.partially_fitted or self.separately_fitted):
+            result = self.column_transformer.transform(X)
+
+        else:
+            result = np.hstack(
+                [
+                    np.asarray(transformer.transform(_select_columns(X, columns)))
+                    for _, transformer, columns in self.transformers_
+                ]
+            )
+
+        return wrap_like(X, self.__restore_order(result))
+
+    def __fit_each(
+        self,
+        X: pd.DataFrame or np.ndarray,
+        y: pd.Series,
+        profiler: Profiler,
+        transform_order: int,
+        transform: bool,
+    ) -> np.ndarray or None:
+        """Fits fresh copies of the transformers one after the other,\
+        measuring each fit, and returns their stacked outputs when\
+        ``transform`` is set."""
+
+        self.transformers_ = []
+        results = []
+
+        for name, transformer, columns in self.column_transformer.transformers:
+
+            transformer = clone(transformer)
+            selected = _select_columns(X, columns)
+
+            with profiler.measure(
+                transform_order,
+                type(transformer).__name__,
+                _column_positions(columns),
+                len(X),
+            ):
+                if transform:
+                    results.append(np.asarray(transformer.fit_transform(selected, y)))
+                else:
+                    transformer.fit(selected, y)
+
+            self.transformers_.append((name, transformer, columns))
+
+        self.partially_fitted = False
+        self.separately_fitted = True
+
+        return np.hstack(results) if transform else None
+
+    def __restore_order(self, result: np.ndarray) -> np.ndarray:
+        """Sorts the output columns by their input position, as the\
+        transformers may select the columns in any order.
+
+        Parameters
+        ----------
+        result : np.ndarray
+            The concatenated outputs of the transformers.
+
+        Returns
+        -------
+        np.ndarray
+            The output columns in the input order.
+        """
+
+        columns = [
+            column
+            for _, transformer, columns in self.transformers_
+            if not (isinstance(transformer, str) and transformer == "drop")
+            for column in _column_positions(columns)
+        ]
+
+        if all(a < b for a, b in zip(columns[:-1], columns[1:])):
+            return result
+
+        return result[:, np.argsort(columns, kind="stable")]
+
+
+def _select_columns(
+    X: pd.DataFrame or np.ndarray, columns: typing.List[int]
+) -> pd.DataFrame or np.ndarray:
+    """Selects columns by position, from a dataframe or a numpy array."""
+    if isinstance(X, np.ndarray):
+        return X[:, columns]
+    return X.iloc[:, columns]
+
+
+def _as_columns(positions: typing.Sequence[int]) -> slice or typing.List[int]:
+    """Returns consecutive column positions as a slice, so that the columns
+    are selected as a view, and other positions as a list."""
+    positions = list(positions)
+    if positions == list(range(positions[0], positions[0] + len(positions))):
+        return slice(positions[0], positions[0] + len(positions))
+    return positions
+
+
+def _column_positions(columns: slice or typing.List[int]) -> typing.List[int]:
+    """Returns the column positions selected by a slice or a list."""
+    if isinstance(columns, slice):
+        return list(range(columns.start, columns.stop))
+    return [int(column) for column in columns]
+
+
+def _as_series(X: pd.Series or pd.DataFrame or np.ndarray) -> pd.Series:
+    """Returns a single feature as a series."""
+
+    if isinstance(X, pd.DataFrame):
+        return X.iloc[:, 0]
+
+    if isinstance(X, pd.Series):
+        return X
+
+    return pd.Series(np.ravel(X))
+
+
+def _partial_fit_one(
+    transformer: TransformerMixin, X: pd.DataFrame, y: pd.Series = None
+) -> TransformerMixin:
+    """Incrementally fit a transformer and return it, so that the
+    result is kept when it runs in another process."""
+    return transformer.partial_fit(X, y)
 
 
 class FeatureTransformer(BaseEstimator, TransformerMixin):
@@ -147,9 +413,12 @@ class FeatureTransformer(BaseEstimator, TransformerMixin):
 
     Parameters
     ----------
-        transformation : {'log', 'log10', 'exp', 'square',\
-            'sqrt', 'identity'}, default='identity'
-            A string with the decription of a transformation to be applied.
+        transformation : {'log', 'log10', 'log1p', 'exp', 'square',\
+            'sqrt', 'identity'} or str, default='identity'
+            A string with the decription of a transformation to be applied,\
+            or an arithmetic expression of ``x``, as ``log1p(x) * 2 - 1``\
+            or ``clip(x, 0, 5) ** 0.5``, parsed once into a vectorized\
+            :class:`Expression`.
     """
 
     def __init__(self, transformation: str = "identity"):
@@ -172,8 +441,26 @@ class FeatureTransformer(BaseEstimator, TransformerMixin):
         self : FeatureTransformer
             This estimator.
         """
+        self.n_features_in_ = X.shape[1]
         return self
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureTransformer:
+        """Incrementally fit transformations using a chunk of X.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureTransformer
+            This estimator.
+        """
+        return self.fit(X)
+
     def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
         """Applies the transformation to the input dataframe.
 
@@ -191,10 +478,15 @@ class FeatureTransformer(BaseEstimator, TransformerMixin):
         """
 
         try:
-            X = X.apply(self.transformer)
+            if isinstance(X, np.ndarray):
+                X = self.transformer(X)
+            elif isinstance(self.transformer, Expression):
+                X = wrap_like(X, self.transformer(X.to_numpy(dtype=np.float64)))
+            else:
+                X = X.apply(self.transformer)
 
         except Exception as err:
-            logging.error(err)
+            logger.error(err)
             raise err
 
         return X
@@ -219,19 +511,43 @@ class FeatureTransformer(BaseEstimator, TransformerMixin):
 
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        """Returns the fitted transformation as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        if self.transformation == "identity":
+            return None
+
+        if isinstance(self.transformer, Expression):
+            return ExpressionOperation(self.transformer, n_columns=self.n_features_in_)
+
+        return UfuncOperation(self.transformer, n_columns=self.n_features_in_)
+
     def __interpret_transformation(self, transformation: str = "identity") -> function:
         """Returns a function related to the transformation operation.
 
         Parameters
         ----------
-        transformation : {'log', 'log10', 'exp', 'square',\
-            'sqrt', 'identity'}, default='identity'
-            A string with the decription of a transformation to be applied.
+        transformation : {'log', 'log10', 'log1p', 'exp', 'square',\
+            'sqrt', 'identity'} or str, default='identity'
+            A string with the decription of a transformation to be applied,\
+            or an arithmetic expression of ``x``.
 
         Returns
         -------
         function
             A function related to the transformation operation.
+
+        Raises
+        ------
+        ValueError
+            If the transformation is neither a name nor a valid expression.
         """
 
         if transformation == "log":
@@ -255,6 +571,16 @@ class FeatureTransformer(BaseEstimator, TransformerMixin):
         elif transformation == "identity":
             return lambda x: x
 
+        elif isinstance(transformation, str):
+            try:
+                return Expression(transformation)
+
+            except ValueError as err:
+                raise ValueError(
+                    f"The value {transformation} for 'transformation' is not"
+                    f" supported: {err}"
+                ) from err
+
         else:
             raise ValueError(
                 f"The value {transformation} for 'transformation' is not supported."
@@ -297,8 +623,26 @@ class FeatureClipper(BaseEstimator, TransformerMixin):
         self : FeatureClipper
             This estimator.
         """
+        self.n_features_in_ = X.shape[1]
         return self
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureClipper:
+        """Incrementally fit clipper using a chunk of X.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureClipper
+            This estimator.
+        """
+        return self.fit(X)
+
     def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
         """Applies the clip operation to the input dataframe.
 
@@ -316,10 +660,18 @@ class FeatureClipper(BaseEstimator, TransformerMixin):
         """
 
         try:
-            X = X.clip(*self.limits)
+            if isinstance(X, np.ndarray):
+                lower, upper = self.limits
+                X = np.clip(
+                    X,
+                    -np.inf if lower is None else lower,
+                    np.inf if upper is None else upper,
+                )
+            else:
+                X = X.clip(*self.limits)
 
         except Exception as err:
-            logging.error(err)
+            logger.error(err)
             raise err
 
         return X
@@ -343,6 +695,22 @@ class FeatureClipper(BaseEstimator, TransformerMixin):
 
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        """Returns the fitted clip operation as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        lower, upper = self.limits
+
+        return ClipOperation(
+            lower=[lower] * self.n_features_in_, upper=[upper] * self.n_features_in_
+        )
+
 
 class FeatureImputer(BaseEstimator, TransformerMixin):
     """
@@ -369,6 +737,8 @@ class FeatureImputer(BaseEstimator, TransformerMixin):
 
         self.imputer = self.__interpret_imputation(self.strategy, self.parameter)
 
+        self.statistics = None
+
     def fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureImputer:
         """Fit imputer using X.
 
@@ -385,6 +755,35 @@ class FeatureImputer(BaseEstimator, TransformerMixin):
             This estimator.
         """
         self.imputer.fit(X)
+        self.statistics = None
+        return self
+
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureImputer:
+        """Incrementally fit imputer using a chunk of X.
+
+        The imputation values are computed from running statistics,\
+        and the median is estimated from a bounded-memory sample.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureImputer
+            This estimator.
+        """
+
+        if self.statistics is None:
+            self.statistics = RunningStatistics(
+                sample_size=SAMPLE_SIZE if self.strategy == "median" else 0
+            )
+
+        self.statistics.update(to_buffer(X))
+
         return self
 
     def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
@@ -402,6 +801,9 @@ class FeatureImputer(BaseEstimator, TransformerMixin):
         pd.DataFrame
             The transformed dataframe.
         """
+        if self.statistics is not None:
+            return apply_operation(X, self.get_operation())
+
         return dataframe_transformer(X, self.imputer)
 
     def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
@@ -424,6 +826,32 @@ class FeatureImputer(BaseEstimator, TransformerMixin):
 
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        """Returns the fitted imputation as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        if isinstance(self.imputer, Identity):
+            return None
+
+        if self.statistics is None:
+            return FillOperation(values=self.imputer.statistics_)
+
+        if self.strategy == "mean":
+            return FillOperation(values=self.statistics.mean)
+
+        elif self.strategy == "median":
+            return FillOperation(values=self.statistics.quantile(0.5))
+
+        else:
+            value = 0 if self.parameter is None else self.parameter
+            return FillOperation(values=[value] * len(self.statistics.mean))
+
     def __interpret_imputation(
         self, imputation: str = "mean", param: typing.Any = None
     ) -> TransformerMixin:
@@ -445,6 +873,8 @@ class FeatureImputer(BaseEstimator, TransformerMixin):
             A sklearn-like transformation class.
         """
 
+        from sklearn.impute import SimpleImputer
+
         if imputation == "mean":
             return SimpleImputer(strategy="mean")
 
@@ -476,6 +906,7 @@ class FeatureScaler(BaseEstimator, TransformerMixin):
         """Class constructor"""
         self.strategy = strategy
         self.scaler = self.__interpret_scaler(self.strategy)
+        self.statistics = None
 
     def fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureScaler:
         """Fit scaler using X.
@@ -495,6 +926,37 @@ class FeatureScaler(BaseEstimator, TransformerMixin):
 
         self.scaler.fit(X)
 
+        self.statistics = None
+
+        return self
+
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureScaler:
+        """Incrementally fit scaler using a chunk of X.
+
+        The scaling parameters are computed from running statistics:\
+        running min and max, Welford mean and variance, and a\
+        bounded-memory sample for the median and quartiles.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureScaler
+            This estimator.
+        """
+
+        if self.statistics is None:
+            self.statistics = RunningStatistics(
+                sample_size=SAMPLE_SIZE if self.strategy == "robust" else 0
+            )
+
+        self.statistics.update(to_buffer(X))
+
         return self
 
     def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
@@ -512,6 +974,9 @@ class FeatureScaler(BaseEstimator, TransformerMixin):
         pd.DataFrame
             The transformed dataframe.
         """
+        if self.statistics is not None:
+            return apply_operation(X, self.get_operation())
+
         return dataframe_transformer(X, self.scaler)
 
     def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
@@ -534,6 +999,68 @@ class FeatureScaler(BaseEstimator, TransformerMixin):
 
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        """Returns the fitted scaling as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        if self.statistics is not None:
+            return self.__get_running_operation()
+
+        if self.strategy == "min_max":
+            return MultiplyAddOperation(
+                scale=self.scaler.scale_, offset=self.scaler.min_
+            )
+
+        elif self.strategy == "standard":
+            return SubtractDivideOperation(
+                center=self.scaler.mean_, scale=self.scaler.scale_
+            )
+
+        elif self.strategy == "robust":
+            return SubtractDivideOperation(
+                center=self.scaler.center_, scale=self.scaler.scale_
+            )
+
+        else:
+            return None
+
+    def __get_running_operation(self) -> Operation:
+        """Returns the scaling fitted by partial_fit as an engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        if self.strategy == "min_max":
+            scale = 1 / handle_zeros_in_scale(self.statistics.max - self.statistics.min)
+            return MultiplyAddOperation(
+                scale=scale, offset=-self.statistics.min * scale
+            )
+
+        elif self.strategy == "standard":
+            return SubtractDivideOperation(
+                center=self.statistics.mean,
+                scale=handle_zeros_in_scale(np.sqrt(self.statistics.var)),
+            )
+
+        elif self.strategy == "robust":
+            lower, center, upper = self.statistics.quantile([0.25, 0.5, 0.75])
+            return SubtractDivideOperation(
+                center=center, scale=handle_zeros_in_scale(upper - lower)
+            )
+
+        else:
+            return None
+
     def __interpret_scaler(self, scaler: str = "min_max") -> TransformerMixin:
         """Returns a class related to the scale strategy.
 
@@ -548,6 +1075,8 @@ class FeatureScaler(BaseEstimator, TransformerMixin):
             A sklearn-like transformation class.
         """
 
+        from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler
+
         if scaler == "min_max":
             return MinMaxScaler()
 
@@ -595,8 +1124,26 @@ class FeatureWeigher(BaseEstimator, TransformerMixin):
         self : FeatureWeigher
             This estimator.
         """
+        self.n_features_in_ = X.shape[1]
         return self
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureWeigher:
+        """Incrementally fit weigher using a chunk of X.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureWeigher
+            This estimator.
+        """
+        return self.fit(X)
+
     def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
         """Applies the operation to the input dataframe.
 
@@ -612,6 +1159,9 @@ class FeatureWeigher(BaseEstimator, TransformerMixin):
         pd.DataFrame
             The transformed dataframe.
         """
+        if isinstance(X, np.ndarray):
+            return X * self.weight
+
         for col in X.columns:
             X[col] = X[col] * self.weight
 
@@ -635,12 +1185,26 @@ class FeatureWeigher(BaseEstimator, TransformerMixin):
         self.fit(X)
         return self.transform(X)
 
+    def get_operation(self) -> Operation:
+        """Returns the fitted weighting as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        return MultiplyOperation(factors=[self.weight] * self.n_features_in_)
+
 
 class FeatureDiscretizer(BaseEstimator, TransformerMixin):
     """
     FeatureDiscretizer.
 
     Discretize features according to previously defined strategies.
+    Each value is replaced by a representative value of its bin, fitted
+    by aggregating the training values that fall in that bin.
 
     Parameters
     ----------
@@ -648,17 +1212,34 @@ class FeatureDiscretizer(BaseEstimator, TransformerMixin):
         A label to the discretize strategy
     n_bins : int, default=5
         The number of bins, by default 5
+    aggregation : {'mean', 'median', 'midpoint'}, default='mean'
+        How the representative value of each bin is computed: the mean\
+        or the median of the training values in the bin, or the midpoint\
+        between the bin edges. Empty bins keep their ordinal.
     """
 
-    def __init__(self, n_bins: int = 5, strategy: str = "uniform"):
+    def __init__(
+        self, n_bins: int = 5, strategy: str = "uniform", aggregation: str = "mean"
+    ):
 
         self.strategy = strategy
-        self.value_maps = None
         self.n_bins = n_bins
+        self.aggregation = aggregation
+        self.bin_edges = None
+        self.bin_values = None
+        self.statistics = None
+
+        from sklearn.preprocessing import KBinsDiscretizer
+
         self.discretizer = KBinsDiscretizer(
             encode="ordinal", strategy=self.strategy, n_bins=self.n_bins
         )
 
+        if self.aggregation not in ("mean", "median", "midpoint"):
+            raise ValueError(
+                f"The value {aggregation} for 'aggregation' is not supported."
+            )
+
     def fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureDiscretizer:
         """Fit discretizer using X.
 
@@ -677,36 +1258,662 @@ class FeatureDiscretizer(BaseEstimator, TransformerMixin):
 
         self.discretizer.fit(X)
 
-        self.__train_value_maps(X)
+        self.statistics = None
+
+        self.bin_edges = [
+            np.asarray(edges, dtype=np.float64) for edges in self.discretizer.bin_edges_
+        ]
+
+        self.__train_bin_values(
+            [to_buffer(_select_columns(X, [i]))[:, 0] for i in range(X.shape[1])]
+        )
 
         return self
 
-    def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
-        """Applies the operation to the input dataframe.
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> FeatureDiscretizer:
+        """Incrementally fit discretizer using a chunk of X.
+
+        The running min and max give the outer bin edges. The inner edges\
+        and the bin values are fitted on a bounded-memory uniform sample\
+        of the data seen so far, so they are approximations once more\
+        values than the sample size are seen. They are refitted lazily,\
+        on the next transform.
 
         Parameters
         ----------
         X : pd.DataFrame
-            Input data of shape (n_samples, n_features).
+            Input data chunk of shape (n_samples, n_features).
         y : pd.Series, optional
             Targets for supervised learning, by default None
 
         Returns
         -------
-        pd.DataFrame
-            The transformed dataframe.
+        self : FeatureDiscretizer
+            This estimator.
         """
-        X_result = dataframe_transformer(X, self.discretizer)
 
-        X_result = self.__apply_value_maps(X_result)
+        if self.statistics is None:
+            self.statistics = RunningStatistics()
 
-        return X_result
+        self.statistics.update(to_buffer(X))
 
-    def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
-        """Fit using X and return the transformed dataframe.
+        self.bin_edges = None
 
-        Parameters
-        ----------
+        return self
+
+    def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
+        """Applies the operation to the input dataframe.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed dataframe.
+        """
+
+        if self.bin_edges is None:
+            self.__fit_statistics()
+
+        X_result = np.empty(X.shape, dtype=np.float64, order="F")
+
+        for i in range(X.shape[1]):
+            np.take(
+                self.bin_values[i],
+                self.__get_ordinals(i, to_buffer(_select_columns(X, [i]))[:, 0]),
+                out=X_result[:, i],
+            )
+
+        return wrap_like(X, X_result)
+
+    def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
+        """Fit using X and return the transformed dataframe.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed dataframe.
+        """
+        self.fit(X)
+        return self.transform(X)
+
+    def get_operation(self) -> Operation:
+        """Returns the fitted discretization as a vectorized engine operation.
+
+        Returns
+        -------
+        Operation
+            The operation over the fitted columns, or None when
+            the data is left unchanged.
+        """
+
+        if self.bin_edges is None:
+            self.__fit_statistics()
+
+        return DiscretizeOperation(edges=self.bin_edges, values=self.bin_values)
+
+    def __fit_statistics(self) -> None:
+        """Fit the bin edges and values from the running statistics."""
+
+        self.bin_edges = []
+
+        for sample, lower, upper in zip(
+            self.statistics.samples, self.statistics.min, self.statistics.max
+        ):
+
+            if self.strategy == "uniform":
+                edges = np.linspace(lower, upper, self.n_bins + 1)
+
+            else:
+                edges = (
+                    clone(self.discretizer)
+                    .fit(sample.reshape(-1, 1))
+                    .bin_edges_[0]
+                    .astype(np.float64)
+                )
+                edges[0], edges[-1] = lower, upper
+
+            self.bin_edges.append(edges)
+
+        self.__train_bin_values(self.statistics.samples)
+
+    def __get_ordinals(self, i: int, values: np.ndarray) -> np.ndarray:
+        """Finds the bin ordinal of each value of the i-th column,\
+        exactly as KBinsDiscretizer does.
+
+        Parameters
+        ----------
+        i : int
+            The column position.
+        values : np.ndarray
+            The column values.
+
+        Returns
+        -------
+        np.ndarray
+            The bin ordinal of each value.
+        """
+        return np.searchsorted(self.bin_edges[i][1:-1], values, side="right")
+
+    def __train_bin_values(self, columns: typing.List[np.ndarray]) -> None:
+        """Fit the representative feature value in each discretized bin.
+
+        Parameters
+        ----------
+        columns : list of np.ndarray
+            The training values of each column.
+        """
+
+        self.bin_values = []
+
+        for i, edges in enumerate(self.bin_edges):
+
+            n_bins = len(edges) - 1
+
+            if self.aggregation == "midpoint":
+                self.bin_values.append((edges[:-1] + edges[1:]) / 2)
+                continue
+
+            values = columns[i]
+
+            ordinals = self.__get_ordinals(i, values)
+
+            counts = np.bincount(ordinals, minlength=n_bins)
+
+            bin_values = np.arange(n_bins, dtype=np.float64)
+
+            if self.aggregation == "mean":
+                sums = np.bincount(ordinals, weights=values, minlength=n_bins)
+                np.divide(sums, counts, out=bin_values, where=counts > 0)
+
+            else:
+                order = np.argsort(ordinals, kind="stable")
+                groups = np.split(values[order], np.cumsum(counts)[:-1])
+                for k, group in enumerate(groups):
+                    if len(group) > 0:
+                        bin_values[k] = np.median(group)
+
+            self.bin_values.append(bin_values)
+
+
+class FeatureEncoder(BaseEstimator, TransformerMixin):
+    """
+    FeatureEncoder.
+
+    Encodes a categorical feature with the categories fitted from the
+    data. Values are mapped to their category codes in a single vectorized
+    lookup, as in ``pd.Categorical``, and then to the encoded values.
+
+    Parameters
+    ----------
+    encoding : {'onehot', 'ordinal', 'frequency'}, default='onehot'
+        How categories are encoded: as one indicator column per category,\
+        as their position in the sorted categories, or as their relative\
+        frequency in the training data. Unknown categories get no\
+        indicator, a missing ordinal and a zero frequency. Missing values\
+        get no indicator and are kept missing otherwise.
+    sparse : bool, default=False
+        Whether the one-hot encoding is returned as a scipy CSR matrix,\
+        which only stores the indicators set.
+    """
+
+    def __init__(self, encoding: str = "onehot", sparse: bool = False):
+        """Class constructor"""
+
+        self.encoding = encoding
+        self.sparse = sparse
+        self.counts = None
+        self.categories = None
+        self.__lookup = None
+
+        if self.encoding not in ("onehot", "ordinal", "frequency"):
+            raise ValueError(f"The value {encoding} for 'encoding' is not supported.")
+
+    def fit(self, X: pd.Series, y: pd.Series = None) -> FeatureEncoder:
+        """Fit encoder using X.
+
+        Parameters
+        ----------
+        X : pd.Series
+            Input feature of shape (n_samples,).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureEncoder
+            This estimator.
+        """
+
+        self.counts = None
+        self.categories = None
+
+        return self.partial_fit(X)
+
+    def partial_fit(self, X: pd.Series, y: pd.Series = None) -> FeatureEncoder:
+        """Incrementally fit encoder using a chunk of X.
+
+        Categories first seen in a chunk are appended to the fitted ones,
+        so the codes of the previous chunks stay valid.
+
+        Parameters
+        ----------
+        X : pd.Series
+            Input feature chunk of shape (n_samples,).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureEncoder
+            This estimator.
+        """
+
+        counts = _as_series(X).value_counts(sort=False)
+        counts = counts[counts > 0]
+
+        if isinstance(counts.index, pd.CategoricalIndex):
+            counts.index = counts.index.astype(counts.index.categories.dtype)
+
+        if self.counts is None:
+            self.counts = counts.astype(np.float64)
+            new = counts.index
+        else:
+            new = counts.index.difference(self.counts.index, sort=False)
+            self.counts = self.counts.add(counts, fill_value=0)
+
+        try:
+            new = new.sort_values()
+        except TypeError:
+            pass
+
+        if self.categories is None:
+            self.categories = new
+        else:
+            self.categories = self.categories.append(new)
+
+        self.__lookup = None
+
+        return self
+
+    def transform(self, X: pd.Series, y: pd.Series = None) -> np.ndarray:
+        """Encodes the input feature.
+
+        Parameters
+        ----------
+        X : pd.Series
+            Input feature of shape (n_samples,).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        np.ndarray or scipy.sparse.csr_matrix
+            The encoded values, of shape (n_samples,), or the indicators\\
+            of shape (n_samples, n_categories) for the one-hot encoding.
+        """
+
+        codes = self.get_codes(X)
+
+        if self.encoding == "ordinal":
+            encoded = codes.astype(np.float64)
+            encoded[codes < 0] = np.nan
+            return encoded
+
+        if self.encoding == "frequency":
+            frequencies = np.append(self.get_frequencies(), 0.0)
+            encoded = frequencies[codes]
+            encoded[_as_series(X).isna().to_numpy()] = np.nan
+            return encoded
+
+        known = codes >= 0
+
+        if self.sparse:
+            from scipy import sparse
+
+            indptr = np.zeros(len(codes) + 1, dtype=np.int64)
+            np.cumsum(known, out=indptr[1:])
+
+            return sparse.csr_matrix(
+                (np.ones(indptr[-1]), codes[known], indptr),
+                shape=(len(codes), len(self.categories)),
+            )
+
+        encoded = np.zeros((len(codes), len(self.categories)))
+        encoded[np.flatnonzero(known), codes[known]] = 1.0
+
+        return encoded
+
+    def fit_transform(self, X: pd.Series, y: pd.Series = None) -> np.ndarray:
+        """Fit using X and return the encoded feature.
+
+        Parameters
+        ----------
+        X : pd.Series
+            Input feature of shape (n_samples,).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        np.ndarray or scipy.sparse.csr_matrix
+            The encoded feature.
+        """
+        self.fit(X)
+        return self.transform(X)
+
+    def get_codes(self, X: pd.Series) -> np.ndarray:
+        """Returns the position of each value in the fitted categories,
+        or -1 for missing values and unknown categories."""
+
+        values = _as_series(X)
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.cat.set_categories(self.categories)
+            return values.cat.codes.to_numpy(dtype=np.int64)
+
+        return pd.Categorical(values, categories=self.categories).codes.astype(np.int64)
+
+    def get_frequencies(self) -> np.ndarray:
+        """Returns the relative frequency of each fitted category."""
+        counts = self.counts.reindex(self.categories).to_numpy(dtype=np.float64)
+        return counts / counts.sum()
+
+    def get_feature_names_out(self, name: str) -> typing.List[str]:
+        """Returns the names of the encoded columns of a feature.
+
+        Parameters
+        ----------
+        name : str
+            The feature name.
+
+        Returns
+        -------
+        list of str
+            The feature name, or ``<name>_<category>`` for each category\\
+            of the one-hot encoding.
+        """
+
+        if self.encoding != "onehot":
+            return [name]
+
+        return [f"{name}_{category}" for category in self.categories]
+
+    def encode_value(self, value: typing.Any) -> float or np.ndarray:
+        """Encodes a single value, for online inference.
+
+        Parameters
+        ----------
+        value : any
+            The feature value. None is taken as a missing value.
+
+        Returns
+        -------
+        float or np.ndarray
+            The encoded value, or the indicators for the one-hot encoding.
+        """
+
+        if self.__lookup is None:
+            codes = range(len(self.categories))
+            if self.encoding == "frequency":
+                codes = self.get_frequencies().tolist()
+            self.__lookup = dict(zip(self.categories, codes))
+
+        missing = value is None or (isinstance(value, float) and value != value)
+
+        if self.encoding == "onehot":
+            encoded = np.zeros(len(self.categories))
+            if not missing and value in self.__lookup:
+                encoded[self.__lookup[value]] = 1.0
+            return encoded
+
+        if missing:
+            return np.nan
+
+        if self.encoding == "frequency":
+            return self.__lookup.get(value, 0.0)
+
+        return float(self.__lookup.get(value, np.nan))
+
+
+class FeatureInteractions(BaseEstimator, TransformerMixin):
+    """
+    FeatureInteractions.
+
+    Appends products of features, as polynomial and interaction terms.
+    Each term takes a single in-place multiplication, of its term without
+    the last factor by that factor.
+
+    Parameters
+    ----------
+    terms : list of tuple of int
+        The positions of the factors of each term, with repeated\\
+        positions for powers, as in ``ActionPlan.interactions``.
+    """
+
+    def __init__(self, terms: typing.List[typing.Tuple[int, ...]]):
+        """Class constructor"""
+        self.terms = terms
+        self.partially_fitted = False
+
+    def fit(self, X: np.ndarray, y: pd.Series = None) -> FeatureInteractions:
+        """Fit interactions using X.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureInteractions
+            This estimator.
+        """
+        self.n_features_in_ = X.shape[1]
+        self.partially_fitted = False
+        return self
+
+    def partial_fit(self, X: np.ndarray, y: pd.Series = None) -> FeatureInteractions:
+        """Incrementally fit interactions using a chunk of X.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : FeatureInteractions
+            This estimator.
+        """
+        self.fit(X)
+        self.partially_fitted = True
+        return self
+
+    def transform(self, X: np.ndarray, y: pd.Series = None) -> np.ndarray:
+        """Appends the terms to the input data.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        np.ndarray
+            The input data followed by the terms, of shape\\
+            (n_samples, n_features + n_terms).
+        """
+        return self.get_program_step().run(to_buffer(X))
+
+    def fit_transform(self, X: np.ndarray, y: pd.Series = None) -> np.ndarray:
+        """Fit using X and return the data with the terms.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        np.ndarray
+            The input data followed by the terms.
+        """
+        self.fit(X)
+        return self.transform(X)
+
+    def get_program_step(self) -> ProgramStep:
+        """Returns the terms as an engine step that widens the buffer.
+
+        Returns
+        -------
+        ProgramStep
+            The step with the products of the terms.
+        """
+        return ProgramStep(
+            [], products=interaction_products(self.terms, self.n_features_in_)
+        )
+
+
+class PreProcessor(BaseEstimator, TransformerMixin):
+    def __repr__(self):
+        return "PreProcessor()"
+
+    def __init__(
+        self,
+        features_config,
+        n_jobs: int = None,
+        prefer: str = "threads",
+        track_memory: bool = False,
+        output_dtype: np.dtype or str = np.float64,
+        sparse_output: bool = False,
+        memory_budget: int = None,
+        cache: StepCache or str = None,
+        profile: bool or Profiler = False,
+    ):
+        """Class constructor
+
+        Parameters
+        ----------
+        features_config : list of dict or FeatureRegistry
+            The features configuration, as in ``config/features.yaml``,\
+            or as returned by ``get_config``. It is not modified.
+        n_jobs : int, optional
+            Number of jobs to fit and transform the features in parallel,\
+            by default None, meaning 1. ``-1`` means using all processors.
+        prefer : {'threads', 'processes'}, default='threads'
+            Pool used to fit the features in parallel. Threads suit the\
+            transformers that release the GIL, as the numpy based ones\
+            and KMeans. The compiled transform always runs on threads.
+        track_memory : bool, default=False
+            Whether the peak and retained memory of each fit and transform\
+            call are measured with tracemalloc and stored in\
+            ``memory_reports``. Tracing slows every allocation down.
+        output_dtype : np.dtype or str, default=np.float64
+            The dtype of the transformed data. With ``np.float32``, the\
+            transformed data takes half the memory. The steps always\
+            compute in float64.
+        sparse_output : bool, default=False
+            Whether ``transform`` returns a scipy CSR matrix instead of\
+            a dataframe, so the one-hot encodings of features with many\
+            categories only store the indicators set.
+        memory_budget : int, optional
+            Maximum size, in bytes, of the float64 buffers of transform.\
+            The rows are then transformed in blocks, which bounds the\
+            intermediate memory when interaction terms widen the data.\
+            By default, all the rows are transformed at once.
+        cache : StepCache or str, optional
+            A cache of fitted steps, or its directory. The fitted steps of\
+            each feature are then stored under a hash of its training\
+            values, its step configuration and the package version, and\
+            ``fit`` only fits the features that are not cached. Fitting\
+            with a cache keeps the compiled program, not the Pipeline.
+        profile : bool or Profiler, default=False
+            Whether the time, rows and, with a profiler that traces the\
+            memory, the allocations of each step of each feature are\
+            recorded during fit and transform, in ``profiler``. The\
+            groups of a step are then fitted one after the other. Use\
+            ``profiler.report()`` to get them as a dataframe.
+        """
+
+        self.features_config = features_config
+
+        self.n_jobs = n_jobs
+
+        self.prefer = prefer
+
+        self.track_memory = track_memory
+
+        self.output_dtype = output_dtype
+
+        self.sparse_output = sparse_output
+
+        self.memory_budget = memory_budget
+
+        self.cache = cache
+
+        self.profile = profile
+
+        self.memory_reports = {}
+
+        self.profiler = None
+
+        if isinstance(profile, Profiler):
+            self.profiler = profile
+        elif profile:
+            self.profiler = Profiler()
+
+        if self.prefer not in ("threads", "processes"):
+            raise ValueError(f"The value {prefer} for 'prefer' is not supported.")
+
+        self.feature_names = None
+
+        self.feature_active = None
+
+        self.feature_types = None
+
+        self.encoders = {}
+
+        self.interaction_names = []
+
+        self.feature_chains = None
+
+        self.preprocessor = None
+
+        self.program = None
+
+        self.__record_function = None
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        state["_PreProcessor__record_function"] = None
+        return state
+
+    def fit(self, X: pd.DataFrame, y: pd.Series = None) -> PreProcessor:
+        """Fit preprocessor using X.
+
+        Parameters
+        ----------
         X : pd.DataFrame
             Input data of shape (n_samples, n_features).
         y : pd.Series, optional
@@ -714,271 +1921,1067 @@ class FeatureDiscretizer(BaseEstimator, TransformerMixin):
 
         Returns
         -------
-        pd.DataFrame
-            The transformed dataframe.
+        self : PreProcessor
+            This estimator.
+        """
+
+        self.__interpret_config()
+
+        action_plan = compile_plan(self.features_config)
+
+        self.interaction_names = list(action_plan.interaction_names)
+
+        self.feature_chains = dict(zip(action_plan.features, action_plan.chains))
+
+        self.encoders = {}
+
+        self.__fit_encoders(X)
+
+        features = self.__get_buffer_features()
+
+        with self.__trace_memory("fit", X, features):
+
+            X_buffer = to_buffer(X, features, self.__get_converters())
+
+            if self.cache is not None:
+                self.program = self.__fit_cached(action_plan, X_buffer, y)
+
+            if self.cache is None or self.program is None:
+                self.preprocessor = self.__set_preprocessor(action_plan)
+
+                self.__fit_pipeline(self.preprocessor, action_plan, X_buffer, y)
+
+                self.program = self.__compile_program(
+                    self.preprocessor, n_columns=len(features)
+                )
+
+        return self
+
+    def partial_fit(self, X: pd.DataFrame, y: pd.Series = None) -> PreProcessor:
+        """Incrementally fit preprocessor using a chunk of X.
+
+        Each step is fitted with running statistics on the chunk as\
+        transformed by the previous steps in their current state, so\
+        the training set never has to be loaded at once. Calling ``fit``\
+        discards the incremental state.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data chunk of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : PreProcessor
+            This estimator.
+        """
+
+        if self.preprocessor is None or not self.__is_partially_fitted():
+
+            self.__interpret_config()
+
+            action_plan = compile_plan(self.features_config)
+
+            self.preprocessor = self.__set_preprocessor(action_plan)
+
+            self.interaction_names = list(action_plan.interaction_names)
+
+            self.feature_chains = dict(zip(action_plan.features, action_plan.chains))
+
+            self.encoders = {}
+
+        self.__fit_encoders(X)
+
+        features = self.__get_buffer_features()
+
+        X_step = to_buffer(X, features, self.__get_converters())
+
+        steps = [step for _, step in self.preprocessor.steps]
+
+        with self.__parallel_backend():
+            for i, step in enumerate(steps):
+
+                step.partial_fit(X_step, y)
+
+                if i < len(steps) - 1:
+                    X_step = step.transform(X_step)
+
+        self.program = self.__compile_program(
+            self.preprocessor, n_columns=len(features)
+        )
+
+        return self
+
+    def refit(
+        self, features_config: typing.List[dict], X: pd.DataFrame, y: pd.Series = None
+    ) -> PreProcessor:
+        """Fit preprocessor to a new features configuration, fitting only
+        the features whose steps changed or that were added.
+
+        The other features keep their fitted steps and encoders, fitted on
+        the data of the previous fits, and the interaction terms follow the
+        new configuration. Without a compiled program to reuse, as before
+        the first fit, this is the same as ``fit``.
+
+        Parameters
+        ----------
+        features_config : list of dict
+            The new features configuration.
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features), with, at least,\
+            the features to be fitted.
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        self : PreProcessor
+            This estimator.
+        """
+
+        if self.program is None or self.feature_chains is None:
+            self.features_config = features_config
+            return self.fit(X, y)
+
+        previous_features = self.__get_buffer_features()
+
+        try:
+            previous_steps = Program(
+                [step for step in self.program.steps if step.products is None]
+            ).split(len(previous_features))
+
+        except ValueError:
+            self.features_config = features_config
+            return self.fit(X, y)
+
+        previous_steps = dict(zip(previous_features, previous_steps))
+        previous_chains = self.feature_chains
+        previous_encoders = self.encoders
+        previous_encodings = {
+            name: encoder.encoding for name, encoder in previous_encoders.items()
+        }
+
+        self.features_config = features_config
+
+        self.__interpret_config()
+
+        action_plan = compile_plan(self.features_config)
+
+        encodings = {
+            config["name"]: config["encode"]
+            for config in self.features_config
+            if config.get("active", True) and "encode" in config
+        }
+
+        self.encoders = {
+            name: encoder
+            for name, encoder in previous_encoders.items()
+            if encodings.get(name) == encoder.encoding
+        }
+
+        self.__fit_encoders(X, features=set(encodings) - set(self.encoders))
+
+        changed = [
+            j
+            for j, name in enumerate(action_plan.features)
+            if name not in previous_steps
+            or previous_chains.get(name) != action_plan.chains[j]
+            or encodings.get(name) != previous_encodings.get(name)
+        ]
+
+        chains = [previous_steps.get(name) for name in action_plan.features]
+
+        with self.__trace_memory("refit", X, changed):
+
+            if changed:
+                fitted = self.__fit_chains(
+                    action_plan,
+                    changed,
+                    to_buffer(
+                        X,
+                        [action_plan.features[j] for j in changed],
+                        self.__get_converters(),
+                    ),
+                    y,
+                )
+
+                if fitted is None:
+                    return self.fit(X, y)
+
+                for j, chain in zip(changed, fitted):
+                    chains[j] = chain
+
+            self.program = self.__join_chains(action_plan, chains)
+
+        self.preprocessor = None
+
+        self.interaction_names = list(action_plan.interaction_names)
+
+        self.feature_chains = dict(zip(action_plan.features, action_plan.chains))
+
+        return self
+
+    def fit_file(self, source: str, chunksize: int = 100_000) -> PreProcessor:
+        """Fit preprocessor over a CSV or Parquet file, chunk by chunk.
+        Each chunk is logged at the DEBUG level on the ``batches`` child\
+        logger of this module.
+
+        Parameters
+        ----------
+        source : str
+            Path to the training CSV or Parquet file.
+        chunksize : int, optional
+            Number of rows of each chunk, by default 100_000
+
+        Returns
+        -------
+        self : PreProcessor
+            This estimator.
+        """
+
+        self.preprocessor = None
+
+        self.__interpret_config()
+
+        for i, chunk in enumerate(self.__read_chunks(source, chunksize)):
+            batch_logger.debug("Fitting chunk %d of %d rows.", i, len(chunk))
+            self.partial_fit(chunk)
+
+        return self
+
+    def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
+        """Applies the operation to the input dataframe.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        pd.DataFrame or scipy.sparse.csr_matrix
+            The transformed dataframe, with the interaction terms and the\
+            one-hot encoded columns after the others. A CSR matrix with\
+            ``sparse_output``.
+        """
+
+        features = self.__get_buffer_features()
+
+        columns = features + self.interaction_names
+
+        converters = self.__get_converters()
+
+        with self.__trace_memory("transform", X, features), self.__profile("transform"):
+
+            if self.program is not None and self.sparse_output:
+                result = self.__transform_sparse(X, features, converters)
+
+            elif self.program is not None:
+                result = self.program.transform(
+                    X,
+                    columns=features,
+                    n_jobs=self.n_jobs,
+                    dtype=self.output_dtype,
+                    converters=converters,
+                    output_columns=columns,
+                    block_rows=self.__get_block_rows(len(columns)),
+                    profiler=self.profiler,
+                )
+
+            else:
+                X_buffer = to_buffer(X, features, converters)
+
+                if self.profiler is not None:
+                    result = self.__transform_pipeline(X_buffer)
+
+                else:
+                    with self.__parallel_backend():
+                        result = self.preprocessor.transform(X_buffer)
+
+                result = pd.DataFrame(
+                    result.astype(self.output_dtype, copy=False),
+                    index=X.index,
+                    columns=columns,
+                )
+
+            return self.__append_encodings(X, result)
+
+    def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
+        """Fit using X and return the transformed dataframe.
+
+        Parameters
+        ----------
+        X : pd.DataFrame
+            Input data of shape (n_samples, n_features).
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
+
+        Returns
+        -------
+        pd.DataFrame
+            The transformed dataframe.
+        """
+        self.fit(X)
+        return self.transform(X)
+
+    def transform_iter(
+        self, chunks: typing.Iterable[pd.DataFrame]
+    ) -> typing.Iterator[pd.DataFrame]:
+        """Lazily applies the operation to a sequence of dataframes.
+        Each chunk is logged at the DEBUG level on the ``batches`` child\
+        logger of this module, which ``configure_logging`` can rate-limit\
+        or sample.
+
+        Parameters
+        ----------
+        chunks : iterable of pd.DataFrame
+            Input data chunks, as the ones returned by\
+            ``pd.read_csv(..., chunksize=...)``.
+
+        Yields
+        ------
+        pd.DataFrame
+            The transformed chunks.
+        """
+
+        for i, chunk in enumerate(chunks):
+            batch_logger.debug("Transforming chunk %d of %d rows.", i, len(chunk))
+            yield self.transform(chunk)
+
+    def transform_file(
+        self,
+        source: str,
+        destination: str,
+        chunksize: int = 100_000,
+        index: bool = False,
+    ) -> int:
+        """Transforms a CSV or Parquet file chunk by chunk.
+
+        Only the active features are read and only one chunk is held\
+        in memory at a time, so the peak memory does not depend on the\
+        file size. The formats are inferred from the file extensions.
+
+        Parameters
+        ----------
+        source : str
+            Path to the input CSV or Parquet file.
+        destination : str
+            Path to the output CSV or Parquet file.
+        chunksize : int, optional
+            Number of rows of each chunk, by default 100_000
+        index : bool, optional
+            Whether the chunk index is written, by default False
+
+        Returns
+        -------
+        int
+            The number of rows written.
+
+        Raises
+        ------
+        ValueError
+            If the preprocessor has a sparse output.
+        """
+
+        if self.sparse_output:
+            raise ValueError("Sparse outputs can not be written to files.")
+
+        chunks = self.__read_chunks(source, chunksize)
+
+        empty = pd.DataFrame(
+            columns=self.get_feature_names_out(), dtype=self.output_dtype
+        )
+
+        with ChunkWriter(destination, index=index, empty=empty) as writer:
+            for chunk in self.transform_iter(chunks):
+                writer.write(chunk)
+
+        return writer.n_rows
+
+    def transform_record(self, record: dict) -> dict:
+        """Transforms a single record, for online inference.
+
+        The fitted steps are compiled once into scalar Python code, so no
+        dataframe is built and the result matches :meth:`transform` exactly.
+
+        Parameters
+        ----------
+        record : dict
+            The feature values by name. Missing features and None\
+            values are taken as missing values.
+
+        Returns
+        -------
+        dict
+            The transformed values of the active features.
         """
-        self.fit(X)
-        return self.transform(X)
 
-    def __train_value_maps(self, X: pd.DataFrame) -> None:
-        """Fit the mean feature value in each discretized bin.
+        if self.program is None:
+            return self.transform_records([record])[0]
+
+        return self.__get_record_function()(record)
+
+    def transform_records(self, records: typing.Iterable[dict]) -> typing.List[dict]:
+        """Transforms a sequence of records, for online inference.
 
         Parameters
         ----------
-        X : pd.DataFrame
-            Input data of shape (n_samples, n_features).
+        records : iterable of dict
+            The feature values of each record by name.
+
+        Returns
+        -------
+        list of dict
+            The transformed values of the active features of each record.
         """
 
-        X_transf = self.discretizer.transform(X)
+        if self.program is None:
+            result = self.transform(
+                pd.DataFrame(list(records), columns=self.__get_active_features())
+            )
+            if self.sparse_output:
+                result = pd.DataFrame(
+                    result.toarray(), columns=self.get_feature_names_out()
+                )
+            return result.to_dict("records")
 
-        self.value_maps = []
+        function = self.__get_record_function()
 
-        for i in range(X_transf.shape[1]):
+        return [function(record) for record in records]
 
-            # TODO
-            # Here, I am using aggregation by mean.It will be great
-            # If the user could choose the aggregation operation
-            # as an inputparameter.
-            subs = (
-                pd.DataFrame({"order": X_transf[:, i], "value": X.iloc[:, i].values})
-                .groupby("order")
-                .mean()
-                .to_dict()["value"]
-            )
+    def get_feature_names_out(self) -> typing.List[str]:
+        """Returns the names of the transformed columns.
 
-            self.value_maps.append(subs)
+        Returns
+        -------
+        list of str
+            The active features, followed by the interaction terms, named\
+            after their factors as ``a^2*b``, and by the one-hot encoded\
+            features, with one ``<name>_<category>`` column per category.
+        """
+
+        names = self.__get_buffer_features() + self.interaction_names
 
-    def __apply_value_maps(self, X_transf: pd.DataFrame):
-        """Apply de substitution of the bin order by\
-        the fitted mean value in each discretized bin.
+        for name, encoder in self.encoders.items():
+            if encoder.encoding == "onehot":
+                names.extend(encoder.get_feature_names_out(name))
+
+        return names
+
+    def export(self, path: str) -> None:
+        """Saves the fitted transformation as a compact artifact, a JSON
+        metadata file and a ``.npz`` file with the fitted parameters,
+        stamped with the package version. The artifact is served with
+        :func:`src.model.artifact.load_artifact`, which needs numpy only.
 
         Parameters
         ----------
-        X_transf : pd.DataFrame
-            Input data of shape (n_samples, n_features).
+        path : str
+            The artifact directory.
+
+        Raises
+        ------
+        ValueError
+            If the preprocessor is not fitted, its steps can not be compiled\
+            or it encodes features.
         """
 
-        temp_columns = {}
+        if self.program is None:
+            raise ValueError(
+                "Only fitted preprocessors with compilable steps can be exported."
+            )
+
+        if self.encoders:
+            raise ValueError("Preprocessors with encoded features can not be exported.")
 
-        columns = X_transf.columns
+        features = self.__get_buffer_features()
 
-        for i in range(X_transf.shape[1]):
-            subs = self.value_maps[i]
-            temp_columns.update(
-                {columns[i]: pd.Series(X_transf.iloc[:, i]).replace(subs)}
-            )
+        save_artifact(
+            self.program,
+            path,
+            features=features,
+            output_features=features + self.interaction_names,
+            version=src.model.__version__,
+        )
 
-        X_result = pd.DataFrame(temp_columns)
+    def __interpret_config(self) -> None:
 
-        return X_result
+        self.feature_names = [config["name"] for config in self.features_config]
 
+        self.feature_active = {
+            config["name"]: config.get("active", True)
+            for config in self.features_config
+        }
 
-class PreProcessor(BaseEstimator, TransformerMixin):
-    def __repr__(self):
-        return "PreProcessor()"
+        self.feature_types = {
+            config["name"]: config["type"] for config in self.features_config
+        }
 
-    def __init__(self, features_config):
-        """Class constructor"""
+    def __set_preprocessor(self, action_plan: ActionPlan):
+        """
+        Gets the action plan a generates a Pipeline. Each step runs one\
+        transformer per group of features with the same step configuration.
 
-        self.features_config = features_config
+        Parameters
+        ----------
+        action_plan : ActionPlan
+            The ordered steps to be executed on the Pipeline.
+        """
+        from sklearn.pipeline import Pipeline
 
-        self.feature_names = None
+        steps = []
 
-        self.feature_active = None
+        for transform_order, groups in enumerate(action_plan.groups):
 
-        self.feature_types = None
+            transformers = [
+                (
+                    f"{group.key}_{k}",
+                    self.__interpret_process_step(group.key, group.value),
+                    _as_columns(group.positions),
+                )
+                for k, group in enumerate(groups)
+            ]
 
-    def fit(self, X: pd.DataFrame, y: pd.Series = None) -> PreProcessor:
-        """Fit preprocessor using X.
+            steps.append(
+                (
+                    f"step_{transform_order}",
+                    ColumnTransformer(transformers=transformers, n_jobs=self.n_jobs),
+                )
+            )
+
+        if action_plan.interactions:
+            steps.append(
+                (
+                    "interactions",
+                    FeatureInteractions(terms=list(action_plan.interactions)),
+                )
+            )
+
+        if len(steps) > 0:
+            preprocessor = Pipeline(steps=steps)
+        else:
+            preprocessor = Pipeline(steps=[("step_0", Identity())])
+
+        return preprocessor
+
+    def __fit_cached(
+        self, action_plan: ActionPlan, X_buffer: np.ndarray, y: pd.Series = None
+    ) -> Program:
+        """
+        Fits the features whose steps are not cached and compiles them\
+        with the cached ones into a Program.
 
         Parameters
         ----------
-        X : pd.DataFrame
-            Input data of shape (n_samples, n_features).
+        action_plan : ActionPlan
+            The plan of the features configuration.
+        X_buffer : np.ndarray
+            The float buffer of the features in the plan.
         y : pd.Series, optional
             Targets for supervised learning, by default None
 
         Returns
         -------
-        self : PreProcessor
-            This estimator.
+        Program
+            The compiled program, or None when the fitted steps can not\
+            be compiled. The Pipeline is not kept.
         """
 
-        self.__interpret_config()
+        cache = self.cache
+        if not isinstance(cache, StepCache):
+            cache = StepCache(cache)
 
-        action_plan = self.__create_action_plan()
+        version = src.model.__version__
 
-        self.preprocessor = self.__set_preprocessor(action_plan)
+        keys = [
+            hash_feature(X_buffer[:, j], chain, version)
+            for j, chain in enumerate(action_plan.chains)
+        ]
 
-        features = self.__get_active_features()
+        chains = [cache.get(key) for key in keys]
 
-        self.preprocessor.fit(X[features], y)
+        missing = [j for j, chain in enumerate(chains) if chain is None]
 
-        return self
+        if missing:
+            fitted = self.__fit_chains(
+                action_plan, missing, np.asfortranarray(X_buffer[:, missing]), y
+            )
 
-    def transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
-        """Applies the operation to the input dataframe.
+            if fitted is None:
+                return None
+
+            for j, chain in zip(missing, fitted):
+                chains[j] = chain
+                cache.put(keys[j], chain)
+
+            cache.evict()
+
+        self.preprocessor = None
+
+        return self.__join_chains(action_plan, chains)
+
+    def __fit_chains(
+        self,
+        action_plan: ActionPlan,
+        positions: typing.List[int],
+        X_buffer: np.ndarray,
+        y: pd.Series = None,
+    ) -> typing.List[typing.List[typing.List[Operation]]]:
+        """
+        Fits the steps of some features of a plan, grouped as usual, and\
+        splits the compiled operations by feature.
 
         Parameters
         ----------
-        X : pd.DataFrame
-            Input data of shape (n_samples, n_features).
+        action_plan : ActionPlan
+            The plan of the features configuration.
+        positions : list of int
+            The positions of the features in the plan.
+        X_buffer : np.ndarray
+            The float buffer of those features.
         y : pd.Series, optional
             Targets for supervised learning, by default None
 
         Returns
         -------
-        pd.DataFrame
-            The transformed dataframe.
+        list of list of list of Operation
+            The operations of each step of each feature, as returned by\
+            ``Program.split``, or None when the fitted steps can not be\
+            compiled.
         """
 
-        features = self.__get_active_features()
+        names = {action_plan.features[j] for j in positions}
+
+        plan = compile_plan(
+            [
+                {
+                    key: value
+                    for key, value in config.items()
+                    if key not in ("polynomial_degree", "interactions")
+                }
+                for config in self.features_config
+                if config["name"] in names
+            ]
+        )
+
+        preprocessor = self.__set_preprocessor(plan)
 
-        return dataframe_transformer(X[features], self.preprocessor)
+        self.__fit_pipeline(preprocessor, plan, X_buffer, y)
 
-    def fit_transform(self, X: pd.DataFrame, y: pd.Series = None) -> pd.DataFrame:
-        """Fit using X and return the transformed dataframe.
+        program = self.__compile_program(preprocessor, n_columns=len(positions))
+
+        if program is None:
+            return None
+
+        return [
+            chain[: len(action_plan.chains[j])]
+            for j, chain in zip(positions, program.split(len(positions)))
+        ]
+
+    def __join_chains(
+        self,
+        action_plan: ActionPlan,
+        chains: typing.List[typing.List[typing.List[Operation]]],
+    ) -> Program:
+        """Compiles the operations of each feature of a plan, followed by\
+        its interaction terms, into a Program."""
+
+        steps = Program.from_chains(chains).steps
+
+        if action_plan.interactions:
+            steps.append(
+                ProgramStep(
+                    [],
+                    products=interaction_products(
+                        action_plan.interactions, len(action_plan.features)
+                    ),
+                )
+            )
+
+        return Program(steps)
+
+    def __compile_program(self, preprocessor, n_columns: int) -> Program:
+        """
+        Compiles a fitted Pipeline into a vectorized Program that runs\
+        every step over a single float buffer.
 
         Parameters
         ----------
-        X : pd.DataFrame
-            Input data of shape (n_samples, n_features).
-        y : pd.Series, optional
-            Targets for supervised learning, by default None
+        preprocessor : Pipeline
+            The fitted Pipeline.
+        n_columns : int
+            The number of columns of the Pipeline input.
 
         Returns
         -------
-        pd.DataFrame
-            The transformed dataframe.
+        Program
+            The compiled program, or None when some step cannot be\
+            compiled. In that case, transform runs the Pipeline itself.
         """
-        self.fit(X)
-        return self.transform(X)
 
-    def __interpret_config(self) -> None:
+        steps = []
 
-        for config in self.features_config:
-            if "active" not in config:
-                config.update({"active": True})
+        for name, step in preprocessor.steps:
 
-        self.feature_names = [config["name"] for config in self.features_config]
+            if isinstance(step, Identity):
+                continue
 
-        self.feature_active = {
-            config["name"]: config["active"] for config in self.features_config
-        }
+            if isinstance(step, FeatureInteractions):
+                steps.append(step.get_program_step())
+                n_columns = steps[-1].get_n_columns_out(n_columns)
+                continue
 
-        self.feature_types = {
-            config["name"]: config["type"] for config in self.features_config
-        }
+            operations = []
+
+            transformers = [
+                (transformer, _column_positions(columns))
+                for _, transformer, columns in step.transformers_
+                if not (isinstance(transformer, str) and transformer == "drop")
+            ]
+
+            gather = sorted(c for _, columns in transformers for c in columns)
+
+            positions = {column: j for j, column in enumerate(gather)}
+
+            try:
+                for transformer, columns in transformers:
 
-    def __create_action_plan(self):
+                    if isinstance(transformer, str) and transformer == "passthrough":
+                        continue
+
+                    operation = transformer.get_operation()
+
+                    if operation is not None:
+                        operations.append(
+                            operation.relocate([positions[c] for c in columns])
+                        )
+
+            except (AttributeError, TypeError, ValueError) as err:
+                logger.warning(f"The step {name} cannot be compiled: {err}")
+                return None
+
+            if gather == list(range(n_columns)):
+                gather = None
+
+            steps.append(ProgramStep(operations, gather=gather))
+
+            n_columns = n_columns if gather is None else len(gather)
+
+        return Program(steps)
+
+    def __fit_pipeline(
+        self,
+        preprocessor,
+        action_plan: ActionPlan,
+        X_buffer: np.ndarray,
+        y: pd.Series = None,
+    ) -> None:
         """
-        Generates a dataframe with ordered steps to be\
-        executed on the Pipeline.
+        Fits a Pipeline over the buffer of the features of a plan. With a\
+        profiler, the steps are fitted one by one, and the transformers of\
+        each step one after the other, so each fit is measured alone.
+
+        Parameters
+        ----------
+        preprocessor : Pipeline
+            The Pipeline of the plan.
+        action_plan : ActionPlan
+            The plan of the buffer features.
+        X_buffer : np.ndarray
+            The float buffer of the features in the plan.
+        y : pd.Series, optional
+            Targets for supervised learning, by default None
         """
-        df = pd.DataFrame(
-            [
-                (j, config["name"], config["active"], config["type"], i, k, config[k])
-                for j, config in enumerate(self.features_config)
-                for i, k in enumerate(
-                    {
-                        k: config[k]
-                        for k in filter(
-                            lambda x: x
-                            not in (
-                                "name",
-                                "active",
-                                "type",
-                                "encode",
-                                "polynomial_degree",
-                            ),
-                            config.keys(),
+
+        if self.profiler is None:
+            with self.__parallel_backend():
+                preprocessor.fit(X_buffer, y)
+            return
+
+        steps = [step for _, step in preprocessor.steps]
+
+        with self.profiler.session("fit", action_plan):
+            for transform_order, step in enumerate(steps):
+
+                last = transform_order == len(steps) - 1
+
+                if isinstance(step, ColumnTransformer):
+                    if last:
+                        step.fit(X_buffer, y, self.profiler, transform_order)
+                    else:
+                        X_buffer = step.fit_transform(
+                            X_buffer, y, self.profiler, transform_order
                         )
-                    }
+
+                elif isinstance(step, FeatureInteractions):
+                    n_columns = X_buffer.shape[1]
+
+                    with self.profiler.measure(
+                        transform_order,
+                        type(step).__name__,
+                        range(n_columns, n_columns + len(step.terms)),
+                        len(X_buffer),
+                    ):
+                        step.fit(X_buffer, y)
+
+                elif last:
+                    step.fit(X_buffer, y)
+
+                else:
+                    X_buffer = step.fit_transform(X_buffer, y)
+
+    def __transform_pipeline(self, X_buffer: np.ndarray) -> np.ndarray:
+        """Transforms the buffer with the Pipeline step by step, measuring\
+        each transformer with the profiler."""
+
+        for transform_order, (_, step) in enumerate(self.preprocessor.steps):
+
+            if isinstance(step, ColumnTransformer):
+                X_buffer = step.transform(
+                    X_buffer, profiler=self.profiler, transform_order=transform_order
                 )
-            ],
-            columns=[
-                "feature_order",
-                "feature_name",
-                "active",
-                "type",
-                "transform_order",
-                "key",
-                "value",
-            ],
-        )
 
-        for order in df["transform_order"].unique():
-            for col in self.feature_names:
-                if (
-                    len(
-                        df[
-                            (df["feature_name"] == col)
-                            & (df["transform_order"] == order)
-                        ]
-                    )
-                    == 0
+            elif isinstance(step, FeatureInteractions):
+                n_columns = X_buffer.shape[1]
+
+                with self.profiler.measure(
+                    transform_order,
+                    type(step).__name__,
+                    range(n_columns, n_columns + len(step.terms)),
+                    len(X_buffer),
                 ):
-                    df = pd.concat(
-                        [
-                            df,
-                            pd.DataFrame(
-                                [
-                                    {
-                                        "feature_order": self.feature_names.index(col),
-                                        "feature_name": col,
-                                        "active": self.feature_active[col],
-                                        "type": self.feature_types[col],
-                                        "transform_order": order,
-                                        "key": "transformation",
-                                        "value": "identity",
-                                    }
-                                ]
-                            ),
-                        ]
+                    X_buffer = step.transform(X_buffer)
+
+            else:
+                X_buffer = step.transform(X_buffer)
+
+        return X_buffer
+
+    def __profile(self, phase: str):
+        """Returns a context where the profiler positions refer to the\
+        plan features, when profiling, and that does nothing otherwise."""
+
+        if self.profiler is None:
+            return contextlib.nullcontext()
+
+        return self.profiler.session(phase, compile_plan(self.features_config))
+
+    def __parallel_backend(self):
+        """Returns a context where the per-feature work of the steps\
+        runs on the preferred joblib pool."""
+        backend = "threading" if self.prefer == "threads" else "loky"
+        return parallel_backend(backend, n_jobs=self.n_jobs)
+
+    def __trace_memory(self, name: str, X: pd.DataFrame, features: list):
+        """Returns a context that measures the memory of a call when\
+        ``track_memory`` is set, and does nothing otherwise."""
+
+        if not self.track_memory:
+            return contextlib.nullcontext()
+
+        self.memory_reports[name] = {"n_rows": len(X), "n_features": len(features)}
+
+        return trace_memory(
+            self.memory_reports[name], nbytes=len(X) * len(features) * 8
+        )
+
+    def __is_partially_fitted(self) -> bool:
+        return all(
+            isinstance(step, Identity) or step.partially_fitted
+            for _, step in self.preprocessor.steps
+        )
+
+    def __get_record_function(self) -> typing.Callable[[dict], dict]:
+        """Returns the record transformation compiled from the program,
+        compiling it again when the program changes."""
+
+        program, function = self.__record_function or (None, None)
+
+        if program is not self.program:
+            features = self.__get_buffer_features()
+
+            function = self.program.compile_record(
+                features, output_columns=features + self.interaction_names
+            )
+
+            if self.encoders:
+                function = self.__encode_record_function(function)
+
+            self.__record_function = (self.program, function)
+
+        return function
+
+    def __encode_record_function(
+        self, function: typing.Callable[[dict], dict]
+    ) -> typing.Callable[[dict], dict]:
+        """Wraps a record transformation to encode the categorical\
+        features of the records first."""
+
+        encoders = list(self.encoders.items())
+
+        def transform_record(record: dict) -> dict:
+
+            values = dict(record)
+            indicators = {}
+
+            for name, encoder in encoders:
+                encoded = encoder.encode_value(record.get(name))
+
+                if encoder.encoding == "onehot":
+                    indicators.update(
+                        zip(encoder.get_feature_names_out(name), encoded.tolist())
                     )
+                else:
+                    values[name] = encoded
 
-        df = df.sort_values(["transform_order", "feature_order"])
+            result = function(values)
+            result.update(indicators)
 
-        return df
+            return result
 
-    def __set_preprocessor(self, action_plan: pd.DataFrame):
-        """
-        Gets the action plan a generates a Pipeline.
+        return transform_record
 
-        Parameters
-        ----------
-        action_plan : pd.DataFrame
-            A dataframe with ordered steps to be\
-            executed on the Pipeline.
-        """
-        steps = []
+    def __fit_encoders(self, X: pd.DataFrame, features: set = None) -> None:
+        """Incrementally fits the encoders of the active features with\
+        an ``encode`` step, or of some of them, creating the missing ones."""
 
-        for transform_order in action_plan["transform_order"].unique():
+        for config in self.features_config:
 
-            df_step = action_plan[
-                action_plan["transform_order"] == transform_order
-            ].sort_values("feature_order")
+            if not config.get("active", True) or "encode" not in config:
+                continue
 
-            transformers = [
-                (n, self.__interpret_process_step(key, value), [o])
-                for n, o, key, value in df_step[
-                    ["feature_name", "feature_order", "key", "value"]
-                ].to_numpy()
-            ]
+            if features is not None and config["name"] not in features:
+                continue
 
-            steps.append(
-                (
-                    f"step_{transform_order}",
-                    ColumnTransformer(transformers=transformers),
+            name = config["name"]
+
+            if name not in self.encoders:
+                self.encoders[name] = FeatureEncoder(
+                    encoding=config["encode"], sparse=self.sparse_output
                 )
+
+            self.encoders[name].partial_fit(X[name])
+
+    def __get_converters(self) -> typing.Dict[str, typing.Callable]:
+        """Returns the encoders of the features encoded into a single\
+        buffer column."""
+        return {
+            name: encoder.transform
+            for name, encoder in self.encoders.items()
+            if encoder.encoding != "onehot"
+        }
+
+    def __get_block_rows(self, n_columns: int) -> int:
+        """Returns the number of rows of the transform blocks that fit in\
+        the memory budget, or None without a budget."""
+
+        if self.memory_budget is None:
+            return None
+
+        return max(int(self.memory_budget) // (8 * max(n_columns, 1)), 1)
+
+    def __transform_sparse(
+        self, X: pd.DataFrame, features: typing.List[str], converters: dict
+    ):
+        """Transforms the buffer features into a CSR matrix block by block,\
+        so the dense interaction terms are never held for all the rows."""
+        from scipy import sparse
+
+        n_columns = len(features) + len(self.interaction_names)
+
+        blocks = [
+            sparse.csr_matrix(block.astype(self.output_dtype, copy=False))
+            for _, block in self.program.iter_blocks(
+                X,
+                features,
+                self.__get_block_rows(n_columns) or CAST_BLOCK_ROWS,
+                n_jobs=self.n_jobs,
+                converters=converters,
+                profiler=self.profiler,
             )
+        ]
 
-        if len(steps) > 0:
-            preprocessor = Pipeline(steps=steps)
-        else:
-            preprocessor = Pipeline(steps=[("step_0", Identity())])
+        if not blocks:
+            return sparse.csr_matrix((0, n_columns), dtype=self.output_dtype)
 
-        return preprocessor
+        return sparse.vstack(blocks, format="csr")
+
+    def __append_encodings(self, X: pd.DataFrame, result: pd.DataFrame):
+        """Appends the one-hot encoded features to the transformed buffer,\
+        as a CSR matrix with ``sparse_output``."""
+
+        encodings = [
+            (name, encoder.transform(X[name]))
+            for name, encoder in self.encoders.items()
+            if encoder.encoding == "onehot"
+        ]
+
+        if self.sparse_output:
+            from scipy import sparse
+
+            if isinstance(result, pd.DataFrame):
+                result = sparse.csr_matrix(result.to_numpy())
+
+            return sparse.hstack(
+                [result] + [encoded for _, encoded in encodings],
+                format="csr",
+                dtype=self.output_dtype,
+            )
+
+        if not encodings:
+            return result
+
+        return pd.concat(
+            [result]
+            + [
+                pd.DataFrame(
+                    encoded.astype(self.output_dtype, copy=False),
+                    index=X.index,
+                    columns=self.encoders[name].get_feature_names_out(name),
+                )
+                for name, encoded in encodings
+            ],
+            axis=1,
+        )
+
+    def __read_chunks(
+        self, source: str, chunksize: int
+    ) -> typing.Iterator[pd.DataFrame]:
+        """Reads the active features of a file chunk by chunk, with the\
+        compact dtypes of their configured types.
+
+        Parameters
+        ----------
+        source : str
+            Path to a CSV or Parquet file.
+        chunksize : int
+            Number of rows of each chunk.
+
+        Yields
+        ------
+        pd.DataFrame
+            The chunks of the file.
+        """
+
+        dtypes = get_feature_dtypes(self.features_config)
+
+        for chunk in read_file_chunks(
+            source, chunksize=chunksize, columns=self.__get_active_features()
+        ):
+            yield cast_dtypes(chunk, dtypes)
+
+    def __get_buffer_features(self) -> typing.List[str]:
+        """Returns the active features but the one-hot encoded ones, which\
+        are expanded out of the float buffer."""
+        return [
+            name
+            for name in self.__get_active_features()
+            if name not in self.encoders or self.encoders[name].encoding != "onehot"
+        ]
 
     def __get_active_features(self):
         return [
@@ -1000,20 +3003,34 @@ class PreProcessor(BaseEstimator, TransformerMixin):
 
             strategy, *param = str(value).split(":")
 
-            if strategy == "constant":
-                param = float(param[0])
-            else:
-                param = None
+            if strategy in ("mean", "median"):
+                return FeatureImputer(strategy=strategy)
+
+            elif strategy == "constant":
+                return FeatureImputer(strategy="constant", parameter=float(param[0]))
 
-            return FeatureImputer(strategy="constant", parameter=param)
+            elif value is None:
+                return FeatureImputer(strategy="constant")
+
+            try:
+                return FeatureImputer(strategy="constant", parameter=float(value))
+
+            except ValueError:
+                raise ValueError(
+                    f"The value {value} for 'imputation_strategy' is not supported."
+                ) from None
 
         elif key == "discretizer":
 
-            strategy, n_bins = str(value).split(":")
+            strategy, n_bins, *aggregation = str(value).split(":")
 
             n_bins = int(n_bins)
 
-            return FeatureDiscretizer(n_bins=n_bins, strategy=strategy)
+            aggregation = aggregation[0] if aggregation else "mean"
+
+            return FeatureDiscretizer(
+                n_bins=n_bins, strategy=strategy, aggregation=aggregation
+            )
 
         elif key == "scaler":
             return FeatureScaler(strategy=value)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import time
+import typing
+import logging
+import contextlib
+import tracemalloc
+import pandas as pd
+from src.base.memory import trace_memory
+from src.model.plan import ActionPlan
+
+logger = logging.getLogger(__name__)
+
+INTERACTIONS_STEP = "interactions"
+
+REPORT_COLUMNS = [
+    "phase",
+    "transform_order",
+    "feature",
+    "step",
+    "operation",
+    "calls",
+    "n_rows",
+    "seconds",
+    "allocated_bytes",
+]
+
+
+class ProfileRecord(typing.NamedTuple):
+    """A measurement of the work of a step over some features."""
+
+    phase: str
+    transform_order: int
+    operation: str
+    features: typing.Tuple[str, ...]
+    steps: typing.Tuple[str, ...]
+    n_rows: int
+    seconds: float
+    allocated_bytes: int
+
+
+class Profiler:
+    """
+    Profiler.
+
+    Records the wall time, the number of rows and, optionally, the memory
+    allocated by the work of every step of a PreProcessor, as the fit of
+    each group of features or each engine operation of the transform.
+    Use :meth:`report` to break the records down by transform order,
+    feature and step kind.
+
+    Parameters
+    ----------
+    memory : bool, default=False
+        Whether the peak memory allocated by each measured work is traced\
+        with tracemalloc. Tracing slows every allocation down, which also\
+        inflates the measured times.
+    log_level : int, optional
+        The level of a log line written for each record, as\
+        ``logging.INFO``. By default, nothing is logged.
+    """
+
+    def __repr__(self):
+        return f"Profiler(n_records={len(self.records)})"
+
+    def __init__(self, memory: bool = False, log_level: int = None):
+        self.memory = memory
+        self.log_level = log_level
+        self.records = []
+        self.__phase = None
+        self.__features = ()
+        self.__steps = ()
+
+    @contextlib.contextmanager
+    def session(self, phase: str, action_plan: ActionPlan):
+        """Returns a context where the measured buffer positions refer to
+        the features and interaction terms of a plan.
+
+        Parameters
+        ----------
+        phase : str
+            The measured call, as ``"fit"`` or ``"transform"``.
+        action_plan : ActionPlan
+            The plan of the buffer features.
+        """
+
+        previous = self.__phase, self.__features, self.__steps
+
+        self.__phase = phase
+        self.__features = action_plan.features + action_plan.interaction_names
+        self.__steps = tuple(
+            tuple(action.key for action in step) for step in action_plan.steps
+        )
+
+        started = self.memory and not tracemalloc.is_tracing()
+
+        if started:
+            tracemalloc.start()
+
+        try:
+            yield self
+
+        finally:
+            if started:
+                tracemalloc.stop()
+
+            self.__phase, self.__features, self.__steps = previous
+
+    @contextlib.contextmanager
+    def measure(
+        self,
+        transform_order: int,
+        operation: str,
+        columns: typing.Iterable[int],
+        n_rows: int,
+    ):
+        """Returns a context that records the work done inside it.
+
+        Parameters
+        ----------
+        transform_order : int
+            The position of the step.
+        operation : str
+            The name of the transformer or engine operation.
+        columns : iterable of int
+            The buffer positions of the features the work applies to.
+        n_rows : int
+            The number of processed rows.
+        """
+
+        report = {}
+
+        memory = trace_memory(report) if self.memory else contextlib.nullcontext()
+
+        start = time.perf_counter()
+
+        with memory:
+            yield
+
+        seconds = time.perf_counter() - start
+
+        columns = list(columns)
+
+        record = ProfileRecord(
+            self.__phase,
+            transform_order,
+            operation,
+            tuple(self.__get_feature(column) for column in columns),
+            tuple(self.__get_step(transform_order, column) for column in columns),
+            n_rows,
+            seconds,
+            report.get("peak_bytes"),
+        )
+
+        self.records.append(record)
+
+        if self.log_level is not None:
+            logger.log(
+                self.log_level,
+                "%s step %s %s of %d features: %d rows in %.6f s",
+                record.phase,
+                transform_order,
+                operation,
+                len(columns),
+                n_rows,
+                seconds,
+            )
+
+    def report(self, by: str = "feature") -> pd.DataFrame:
+        """Sums the records by transform order, feature and step kind.
+
+        The time and memory of a work done over several features at once\
+        are split evenly among them.
+
+        Parameters
+        ----------
+        by : {'feature', 'operation'}, default='feature'
+            Whether the records are broken down by feature, or only summed\
+            by operation, with the time and memory of all its features.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per phase, transform order, feature, step kind and\
+            operation, with the number of ``calls``, the processed\
+            ``n_rows`` and the total ``seconds`` and ``allocated_bytes``,\
+            missing when the memory is not traced. With ``by="operation"``,\
+            the features and step kinds of each operation are joined by\
+            commas.
+        """
+
+        if by not in ("feature", "operation"):
+            raise ValueError(f"The value {by} for 'by' is not supported.")
+
+        rows = []
+
+        for record in self.records:
+
+            if by == "operation":
+                units = [
+                    (",".join(record.features), ",".join(sorted(set(record.steps))))
+                ]
+            else:
+                units = list(zip(record.features, record.steps))
+
+            share = 1 / max(len(units), 1)
+
+            for feature, step in units:
+                rows.append(
+                    (
+                        record.phase,
+                        record.transform_order,
+                        feature,
+                        step,
+                        record.operation,
+                        1,
+                        record.n_rows,
+                        record.seconds * share,
+                        (
+                            None
+                            if record.allocated_bytes is None
+                            else record.allocated_bytes * share
+                        ),
+                    )
+                )
+
+        report = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+        keys = REPORT_COLUMNS[:5]
+
+        return (
+            report.groupby(keys, sort=False, dropna=False)
+            .agg(
+                calls=("calls", "sum"),
+                n_rows=("n_rows", "sum"),
+                seconds=("seconds", "sum"),
+                allocated_bytes=(
+                    "allocated_bytes",
+                    lambda values: values.sum(min_count=1),
+                ),
+            )
+            .reset_index()
+        )
+
+    def clear(self) -> None:
+        """Removes every record."""
+        self.records = []
+
+    def __get_feature(self, column: int) -> str:
+        if column < len(self.__features):
+            return self.__features[column]
+        return str(column)
+
+    def __get_step(self, transform_order: int, column: int) -> str:
+        if transform_order < len(self.__steps) and column < len(
+            self.__steps[transform_order]
+        ):
+            return self.__steps[transform_order][column]
+        return INTERACTIONS_STEP
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import numpy as np
+import typing
+
+SAMPLE_SIZE = 10_000
+
+
+def handle_zeros_in_scale(scale: np.ndarray) -> np.ndarray:
+    """Replaces the (near) zero scales by one, as scikit-learn scalers do,
+    so that constant features are left unscaled.
+
+    Parameters
+    ----------
+    scale : np.ndarray
+        The scale of each feature.
+
+    Returns
+    -------
+    np.ndarray
+        A copy of the scales without zeros.
+    """
+    scale = np.array(scale, dtype=np.float64)
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+    return scale
+
+
+class RunningStatistics:
+    """
+    RunningStatistics.
+
+    Bounded-memory statistics of the columns of a stream of data chunks.
+    Missing values are counted and ignored by every statistic.
+
+    The mean and variance are merged chunk by chunk with the parallel
+    form of Welford's algorithm, and the minimum and maximum are running
+    values. The median and the quantiles are estimated from a uniform
+    reservoir sample of at most ``sample_size`` values per column, so they
+    are exact while the number of values seen is below that size. With
+    ``skewness``, the third central moment is merged too.
+
+    Parameters
+    ----------
+    sample_size : int, default=SAMPLE_SIZE
+        Maximum number of values kept per column to estimate quantiles.
+        Use 0 when quantiles are not needed.
+    random_state : int, default=0
+        Seed of the reservoir sampling.
+    skewness : bool, default=False
+        Whether the third central moment is kept, for ``skew``.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = SAMPLE_SIZE,
+        random_state: int = 0,
+        skewness: bool = False,
+    ):
+
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.skewness = skewness
+
+        self.n_samples = None
+        self.n_missing = None
+        self.mean = None
+        self.m2 = None
+        self.m3 = None
+        self.min = None
+        self.max = None
+        self.samples = None
+
+        self.__rng = np.random.default_rng(random_state)
+
+    @property
+    def var(self) -> np.ndarray:
+        """Population variance of each column."""
+        return np.divide(
+            self.m2,
+            self.n_samples,
+            out=np.full_like(self.m2, np.nan),
+            where=self.n_samples > 0,
+        )
+
+    @property
+    def skew(self) -> np.ndarray:
+        """Population skewness of each column, zero for constant columns.\
+        Requires ``skewness``."""
+        scale = np.power(self.m2, 1.5)
+        return np.divide(
+            np.sqrt(self.n_samples) * self.m3,
+            scale,
+            out=np.where(self.n_samples > 0, 0.0, np.nan),
+            where=scale > 0,
+        )
+
+    def update(self, X: np.ndarray) -> RunningStatistics:
+        """Updates the statistics with a new chunk of data.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            Float data of shape (n_samples, n_features).
+
+        Returns
+        -------
+        RunningStatistics
+            This object.
+        """
+
+        X = np.asarray(X, dtype=np.float64)
+
+        if self.n_samples is None:
+            self.__initialize(X.shape[1])
+
+        if len(X) == 0:
+            return self
+
+        mask = ~np.isnan(X)
+
+        count = mask.sum(axis=0)
+
+        values = np.where(mask, X, 0.0)
+
+        chunk_mean = np.divide(
+            values.sum(axis=0),
+            count,
+            out=np.zeros(X.shape[1]),
+            where=count > 0,
+        )
+
+        deviations = np.where(mask, X - chunk_mean, 0.0)
+
+        chunk_m2 = np.square(deviations).sum(axis=0)
+
+        total = self.n_samples + count
+
+        delta = chunk_mean - self.mean
+
+        weight = np.divide(count, total, out=np.zeros(X.shape[1]), where=total > 0)
+
+        if self.sample_size > 0:
+            for j in range(X.shape[1]):
+                self.__update_sample(j, X[mask[:, j], j])
+
+        if self.skewness:
+            chunk_m3 = np.power(deviations, 3).sum(axis=0)
+
+            self.m3 = (
+                self.m3
+                + chunk_m3
+                + np.power(delta, 3)
+                * self.n_samples
+                * weight
+                * np.divide(
+                    self.n_samples - count,
+                    total,
+                    out=np.zeros(X.shape[1]),
+                    where=total > 0,
+                )
+                + 3
+                * delta
+                * (self.n_samples * chunk_m2 - count * self.m2)
+                * np.divide(1.0, total, out=np.zeros(X.shape[1]), where=total > 0)
+            )
+
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + chunk_m2 + np.square(delta) * self.n_samples * weight
+        self.min = np.fmin(self.min, np.where(mask, X, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(mask, X, -np.inf).max(axis=0))
+        self.n_missing = self.n_missing + (len(X) - count)
+        self.n_samples = total
+
+        return self
+
+    def quantile(self, q: float or typing.List[float]) -> np.ndarray:
+        """Estimates quantiles of each column from the reservoir sample.
+
+        Parameters
+        ----------
+        q : float or list of float
+            Quantile or sequence of quantiles, between 0 and 1.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (n_features,) for a single quantile,\
+            or (len(q), n_features) otherwise. Columns without\
+            values get NaN.
+        """
+
+        result = np.full((np.size(q), len(self.samples)), np.nan)
+
+        for j, sample in enumerate(self.samples):
+            if len(sample) > 0:
+                result[:, j] = np.quantile(sample, q)
+
+        return result[0] if np.ndim(q) == 0 else result
+
+    def __initialize(self, n_features: int) -> None:
+        """Sets the statistics of an empty stream.
+
+        Parameters
+        ----------
+        n_features : int
+            The number of columns.
+        """
+        self.n_samples = np.zeros(n_features, dtype=np.int64)
+        self.n_missing = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.m3 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.samples = [np.empty(0) for _ in range(n_features)]
+
+    def __update_sample(self, j: int, values: np.ndarray) -> None:
+        """Feeds the non-missing values of the j-th column to its reservoir
+        sample (Algorithm R).
+
+        Parameters
+        ----------
+        j : int
+            The column position.
+        values : np.ndarray
+            The new non-missing values of the column.
+        """
+
+        sample = self.samples[j]
+
+        n_fill = max(min(self.sample_size - len(sample), len(values)), 0)
+
+        if n_fill > 0:
+            sample = np.concatenate([sample, values[:n_fill]])
+
+        values = values[n_fill:]
+
+        if len(values) > 0:
+            positions = self.n_samples[j] + n_fill + np.arange(len(values))
+            slots = self.__rng.integers(0, positions + 1)
+            keep = slots < self.sample_size
+            sample[slots[keep]] = values[keep]
+
+        self.samples[j] = sample
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import typing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from src.base.file import read_file_chunks
+from src.model.engine import effective_n_jobs
+from src.model.statistics import RunningStatistics
+
+SUMMARY_SAMPLE_SIZE = 2_048
+
+SKETCH_SIZE = 4_096
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+SUMMARY_COLUMNS = [
+    "type",
+    "count",
+    "missing",
+    "cardinality",
+    "min",
+    "max",
+    "mean",
+    "std",
+    "skew",
+    *[f"q{round(q * 100):02d}" for q in QUANTILES],
+]
+
+
+class DistinctSketch:
+    """
+    DistinctSketch.
+
+    Estimates the number of distinct values of a column with the k minimum
+    values of their 64-bit hashes. The count is exact while it is below
+    ``size``, and otherwise has a relative error of about ``1 / sqrt(size)``.
+
+    Parameters
+    ----------
+    size : int, default=SKETCH_SIZE
+        The number of kept hashes.
+    """
+
+    def __init__(self, size: int = SKETCH_SIZE):
+        self.size = size
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values: np.ndarray) -> DistinctSketch:
+        """Adds the non-missing values of a chunk.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values.
+
+        Returns
+        -------
+        DistinctSketch
+            This object.
+        """
+
+        hashes = pd.util.hash_array(np.asarray(values))
+
+        if len(self.hashes) >= self.size:
+            hashes = hashes[hashes < self.hashes[-1]]
+
+        self.hashes = np.union1d(self.hashes, hashes)[: self.size]
+
+        return self
+
+    def merge(self, other: DistinctSketch) -> DistinctSketch:
+        """Adds the hashes of another sketch of the same size, as if its\
+        values had been added to this one.
+
+        Parameters
+        ----------
+        other : DistinctSketch
+            A sketch of other chunks.
+
+        Returns
+        -------
+        DistinctSketch
+            This object.
+        """
+
+        self.hashes = np.union1d(self.hashes, other.hashes)[: self.size]
+
+        return self
+
+    def estimate(self) -> float:
+        """Returns the estimated number of distinct values."""
+
+        if len(self.hashes) < self.size:
+            return float(len(self.hashes))
+
+        return (self.size - 1) / (float(self.hashes[-1]) / 2.0**64)
+
+
+class DatasetSummary:
+    """
+    DatasetSummary.
+
+    Single-pass, bounded-memory statistics of the columns of a dataset,
+    read as a stream of chunks. Numeric columns get their count, missing
+    values, minimum, maximum, mean, standard deviation and skewness, merged
+    exactly chunk by chunk, and quantiles estimated from a reservoir sample.
+    Every column gets an estimate of its number of distinct values.
+
+    The columns are split in ``n_jobs`` groups with their own statistics,
+    updated on threads for each chunk. The samples of the quantiles depend
+    on the groups, so the estimated quantiles vary slightly with ``n_jobs``.
+
+    Parameters
+    ----------
+    sample_size : int, default=SUMMARY_SAMPLE_SIZE
+        Maximum number of values kept per numeric column for the quantiles.
+    sketch_size : int, default=SKETCH_SIZE
+        Number of hashes kept per column to count the distinct values.
+    n_jobs : int, optional
+        Number of threads, by default None, meaning 1.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = SUMMARY_SAMPLE_SIZE,
+        sketch_size: int = SKETCH_SIZE,
+        n_jobs: int = None,
+    ):
+        self.sample_size = sample_size
+        self.sketch_size = sketch_size
+        self.n_jobs = n_jobs
+
+        self.columns = None
+        self.numeric = None
+        self.integral = None
+        self.n_rows = 0
+
+        self.__groups = None
+
+    def update(self, chunk: pd.DataFrame) -> DatasetSummary:
+        """Updates the statistics with a chunk.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            A chunk of the dataset, with the columns of the first one.
+
+        Returns
+        -------
+        DatasetSummary
+            This object.
+        """
+
+        if self.columns is None:
+            self.__initialize(chunk)
+
+        if len(chunk) == 0:
+            return self
+
+        if len(self.__groups) == 1:
+            self.__update_group(self.__groups[0], chunk)
+
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.__groups)) as executor:
+                list(
+                    executor.map(
+                        self.__update_group,
+                        self.__groups,
+                        [chunk] * len(self.__groups),
+                    )
+                )
+
+        self.n_rows += len(chunk)
+
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the statistics of each column.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per column, indexed by its name, with its ``type``,\
+            ``int``, ``float`` or ``category``, the ``count`` of values,\
+            the ``missing`` ones, their estimated ``cardinality`` and, for\
+            numeric columns, their ``min``, ``max``, ``mean``, ``std``,\
+            ``skew`` and quantiles, as ``q01`` or ``q50``.
+        """
+
+        rows = {}
+
+        for group in self.__groups or []:
+
+            statistics = group["statistics"]
+
+            quantiles = None
+            if group["numeric"]:
+                quantiles = statistics.quantile(list(QUANTILES))
+
+            for j, name in enumerate(group["numeric"]):
+                count = int(statistics.n_samples[j])
+                empty = count == 0
+
+                rows[name] = [
+                    "int" if self.integral[name] else "float",
+                    count,
+                    int(statistics.n_missing[j]),
+                    min(group["sketches"][name].estimate(), count),
+                    np.nan if empty else statistics.min[j],
+                    np.nan if empty else statistics.max[j],
+                    np.nan if empty else statistics.mean[j],
+                    np.sqrt(statistics.var[j]),
+                    statistics.skew[j],
+                    *quantiles[:, j],
+                ]
+
+            for name in group["other"]:
+                missing = group["missing"][name]
+
+                rows[name] = [
+                    "category",
+                    self.n_rows - missing,
+                    missing,
+                    min(group["sketches"][name].estimate(), self.n_rows - missing),
+                    *[np.nan] * (len(SUMMARY_COLUMNS) - 4),
+                ]
+
+        return pd.DataFrame.from_dict(
+            {name: rows[name] for name in self.columns or []},
+            orient="index",
+            columns=SUMMARY_COLUMNS,
+        )
+
+    def __initialize(self, chunk: pd.DataFrame) -> None:
+        """Splits the columns of the first chunk in groups."""
+
+        self.columns = list(chunk.columns)
+
+        self.numeric = {
+            name: pd.api.types.is_numeric_dtype(chunk[name]) for name in self.columns
+        }
+
+        self.integral = {name: True for name in self.columns if self.numeric[name]}
+
+        n_groups = max(min(effective_n_jobs(self.n_jobs), len(self.columns)), 1)
+
+        bounds = np.linspace(0, len(self.columns), n_groups + 1).astype(int)
+
+        self.__groups = []
+
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            names = self.columns[start:stop]
+
+            self.__groups.append(
+                {
+                    "numeric": [name for name in names if self.numeric[name]],
+                    "other": [name for name in names if not self.numeric[name]],
+                    "statistics": RunningStatistics(
+                        sample_size=self.sample_size, skewness=True
+                    ),
+                    "sketches": {
+                        name: DistinctSketch(self.sketch_size) for name in names
+                    },
+                    "missing": {name: 0 for name in names},
+                }
+            )
+
+    def __update_group(self, group: dict, chunk: pd.DataFrame) -> None:
+        """Updates the statistics of a group of columns with a chunk."""
+
+        if group["numeric"]:
+            values = np.column_stack(
+                [_as_float(chunk[name]) for name in group["numeric"]]
+            )
+
+            group["statistics"].update(values)
+
+            for j, name in enumerate(group["numeric"]):
+                column = values[:, j]
+                column = column[~np.isnan(column)]
+
+                group["sketches"][name].update(column)
+
+                if self.integral[name] and not np.array_equal(column, np.floor(column)):
+                    self.integral[name] = False
+
+        for name in group["other"]:
+            column = chunk[name]
+            missing = column.isna().to_numpy()
+
+            group["missing"][name] += int(missing.sum())
+            group["sketches"][name].update(column.to_numpy()[~missing])
+
+
+def summarize_dataset(
+    source: str or pd.DataFrame,
+    chunksize: int = 100_000,
+    columns: typing.List[str] = None,
+    n_jobs: int = None,
+    sample_size: int = SUMMARY_SAMPLE_SIZE,
+    **kwargs,
+) -> pd.DataFrame:
+    """Computes the statistics of the columns of a dataset in a single pass
+    over its chunks, as in :class:`DatasetSummary`.
+
+    Parameters
+    ----------
+    source : str or pd.DataFrame
+        Path to a CSV, Parquet or Arrow file, or a dataframe.
+    chunksize : int, optional
+        Number of rows of each chunk, by default 100_000
+    columns : list of str, optional
+        Columns to be summarized, by default all the columns.
+    n_jobs : int, optional
+        Number of threads that update the statistics, by default 1.
+    sample_size : int, optional
+        Maximum number of values kept per numeric column for the\
+        quantiles, by default SUMMARY_SAMPLE_SIZE
+    **kwargs
+        Extra arguments passed to ``pd.read_csv``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The statistics of each column, as returned by\
+        :meth:`DatasetSummary.to_frame`.
+    """
+
+    if isinstance(source, pd.DataFrame):
+        if columns is not None:
+            source = source[columns]
+
+        chunks = (
+            source.iloc[start : start + chunksize]
+            for start in range(0, max(len(source), 1), chunksize)
+        )
+
+    else:
+        chunks = read_file_chunks(
+            source, chunksize=chunksize, columns=columns, **kwargs
+        )
+
+    summary = DatasetSummary(sample_size=sample_size, n_jobs=n_jobs)
+
+    for chunk in chunks:
+        summary.update(chunk)
+
+    return summary.to_frame()
+
+
+def _as_float(column: pd.Series) -> np.ndarray:
+    """Converts a column into float values, with the values that are not\
+    numbers as missing."""
+
+    if not pd.api.types.is_numeric_dtype(column):
+        column = pd.to_numeric(column, errors="coerce")
+
+    return column.to_numpy(dtype=np.float64, na_value=np.nan)
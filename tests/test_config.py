@@ -0,0 +1,104 @@
+import os
+import copy
+import pickle
+import pytest
+import src.config as config
+from src.config import (
+    FeatureRegistry,
+    FeatureSpec,
+    get_config,
+    get_feature_dtypes,
+    get_feature_limits,
+    get_feature_names,
+    get_feature_status,
+    get_feature_types,
+)
+
+FEATURES = [
+    {"name": "a", "type": "int", "limits": [0, 1]},
+    {"name": "b", "active": False},
+    {"name": "c", "type": "category", "encode": "onehot"},
+]
+
+
+def test_registry():
+    registry = FeatureRegistry(FEATURES)
+
+    assert len(registry) == 3
+    assert registry["a"] is registry[0]
+    assert "b" in registry and "d" not in registry
+    assert registry.get("d") is None
+    assert [spec.name for spec in registry.select()] == ["a", "c"]
+    assert registry["b"].transformation == "identity"
+    assert registry["a"].dtype == "integer"
+    assert registry.to_list()[0] == {**FEATURES[0], "active": True}
+
+    with pytest.raises(AttributeError):
+        registry["a"].type = "float"
+
+    assert FEATURES[0] == {"name": "a", "type": "int", "limits": [0, 1]}
+
+    for restored in (pickle.loads(pickle.dumps(registry)), copy.deepcopy(registry)):
+        assert [dict(spec) for spec in restored] == [dict(spec) for spec in registry]
+
+
+def test_accessors_match_registry():
+    registry = FeatureRegistry(FEATURES)
+
+    for accessor in (
+        get_feature_names,
+        get_feature_limits,
+        get_feature_types,
+        get_feature_dtypes,
+    ):
+        assert accessor(FEATURES) == accessor(registry)
+        assert accessor(FEATURES, only_actives=False) == accessor(
+            registry, only_actives=False
+        )
+
+    assert get_feature_status(FEATURES) == {"a": True, "c": True}
+    assert get_feature_dtypes(FEATURES) == {"a": "integer", "c": "category"}
+    assert get_feature_limits(FEATURES, only_actives=False)["b"] == [None, None]
+
+
+def test_get_config_cache(tmp_path):
+    filepath = tmp_path / "features.yaml"
+    filepath.write_text("- name: a\n  type: float\n")
+
+    registry = get_config(str(filepath))
+
+    assert isinstance(registry, FeatureRegistry)
+    assert isinstance(registry[0], FeatureSpec)
+    assert get_config(str(filepath)) is registry
+
+    filepath.write_text("- name: a\n  type: float\n- name: bb\n  type: int\n")
+    os.utime(filepath, ns=(0, 0))
+
+    reloaded = get_config(str(filepath))
+
+    assert reloaded is not registry
+    assert get_feature_names(reloaded) == ["a", "bb"]
+
+
+def test_get_config_copies_settings(tmp_path):
+    filepath = tmp_path / "model.yaml"
+    filepath.write_text("data_local_path: data.csv\nbases:\n  - url: x\n")
+
+    settings = get_config(str(filepath))
+    settings["bases"].append({"url": "y"})
+
+    assert get_config(str(filepath)) == {
+        "data_local_path": "data.csv",
+        "bases": [{"url": "x"}],
+    }
+
+
+def test_loader():
+    import yaml
+
+    assert config._LOADER is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    with pytest.raises(yaml.YAMLError):
+        yaml.load("!!python/object:os.system ls", Loader=config._LOADER)
+
+    assert get_feature_names(get_config("config/features.yaml"))[0] == "Age"
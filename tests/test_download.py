@@ -0,0 +1,165 @@
+import os
+import zlib
+import hashlib
+import threading
+import http.server
+import pytest
+from src.base.file import download_file, download_files
+from src.base.file.download import METADATA_SUFFIX, PARTIAL_SUFFIX
+
+BODY = b"a,b\n" + b"1,2\n" * 1_000
+
+ETAG = '"v1"'
+
+
+def body_of(path):
+    return BODY + f"3,{zlib.crc32(path.encode())}\n".encode()
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    statuses = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = body_of(self.path)
+
+        if self.headers.get("If-None-Match") == ETAG:
+            return self.__respond(304, b"")
+
+        ranges = self.headers.get("Range")
+
+        if ranges and self.headers.get("If-Range") == ETAG:
+            start = int(ranges.split("=")[1].rstrip("-"))
+
+            if start >= len(body):
+                return self.__respond(416, b"")
+
+            return self.__respond(
+                206,
+                body[start:],
+                {"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"},
+            )
+
+        return self.__respond(200, body)
+
+    def __respond(self, status, body, headers=None):
+        type(self).statuses.append(status)
+
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Handler.statuses = []
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def read(filepath):
+    with open(filepath, "rb") as file:
+        return file.read()
+
+
+def test_download_checksum(url, tmp_path):
+    destination = str(tmp_path / "data.csv")
+    checksum = hashlib.sha256(body_of("/data.csv")).hexdigest()
+
+    download_file(url + "/data.csv", destination, checksum=checksum)
+    download_file(url + "/data.csv", destination, checksum=checksum)
+
+    assert Handler.statuses == [200]
+
+    os.remove(destination)
+
+    assert download_file(url + "/data.csv", destination, checksum=checksum)
+    assert Handler.statuses == [200, 200]
+    assert read(destination) == body_of("/data.csv")
+
+
+def test_download_not_modified(url, tmp_path):
+    destination = str(tmp_path / "sub" / "data.csv")
+
+    download_file(url + "/data.csv", destination)
+    download_file(url + "/data.csv", destination)
+
+    assert Handler.statuses == [200, 304]
+    assert read(destination) == body_of("/data.csv")
+
+
+def test_download_resume(url, tmp_path):
+    destination = str(tmp_path / "data.csv")
+    body = body_of("/data.csv")
+
+    download_file(url + "/data.csv", destination)
+    metadata = read(destination + METADATA_SUFFIX)
+    os.remove(destination + METADATA_SUFFIX)
+
+    with open(destination + PARTIAL_SUFFIX, "wb") as file:
+        file.write(body[:100])
+    with open(destination + PARTIAL_SUFFIX + METADATA_SUFFIX, "wb") as file:
+        file.write(metadata)
+
+    checksum = hashlib.sha256(body).hexdigest()
+    download_file(url + "/data.csv", destination, checksum=checksum)
+
+    assert Handler.statuses == [200, 206]
+    assert read(destination) == body
+    assert not os.path.exists(destination + PARTIAL_SUFFIX)
+
+
+def test_download_complete_partial(url, tmp_path):
+    destination = str(tmp_path / "data.csv")
+    body = body_of("/data.csv")
+
+    download_file(url + "/data.csv", destination)
+    os.replace(destination, destination + PARTIAL_SUFFIX)
+    os.replace(
+        destination + METADATA_SUFFIX, destination + PARTIAL_SUFFIX + METADATA_SUFFIX
+    )
+
+    download_file(url + "/data.csv", destination)
+
+    assert Handler.statuses == [200, 416, 200]
+    assert read(destination) == body
+
+
+def test_download_files(url, tmp_path):
+    downloads = [
+        {"url": f"{url}/{i}.csv", "destination": str(tmp_path / f"{i}.csv")}
+        for i in range(8)
+    ]
+
+    paths = download_files(downloads, n_jobs=-1)
+
+    assert paths == [download["destination"] for download in downloads]
+
+    for i, path in enumerate(paths):
+        assert read(path) == body_of(f"/{i}.csv")
+
+
+def test_make_dataset_downloads(url, tmp_path):
+    from src.model.data import make_dataset
+
+    config = {
+        "data_url": url + "/data.csv",
+        "data_local_path": str(tmp_path / "data.csv"),
+        "target": "b",
+    }
+
+    X, y = make_dataset(config, download_bases=True, n_jobs=-1)
+
+    assert len(X) == 1_001
+    assert y.iloc[0] == 2
@@ -0,0 +1,134 @@
+import os
+import pytest
+import pandas as pd
+import src.base.file as file
+from src.config import get_config
+from src.model.data import make_dataset
+
+
+def test_read_csv_parses_once(monkeypatch):
+    calls = []
+    read = file._read_csv
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return read(*args, **kwargs)
+
+    monkeypatch.setattr(file, "_read_csv", counted)
+
+    features_config = get_config("config/features.yaml")
+    X, y = make_dataset(
+        get_config("config/model.yaml"), features_config=features_config
+    )
+
+    expected = pd.read_csv("data/raw/classification-drugs-example.csv")
+
+    assert len(calls) == 1
+    assert X["Sex"].tolist() == expected["Sex"].tolist()
+    assert X["Age"].dtype.kind == "f"
+
+
+def test_read_csv_coerces_invalid_values(tmp_path):
+    filepath = tmp_path / "data.csv"
+
+    rows = ["a,b"] + [f"{i},{i}" for i in range(20_000)] + ["x,y"]
+    filepath.write_text("\n".join(rows) + "\n")
+
+    data = file.read_csv(str(filepath), dtypes={"a": "float64", "b": "float64"})
+
+    assert data["a"].dtype == "float64"
+    assert data["a"].isna().sum() == 1
+
+
+def test_columnar_copy(tmp_path):
+    from pyarrow import parquet
+
+    filepath = tmp_path / "data.csv"
+    expected = pd.DataFrame(
+        {"a": range(1_000), "b": [0.5] * 1_000, "c": ["x", "y"] * 500}
+    )
+    expected.to_csv(filepath, index=False)
+
+    destination = file.get_columnar_copy(
+        str(filepath), row_group_size=300, dtypes={"a": "float64", "c": "category"}
+    )
+
+    assert parquet.ParquetFile(destination).metadata.num_row_groups == 4
+
+    data = file.read_table(destination)
+
+    assert data["a"].dtype == "float64"
+    assert data["a"].tolist() == expected["a"].tolist()
+    assert data["c"].astype(str).tolist() == expected["c"].tolist()
+
+
+def test_read_arrow_selects_columns(tmp_path):
+    filepath = str(tmp_path / "data.arrow")
+    data = pd.DataFrame({"a": range(10), "b": range(10, 20), "c": list("abcdefghij")})
+
+    with file.ChunkWriter(filepath) as writer:
+        writer.write(data)
+
+    for memory_map in (True, False):
+        selected = file.read_table(
+            filepath,
+            columns=["c", "a"],
+            filters=[("a", ">=", 5)],
+            memory_map=memory_map,
+        )
+
+        assert list(selected.columns) == ["c", "a"]
+        assert selected["a"].tolist() == list(range(5, 10))
+
+    assert file.read_columns(filepath) == ["a", "b", "c"]
+    assert [len(chunk) for chunk in file.read_file_chunks(filepath, chunksize=4)] == [
+        4,
+        4,
+        2,
+    ]
+
+
+def test_columnar_copy_widens_integers(tmp_path):
+    filepath = tmp_path / "data.csv"
+
+    rows = ["a,b,c"] + [f"{i},{i}," for i in range(300_000)] + ["0.5,1,x"]
+    filepath.write_text("\n".join(rows) + "\n")
+
+    destination = file.get_columnar_copy(str(filepath), dtypes={"b": "float32"})
+    data = file.read_table(destination)
+
+    assert data["a"].dtype == "float64"
+    assert data["a"].iloc[-1] == 0.5
+    assert data["b"].dtype == "float32"
+    assert data["c"].iloc[-1] == "x"
+
+
+@pytest.mark.parametrize("extension", ["csv", "parquet", "arrow"])
+def test_chunk_writer_empty(tmp_path, extension):
+    filepath = str(tmp_path / f"data.{extension}")
+    empty = pd.DataFrame(columns=["a", "b"], dtype="float64")
+
+    with file.ChunkWriter(filepath, empty=empty) as writer:
+        pass
+
+    assert writer.n_rows == 0
+    assert file.read_columns(filepath) == ["a", "b"]
+
+    with file.ChunkWriter(str(tmp_path / f"other.{extension}")):
+        pass
+
+    assert not os.path.exists(str(tmp_path / f"other.{extension}"))
+
+
+def test_transform_empty_file(tmp_path):
+    from src.model.preprocessing import PreProcessor
+
+    features_config = [{"name": "a", "type": "float", "scaler": "standard"}]
+    preprocessor = PreProcessor(features_config).fit(pd.DataFrame({"a": [1.0, 2.0]}))
+
+    source = tmp_path / "empty.csv"
+    source.write_text("a\n")
+    destination = str(tmp_path / "output.parquet")
+
+    assert preprocessor.transform_file(str(source), destination) == 0
+    assert file.read_columns(destination) == ["a"]
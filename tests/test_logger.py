@@ -0,0 +1,116 @@
+import random
+import logging
+import threading
+import pytest
+from src.base import logger as logger_module
+from src.base.logger import (
+    RateLimitFilter,
+    SamplingFilter,
+    configure_logging,
+    stop_logging,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def handler():
+    handler = ListHandler()
+    yield handler
+    configure_logging(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+
+def make_record(created, message="batch"):
+    record = logging.LogRecord("test", logging.INFO, "file.py", 1, message, None, None)
+    record.created = created
+    return record
+
+
+def test_default_level(handler):
+    configure_logging(handlers=[handler])
+
+    logging.getLogger("test.default").debug("debug")
+    logging.getLogger("test.default").info("info")
+
+    assert handler.messages == ["info"]
+
+
+def test_reconfigure_resets_levels_and_filters(handler):
+    configure_logging(
+        handlers=[handler],
+        levels={"test.levels": "ERROR"},
+        rate_limits={"test.levels": 60},
+        sample_rates={"test.sampled": 0},
+    )
+    configure_logging(handlers=[handler])
+
+    logging.getLogger("test.levels").warning("a")
+    logging.getLogger("test.levels").warning("b")
+    logging.getLogger("test.sampled").warning("c")
+
+    assert handler.messages == ["a", "b", "c"]
+    assert logging.getLogger("test.levels").level == logging.NOTSET
+    assert not logging.getLogger("test.levels").filters
+    assert not logging.getLogger("test.sampled").filters
+
+
+def test_rate_limit_filter():
+    rate_limit = RateLimitFilter(10)
+
+    assert rate_limit.filter(make_record(100.0))
+    assert not rate_limit.filter(make_record(101.0))
+    assert not rate_limit.filter(make_record(105.0))
+
+    record = make_record(111.0)
+
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "batch (2 similar records dropped)"
+
+
+def test_sampling_filter():
+    random.seed(0)
+
+    assert not any(SamplingFilter(0).filter(make_record(0)) for _ in range(100))
+    assert all(SamplingFilter(1).filter(make_record(0)) for _ in range(100))
+    assert (
+        400 < sum(SamplingFilter(0.5).filter(make_record(0)) for _ in range(1000)) < 600
+    )
+
+
+def test_non_blocking_shutdown(handler):
+    release = threading.Event()
+
+    class SlowHandler(ListHandler):
+        def emit(self, record):
+            release.wait(5)
+            super().emit(record)
+
+    slow = SlowHandler()
+
+    configure_logging(handlers=[slow], non_blocking=True)
+
+    listener = logger_module._listener
+
+    for i in range(100):
+        logging.getLogger("test.queue").info("record %d", i)
+
+    assert len(slow.messages) < 100
+
+    release.set()
+    stop_logging()
+
+    assert slow.messages == [f"record {i}" for i in range(100)]
+    assert logger_module._listener is None
+    assert listener._thread is None
+
+    logging.getLogger("test.queue").info("after")
+
+    assert slow.messages[-1] == "after"
+    assert slow in logging.getLogger().handlers
@@ -0,0 +1,351 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from src.config import get_config
+from src.model.artifact import load_artifact
+from src.model.cache import StepCache
+from src.model.data import make_dataset
+from src.model.features import build_features
+from src.model.preprocessing import FeatureDiscretizer, PreProcessor
+
+
+@pytest.fixture(scope="module")
+def features_config():
+    return get_config("config/features.yaml")
+
+
+@pytest.fixture(scope="module")
+def X():
+    X, y = make_dataset(get_config("config/model.yaml"))
+    X, _ = build_features(X, y)
+    return X
+
+
+def transform_pipeline(preprocessor, X):
+    """Transforms with the fitted sklearn Pipeline instead of the program."""
+
+    reference = copy.deepcopy(preprocessor)
+    reference.program = None
+
+    return reference.transform(X)
+
+
+def assert_parity(preprocessor, X, tmp_path):
+    expected = transform_pipeline(preprocessor, X)
+
+    assert preprocessor.program is not None
+
+    result = preprocessor.transform(X)
+    pd.testing.assert_frame_equal(result, expected)
+
+    records = preprocessor.transform_records(X.to_dict("records"))
+    np.testing.assert_array_equal(
+        pd.DataFrame(records, columns=expected.columns).to_numpy(),
+        expected.to_numpy(),
+    )
+
+    preprocessor.export(str(tmp_path / "artifact"))
+    artifact = load_artifact(str(tmp_path / "artifact"))
+    np.testing.assert_array_equal(artifact.transform(X).to_numpy(), expected.to_numpy())
+
+
+def test_program_matches_pipeline(features_config, X, tmp_path):
+    preprocessor = PreProcessor(features_config).fit(X)
+
+    assert_parity(preprocessor, X, tmp_path)
+
+
+def test_threaded_program_matches_pipeline(features_config, X):
+    X = pd.concat([X] * 300, ignore_index=True)
+
+    preprocessor = PreProcessor(features_config, n_jobs=4).fit(X)
+
+    pd.testing.assert_frame_equal(
+        preprocessor.transform(X), transform_pipeline(preprocessor, X)
+    )
+
+
+def test_partial_fit_program_matches_pipeline(features_config, X, tmp_path):
+    preprocessor = PreProcessor(features_config)
+
+    for start in range(0, len(X), 50):
+        preprocessor.partial_fit(X.iloc[start : start + 50])
+
+    assert_parity(preprocessor, X, tmp_path)
+
+
+def test_cached_fit_matches_fit(features_config, X, tmp_path):
+    expected = PreProcessor(features_config).fit(X).transform(X)
+
+    cache = StepCache(str(tmp_path / "cache"))
+
+    for _ in range(2):
+        preprocessor = PreProcessor(features_config, cache=cache).fit(X)
+        pd.testing.assert_frame_equal(preprocessor.transform(X), expected)
+
+
+def test_expression_transformations(X, tmp_path):
+    features_config = [
+        {
+            "name": "Na_to_K",
+            "type": "float",
+            "transformation": "log1p(x) * 2 - 1",
+        },
+        {"name": "Age", "type": "float", "transformation": "clip(x, 20, 60) ** 0.5"},
+        {
+            "name": "Sex",
+            "type": "float",
+            "transformation": "x * exp(-x ** 2) + x",
+            "scaler": "standard",
+        },
+    ]
+
+    preprocessor = PreProcessor(features_config).fit(X)
+    result = preprocessor.transform(X)
+
+    np.testing.assert_allclose(result["Na_to_K"], np.log1p(X["Na_to_K"]) * 2 - 1)
+    np.testing.assert_allclose(result["Age"], np.sqrt(np.clip(X["Age"], 20, 60)))
+
+    assert_parity(preprocessor, X, tmp_path)
+
+
+def test_invalid_expression():
+    with pytest.raises(ValueError):
+        PreProcessor([{"name": "Age", "type": "float", "transformation": "y + 1"}]).fit(
+            pd.DataFrame({"Age": [1.0, 2.0]})
+        )
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_imputation_strategies(incremental):
+    X = pd.DataFrame({"a": [1.0, np.nan, 10.0, 11.0, 2.0, 1.0]})
+    expected = {"mean": 5.0, "median": 2.0, "constant:3": 3.0, "7": 7.0}
+
+    for strategy, value in expected.items():
+        preprocessor = PreProcessor(
+            [{"name": "a", "type": "float", "imputation_strategy": strategy}]
+        )
+
+        if incremental:
+            preprocessor.partial_fit(X.iloc[:3]).partial_fit(X.iloc[3:])
+        else:
+            preprocessor.fit(X)
+
+        result = preprocessor.transform(X)
+
+        assert result["a"].iloc[1] == value, strategy
+        assert transform_pipeline(preprocessor, X)["a"].iloc[1] == value, strategy
+
+
+def test_invalid_imputation_strategy():
+    with pytest.raises(ValueError):
+        PreProcessor(
+            [{"name": "a", "type": "float", "imputation_strategy": "mode"}]
+        ).fit(pd.DataFrame({"a": [1.0, np.nan]}))
+
+
+@pytest.fixture(scope="module")
+def categories():
+    return pd.DataFrame(
+        {
+            "color": ["red", "blue", "red", "green", None, "red", "blue", "red"],
+            "size": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+        }
+    )
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "ordinal", "frequency"])
+def test_sparse_encoding_matches_dense(categories, encoding):
+    features_config = [
+        {"name": "color", "type": "category", "encode": encoding},
+        {"name": "size", "type": "float", "scaler": "min_max"},
+    ]
+
+    dense = PreProcessor(features_config).fit(categories)
+    sparse = PreProcessor(features_config, sparse_output=True).fit(categories)
+
+    result = sparse.transform(categories)
+
+    assert result.format == "csr"
+    np.testing.assert_array_equal(
+        result.toarray(), dense.transform(categories).to_numpy()
+    )
+    assert list(sparse.get_feature_names_out()) == list(dense.transform(categories))
+
+
+def test_encodings(categories):
+    unseen = pd.DataFrame({"color": ["purple", "blue", None], "size": [1.0] * 3})
+
+    def encode(encoding):
+        return (
+            PreProcessor([{"name": "color", "type": "category", "encode": encoding}])
+            .fit(categories)
+            .transform(unseen)
+        )
+
+    onehot = encode("onehot")
+    assert list(onehot.columns) == ["color_blue", "color_green", "color_red"]
+    np.testing.assert_array_equal(onehot.to_numpy(), [[0, 0, 0], [1, 0, 0], [0, 0, 0]])
+
+    np.testing.assert_array_equal(encode("ordinal")["color"], [np.nan, 0.0, np.nan])
+    np.testing.assert_array_equal(encode("frequency")["color"], [0.0, 2 / 7, np.nan])
+
+
+def test_interactions(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 3)), columns=["x", "y", "z"])
+
+    features_config = [
+        {"name": "x", "type": "float", "polynomial_degree": 2},
+        {"name": "y", "type": "float", "polynomial_degree": 2, "scaler": "standard"},
+        {"name": "z", "type": "float", "interactions": ["x"]},
+    ]
+
+    preprocessor = PreProcessor(features_config).fit(X)
+    result = preprocessor.transform(X)
+
+    y = (X["y"] - X["y"].mean()) / X["y"].std(ddof=0)
+
+    assert list(result.columns) == ["x", "y", "z", "x^2", "x*y", "x*z", "y^2"]
+    np.testing.assert_allclose(result["x^2"], X["x"] ** 2)
+    np.testing.assert_allclose(result["x*y"], X["x"] * y)
+    np.testing.assert_allclose(result["x*z"], X["x"] * X["z"])
+    np.testing.assert_allclose(result["y^2"], y**2)
+
+    assert_parity(preprocessor, X, tmp_path)
+
+    budgeted = PreProcessor(features_config, memory_budget=1_024).fit(X)
+    pd.testing.assert_frame_equal(budgeted.transform(X), result)
+
+    sparse = PreProcessor(features_config, sparse_output=True).fit(X)
+    np.testing.assert_allclose(sparse.transform(X).toarray(), result.to_numpy())
+
+
+def test_refit_matches_fit():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        {
+            "a": rng.normal(5, 2, 2_000),
+            "b": rng.exponential(3, 2_000),
+            "c": rng.uniform(0, 1, 2_000),
+            "d": rng.normal(0, 1, 2_000),
+            "e": rng.choice(["u", "v", "w"], 2_000),
+        }
+    )
+
+    features_config = [
+        {"name": "a", "type": "float", "imputation_strategy": "mean"},
+        {
+            "name": "b",
+            "type": "float",
+            "transformation": "sqrt",
+            "discretizer": "kmeans:4",
+            "scaler": "min_max",
+        },
+        {"name": "c", "type": "float", "scaler": "robust"},
+        {"name": "e", "type": "category", "encode": "onehot"},
+    ]
+
+    preprocessor = PreProcessor(copy.deepcopy(features_config)).fit(X)
+
+    changes = [
+        lambda config: config[2].update(scaler="min_max"),
+        lambda config: config[0].update(polynomial_degree=2),
+        lambda config: config[2].update(polynomial_degree=2),
+        lambda config: config.append({"name": "d", "type": "float"}),
+        lambda config: config[3].update(encode="frequency"),
+        lambda config: config.__setitem__(1, {"name": "b", "type": "float"}),
+        lambda config: config[0].update(active=False),
+        lambda config: config.pop(2),
+    ]
+
+    for change in changes:
+        change(features_config)
+
+        preprocessor.refit(copy.deepcopy(features_config), X)
+
+        assert preprocessor.preprocessor is None
+
+        expected = PreProcessor(copy.deepcopy(features_config)).fit(X).transform(X)
+        pd.testing.assert_frame_equal(preprocessor.transform(X), expected)
+
+
+@pytest.mark.parametrize("strategy", ["uniform", "quantile", "kmeans"])
+def test_discretizer_aggregations(strategy):
+    from sklearn.preprocessing import KBinsDiscretizer
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.exponential(3, 1_000), "b": rng.normal(0, 1, 1_000)})
+
+    for aggregation in ["mean", "median", "midpoint"]:
+        result = (
+            FeatureDiscretizer(n_bins=6, strategy=strategy, aggregation=aggregation)
+            .fit(X)
+            .transform(X)
+        )
+
+        reference = KBinsDiscretizer(n_bins=6, encode="ordinal", strategy=strategy)
+        ordinals = reference.fit_transform(X)
+
+        for i, column in enumerate(X):
+            groups = X[column].groupby(ordinals[:, i])
+            edges = reference.bin_edges_[i]
+
+            if aggregation == "midpoint":
+                bin_values = (edges[:-1] + edges[1:]) / 2
+            else:
+                bin_values = groups.agg(aggregation).reindex(range(len(edges) - 1))
+
+            np.testing.assert_allclose(
+                result[column], np.asarray(bin_values)[ordinals[:, i].astype(int)]
+            )
+
+
+def test_discretizer_config(X):
+    preprocessor = PreProcessor(
+        [{"name": "Age", "type": "float", "discretizer": "uniform:4:midpoint"}]
+    ).fit(X)
+
+    edges = np.linspace(X["Age"].min(), X["Age"].max(), 5)
+    ordinals = np.clip(np.searchsorted(edges, X["Age"], side="right") - 1, 0, 3)
+
+    np.testing.assert_allclose(
+        preprocessor.transform(X)["Age"], ((edges[:-1] + edges[1:]) / 2)[ordinals]
+    )
+
+
+def test_transform_iter(features_config, X):
+    preprocessor = PreProcessor(features_config).fit(X)
+
+    chunks = [X.iloc[start : start + 37] for start in range(0, len(X), 37)]
+
+    pd.testing.assert_frame_equal(
+        pd.concat(preprocessor.transform_iter(chunks)), preprocessor.transform(X)
+    )
+
+
+@pytest.mark.parametrize("source", ["csv", "parquet"])
+@pytest.mark.parametrize("destination", ["csv", "parquet"])
+def test_transform_file(features_config, X, tmp_path, source, destination):
+    preprocessor = PreProcessor(features_config).fit(X)
+    expected = preprocessor.transform(X)
+
+    source = str(tmp_path / f"source.{source}")
+    destination = str(tmp_path / f"destination.{destination}")
+
+    if source.endswith(".csv"):
+        X.to_csv(source, index=False)
+    else:
+        X.to_parquet(source, index=False)
+
+    n_rows = preprocessor.transform_file(source, destination, chunksize=37)
+
+    if destination.endswith(".csv"):
+        result = pd.read_csv(destination)
+    else:
+        result = pd.read_parquet(destination)
+
+    assert n_rows == len(X)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+    assert list(result.columns) == list(expected.columns)
@@ -0,0 +1,51 @@
+import threading
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import generate_features_config, generate_dataset
+from src.base.memory import trace_memory
+from src.model.preprocessing import PreProcessor
+from src.model.profiling import Profiler
+
+
+def test_trace_memory_in_threads():
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def work():
+        try:
+            barrier.wait()
+            for _ in range(200):
+                report = {}
+                with trace_memory(report):
+                    np.ones(1_000)
+                assert report["peak_bytes"] >= 0
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+
+
+def test_memory_profiling_with_threads():
+    features_config = generate_features_config(n_features=8)
+    X = generate_dataset(features_config, 60_000)
+
+    expected = PreProcessor(features_config, n_jobs=4).fit(X).transform(X)
+
+    profiler = Profiler(memory=True)
+    preprocessor = PreProcessor(features_config, n_jobs=4, profile=profiler)
+    result = preprocessor.fit(X).transform(X)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+    report = profiler.report()
+    transform = report[report["phase"] == "transform"]
+
+    assert len(transform) > 0
+    assert transform["allocated_bytes"].notna().all()
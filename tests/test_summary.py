@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.config import init_config_file, get_config
+from src.model.preprocessing import PreProcessor
+from src.model.summary import DistinctSketch, summarize_dataset
+
+
+def test_sketch_exact_below_size():
+    values = np.repeat(np.arange(1_000), 3)
+
+    assert DistinctSketch(size=4_096).update(values).estimate() == 1_000
+
+
+@pytest.mark.parametrize("n_distinct", [20_000, 200_000])
+def test_sketch_accuracy(n_distinct):
+    rng = np.random.default_rng(0)
+    values = rng.permutation(np.repeat(np.arange(n_distinct), 2))
+
+    sketch = DistinctSketch(size=4_096)
+
+    for chunk in np.array_split(values, 17):
+        sketch.update(chunk)
+
+    assert sketch.estimate() == pytest.approx(n_distinct, rel=3 / np.sqrt(4_096))
+
+
+def test_sketch_merge():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 50_000, size=100_000)
+
+    whole = DistinctSketch().update(values)
+    left = DistinctSketch().update(values[:30_000])
+    right = DistinctSketch().update(values[30_000:])
+
+    np.testing.assert_array_equal(left.merge(right).hashes, whole.hashes)
+    assert left.estimate() == whole.estimate()
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_summarize_dataset(n_jobs):
+    rng = np.random.default_rng(2)
+    data = pd.DataFrame(
+        {
+            "a": rng.normal(size=10_000),
+            "b": rng.exponential(size=10_000),
+            "n": rng.integers(0, 5, size=10_000),
+            "c": rng.choice(list("xyz"), size=10_000),
+        }
+    )
+    data.loc[::10, "a"] = np.nan
+
+    summary = summarize_dataset(data, chunksize=999, n_jobs=n_jobs)
+
+    assert summary.loc["a", "missing"] == 1_000
+    assert summary.loc["n", "type"] == "int"
+    assert summary.loc["c", "type"] == "category"
+    assert summary.loc["c", "cardinality"] == 3
+    assert summary.loc["n", "cardinality"] == 5
+
+    for name in ("a", "b"):
+        assert summary.loc[name, "mean"] == pytest.approx(data[name].mean())
+        assert summary.loc[name, "std"] == pytest.approx(data[name].std(ddof=0))
+        assert summary.loc[name, "skew"] == pytest.approx(data[name].skew(), abs=1e-3)
+        assert summary.loc[name, "min"] == data[name].min()
+        assert summary.loc[name, "max"] == data[name].max()
+
+
+def test_init_config_file(tmp_path):
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame(
+        {"skewed": rng.exponential(size=2_000), "normal": rng.normal(size=2_000)}
+    )
+    data.loc[::7] = np.nan
+
+    filename = str(tmp_path / "features.yaml")
+    init_config_file(data, filename)
+
+    features_config = get_config(filename)
+
+    assert features_config["skewed"]["imputation_strategy"] == "median"
+    assert features_config["normal"]["imputation_strategy"] == "mean"
+
+    preprocessor = PreProcessor(
+        [
+            {"name": "skewed", "type": "float", "imputation_strategy": "median"},
+            {"name": "normal", "type": "float", "imputation_strategy": "mean"},
+        ]
+    ).fit(data)
+
+    result = preprocessor.transform(data)
+
+    assert result["skewed"].iloc[0] == pytest.approx(data["skewed"].median())
+    assert result["normal"].iloc[0] == pytest.approx(data["normal"].mean())
+
+    PreProcessor(features_config).fit(data).transform(data)